@@ -0,0 +1,29 @@
+"""Custom middlewares used across apps."""
+
+import logging
+
+from base import session
+
+logger = logging.getLogger(__name__)
+
+
+class SessionMiddleware:
+    """
+    Middleware to scope the thread local session data to a single request.
+
+    The local storage is cleared before the request is processed so that
+    the user, node and tenant memoized in base.session are resolved at
+    most once per request, and cleared again once the response is ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session.clear()
+        response = self.get_response(request)
+        logger.debug(
+            'Session lookups avoided for %s: %s', request.path,
+            session.get_lookups_avoided())
+        session.clear()
+        return response
@@ -99,6 +99,11 @@ class AbstractBaseModel(models.Model):
                 self.creator = current_user
             self.updater = current_user
         super(AbstractBaseModel, self).save(*args, **kwargs)
+        session.refresh(self)
+
+    def delete(self, *args, **kwargs):
+        session.refresh(self, deleted=True)
+        return super(AbstractBaseModel, self).delete(*args, **kwargs)
 
     @property
     def idencode(self):
@@ -1,18 +1,91 @@
-
 from asgiref.local import Local
 
 _active = Local()
 
+IDENTITY_KEYS = ('user', 'node', 'tenant')
+
+
+def _storage():
+    """ Returns the dict holding values in Thread Local Storage"""
+    try:
+        return _active.storage
+    except AttributeError:
+        _active.storage = {}
+        return _active.storage
+
 
 def set_to_local(key, value):
     """ Sets attribute to Thread Local Storage"""
-    setattr(_active, key, value)
+    _storage()[key] = value
     return True
 
 
 def get_from_local(key, default=None):
     """ Gets attribute from Thread Local Storage"""
-    return getattr(_active, key, default)
+    return _storage().get(key, default)
+
+
+def clear():
+    """
+    Clears everything set to Thread Local Storage.
+    Called at the start and end of each request and celery task so that
+    nothing resolved for one leaks into the next.
+    """
+    _active.storage = {}
+    return True
+
+
+def invalidate(*keys):
+    """
+    Drops the memoized user, node or tenant objects so that they are
+    fetched again on next access. Invalidates all of them when no key is
+    specified.
+    """
+    for key in keys or IDENTITY_KEYS:
+        set_to_local(key, None)
+    return True
+
+
+def refresh(instance, deleted=False):
+    """
+    Replaces a memoized user, node or tenant with the instance when they
+    refer to the same object, so that changes saved during a request are
+    seen by the rest of it. Deleted objects are invalidated.
+    """
+    for key in IDENTITY_KEYS:
+        obj = get_from_local(key, None)
+        if obj is None or obj is instance:
+            continue
+        if obj.__class__ == instance.__class__ and obj.id == instance.id:
+            set_to_local(key, None if deleted else instance)
+    return True
+
+
+def get_lookups_avoided():
+    """
+    Returns the number of identity lookups served from memory in the
+    current request or task.
+    """
+    return get_from_local('lookups_avoided', 0)
+
+
+def _get_identity(key, model):
+    """
+    Returns the object of the model whose id is set as <key>_id,
+    memoized for the rest of the request. The object is fetched again only
+    when the id changes or after it is invalidated.
+    """
+    object_id = get_from_local(f'{key}_id')
+    object_id = getattr(object_id, 'id', object_id)
+    obj = get_from_local(key, None)
+    if obj and obj.id == object_id:
+        set_to_local('lookups_avoided', get_lookups_avoided() + 1)
+        return obj
+    obj = None
+    if object_id:
+        obj = model.objects.filter(id=object_id).first()
+    set_to_local(key, obj)
+    return obj
 
 
 def get_current_user():
@@ -21,14 +94,7 @@ def get_current_user():
     Otherwise returns None.
     """
     from v1.accounts.models import CustomUser
-    user = get_from_local('user', None)
-    current_user = CustomUser.objects.filter(
-        id=get_from_local('user_id')).first()
-    if user and user == current_user:
-        return user
-    user = current_user
-    set_to_local('user', user)
-    return user
+    return _get_identity('user', CustomUser)
 
 
 def get_current_node():
@@ -37,14 +103,7 @@ def get_current_node():
     Otherwise returns None.
     """
     from v1.nodes.models import Node
-    node = get_from_local('node', None)
-    current_node = Node.objects.filter(
-        id=get_from_local('node_id')).first()
-    if node and node == current_node:
-        return node
-    node = current_node
-    set_to_local('node', node)
-    return node
+    return _get_identity('node', Node)
 
 
 def get_current_tenant():
@@ -53,12 +112,4 @@ def get_current_tenant():
     Otherwise returns None.
     """
     from v1.tenants.models import Tenant
-    tenant = get_from_local('tenant', None)
-    current_tenant = Tenant.objects.filter(
-        id=get_from_local('tenant_id')).first()
-    if tenant and tenant == current_tenant:
-        return tenant
-    tenant = current_tenant
-    set_to_local('tenant', tenant)
-    return tenant
-
+    return _get_identity('tenant', Tenant)
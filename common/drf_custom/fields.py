@@ -8,9 +8,11 @@ import decimal
 from rest_framework import serializers
 from openpyxl import load_workbook
 
+from django.db import models
 from django.utils.encoding import smart_str
 from django.utils.formats import sanitize_separators
 
+from utilities import idencode
 from utilities.functions import decode, encode
 
 from common.library import _unix_to_datetime
@@ -188,12 +190,20 @@ class IdencodeField(serializers.CharField):
         if self.serializer:
             return self.serializer(value).data
         if isinstance(value, int):
-            return encode(value)
+            return self.encode_id(value)
         try:
-            return encode(value.id)
+            return self.encode_id(value.id)
         except:
             return None
 
+    def encode_id(self, value):
+        """
+        Returns the encoded id, from the ids IdencodeListSerializer encoded
+        for the page when it is one of them.
+        """
+        encoded = self.context.get('encoded_ids', {}).get(value)
+        return encoded or encode(value)
+
     def to_internal_value(self, value):
         """To convert value for saving."""
         if self.related_model and isinstance(value, self.related_model):
@@ -212,6 +222,40 @@ class IdencodeField(serializers.CharField):
             raise serializers.ValidationError('Invalid pk - object does not exist.')
 
 
+class IdencodeListSerializer(serializers.ListSerializer):
+    """
+    List serializer that encodes the ids of the IdencodeFields of the
+    whole page at once, before the rows are serialized, and passes them to
+    the fields in the serializer context as encoded_ids.
+
+    Set as list_serializer_class in the Meta of a serializer.
+    """
+
+    def get_page_ids(self, items):
+        """Returns the ids of the IdencodeFields of the items."""
+        fields = [
+            field for field in self.child._readable_fields
+            if isinstance(field, IdencodeField) and not field.serializer
+            and len(field.source_attrs) == 1]
+        ids = []
+        for item in items:
+            for field in fields:
+                source = field.source_attrs[0]
+                value = getattr(item, f'{source}_id', None)
+                if value is None:
+                    value = getattr(item, source, None)
+                if isinstance(value, int):
+                    ids.append(value)
+        return ids
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.Manager) else data)
+        ids = list(dict.fromkeys(self.get_page_ids(items)))
+        self.context['encoded_ids'] = dict(
+            zip(ids, idencode.codec.encode_many(ids)))
+        return [self.child.to_representation(item) for item in items]
+
+
 class ManyToManyIdencodeField(serializers.CharField):
     """Encoded id field."""
 
@@ -2,6 +2,9 @@
 ASGI config for rightorigins_v3 project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Requests to the notification stream are served by v1.notifications.stream,
+which keeps the connection open to push events, and all the other requests
+by Django.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
@@ -13,4 +16,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rightorigins_v3.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from v1.notifications import constants as notif_consts  # noqa: E402
+from v1.notifications import stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """Routes the notification stream to its application."""
+    if scope['type'] == 'http' and \
+            scope['path'] == notif_consts.NOTIFICATION_STREAM_PATH:
+        return await stream.application(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -3,6 +3,7 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import task_prerun, task_postrun
 
 os.environ.setdefault(
     'DJANGO_SETTINGS_MODULE', 'rightorigins_v3.settings.local')
@@ -10,7 +11,6 @@ os.environ.setdefault(
 app = Celery(
     'rightorigins_v3',
     broker='redis://127.0.0.1:6379',
-    backend='redis://127.0.0.1:6379',
     )
 
 BROKER_URL = 'redis://127.0.0.1:6379/0'
@@ -20,4 +20,13 @@ CELERY_RESULT_SERIALIZER = 'json'
 
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.conf.timezone = 'Asia/Calcutta'
-app.autodiscover_tasks(['utilities',])
+app.autodiscover_tasks([
+    'utilities', 'v1.dashboard', 'v1.consumer_interface', 'v1.products'])
+
+
+@task_prerun.connect
+@task_postrun.connect
+def clear_session(**kwargs):
+    """Scope thread local session data to a single task."""
+    from base import session
+    session.clear()
@@ -112,7 +112,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'django.middleware.locale.LocaleMiddleware',
-
+    'base.middleware.SessionMiddleware',
 ]
 
 REST_FRAMEWORK = {
@@ -224,6 +224,8 @@ NEOMODEL_SIGNALS = True
 NEOMODEL_FORCE_TIMEZONE = False
 NEOMODEL_ENCRYPTED_CONNECTION = True
 NEOMODEL_MAX_POOL_SIZE = 50
+# Backend of the supply chain graph, 'neo4j' or 'memory'.
+SUPPLY_GRAPH_BACKEND = 'neo4j'
 
 REDIS_URL = config.get('database', 'REDIS_URL', fallback='redis://127.0.0.1')
 REDIS_PORT = config.get('database', 'REDIS_PORT', fallback=6379)
@@ -355,6 +357,7 @@ EMAIL_USE_SSL = False
 # celery setup
 
 CELERY_BROKER_URL = f'{REDIS_URL}:{REDIS_PORT}'
+CELERY_RESULT_BACKEND = f'{REDIS_URL}:{REDIS_PORT}'
 CELERY_TIMEZONE = 'UTC'
 CELERY_DEFAULT_QUEUE = 'low'
 CELERY_ROUTES = {
@@ -431,6 +434,22 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'sync_roai_standards',
         'schedule': crontab(minute=0, hour=2)
     }, 
+    'submit_message_batches': {
+        'task': 'submit_message_batches',
+        'schedule': crontab(minute='*/5')
+    },
+    'compact_stock_balances': {
+        'task': 'compact_stock_balances',
+        'schedule': crontab(minute='*/10')
+    },
+    'archive_notifications': {
+        'task': 'archive_notifications',
+        'schedule': crontab(minute=0, hour=3)
+    },
+    'process_score_queue': {
+        'task': 'process_score_queue',
+        'schedule': crontab(minute='*/5')
+    },
 }
 
 OPEN_AI_ASSISTANT_ID = config.get('openai', 'OPEN_AI_ASSISTANT_ID')
@@ -4,6 +4,7 @@ from django.utils import timezone
 
 from base import session
 
+from v1.supply_chains.models import ConnectionSummary
 from v1.supply_chains.models import NodeSupplyChain, SupplyChain
 from v1.supply_chains.constants import ConnectionInitiation
 
@@ -17,60 +18,228 @@ from v1.risk import models as risk_models
 from v1.nodes import constants as node_consts
 
 
+class SupplierGraph:
+    """
+    Supplier graph of a supply chain, loaded into memory with a fixed
+    number of queries.
+
+    A node supplies another when they are connected in the supply chain
+    and the supplier has sent a transaction to the buyer, same as
+    Node.get_connections(supplied=True).
+    """
+
+    def __init__(self, supply_chain_id):
+        from v1.risk.models import CurrentRiskScore
+        from v1.supply_chains.models import Connection
+        from v1.supply_chains.constants import ConnectionStatus
+        from v1.transactions.models import ExternalTransaction
+
+        self.supply_chain_id = supply_chain_id
+        node_scs = NodeSupplyChain.objects.filter(
+            supply_chain_id=supply_chain_id)
+        self.node_scs = {
+            node_id: (node_sc_id, sc_risk_score, node_type)
+            for node_sc_id, node_id, sc_risk_score, node_type in
+            node_scs.values_list('id', 'node_id', 'sc_risk_score', 'node__type')
+        }
+        node_ids = node_scs.values('node_id')
+        supplied = set(ExternalTransaction.objects.filter(
+            source_id__in=node_ids, destination_id__in=node_ids
+        ).values_list('destination_id', 'source_id').distinct())
+        connections = Connection.objects.filter(
+            supply_chain_id=supply_chain_id).exclude(
+            status=ConnectionStatus.REVOKED).values_list(
+            'source_id', 'target_id').distinct()
+        self.suppliers = {node_id: set() for node_id in self.node_scs}
+        self.buyers = {node_id: set() for node_id in self.node_scs}
+        for buyer, supplier in connections:
+            if (buyer, supplier) not in supplied:
+                continue
+            if buyer not in self.node_scs or supplier not in self.node_scs:
+                continue
+            self.suppliers[buyer].add(supplier)
+            self.buyers[supplier].add(buyer)
+        self.risk_scores = dict(CurrentRiskScore.objects.filter(
+            node_id__in=node_ids).values_list('node_id', 'overall'))
+
+    def components(self, node_ids=None):
+        """
+        Returns strongly connected components of the graph, suppliers
+        first, with Tarjan's algorithm. Only the nodes in node_ids and
+        their suppliers are visited when node_ids is given.
+        """
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        components = []
+        counter = 0
+        for root in (self.node_scs if node_ids is None else node_ids):
+            if root in index:
+                continue
+            work = [(root, iter(self.suppliers[root]))]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, suppliers = work[-1]
+                pushed = False
+                for supplier in suppliers:
+                    if supplier not in index:
+                        index[supplier] = low[supplier] = counter
+                        counter += 1
+                        stack.append(supplier)
+                        on_stack.add(supplier)
+                        work.append((supplier, iter(self.suppliers[supplier])))
+                        pushed = True
+                        break
+                    if supplier in on_stack:
+                        low[node] = min(low[node], index[supplier])
+                if pushed:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        return components
+
+    def downstream(self, node_ids):
+        """
+        Returns the nodes whose score depends on any of the nodes, which
+        are the nodes themselves and all their direct and indirect buyers.
+        """
+        affected = set()
+        queue = [node_id for node_id in node_ids if node_id in self.node_scs]
+        while queue:
+            node_id = queue.pop()
+            if node_id in affected:
+                continue
+            affected.add(node_id)
+            queue.extend(self.buyers[node_id] - affected)
+        return affected
+
+
 class UpdateScore:
     """
     Class To Update Supply Chain Risk Score.
+
+    The score of a node in a supply chain is the average of its own risk
+    score and the average score of its suppliers in the supply chain. End
+    nodes without suppliers count 100 for producers and 0 otherwise as the
+    supplier average.
+
+    Scores are computed bottom-up, suppliers first, over the strongly
+    connected components of the supplier graph. Within a cycle, a supplier
+    from the same cycle counts with its own risk score, since its supply
+    chain score depends on the buyer.
     """
+
     def __init__(self) -> None:
-        self.updated_node_scs = []
+        self.updated_node_scs = set()
 
-    def calculate_score(self,node_sc,looped_node_scs=[]):
+    def calculate_scores(self, graph, node_ids=None):
         """
-        Function for calculation sc risk score.
+        Computes scores of the nodes in node_ids, or of all the nodes of
+        the graph, and returns the updated NodeSupplyChain objects.
+        Scores of the other nodes are taken as saved.
         """
-        node = node_sc.node
-        sc = node_sc.supply_chain
-        connections = node.get_connections(
-            supply_chain=sc.id,supplied=True)
-        risk_score = node.get_risk_score()
-        sc_risk_score = 0
-        if not connections:
-            looped_node_scs.append(node_sc.id)
-            if node.type == node_consts.NodeType.PRODUCER:
-                sc_risk_score = 100
-        else:
-            looped_node_scs.append(node_sc.id)
-            connection_node_scs = NodeSupplyChain.objects.filter(
-                node__in=connections,supply_chain=sc)
-            for connetion_node_sc in connection_node_scs:
-                if connetion_node_sc.id in self.updated_node_scs:
-                    sc_risk_score += connetion_node_sc.sc_risk_score
-                elif connetion_node_sc.id in looped_node_scs:
-                    sc_risk_score += connetion_node_sc.node.get_risk_score()
+        scores = {
+            node_id: sc_risk_score
+            for node_id, (_, sc_risk_score, _) in graph.node_scs.items()}
+        now = timezone.now()
+        updated = []
+        updated_scores = {}
+        for component in graph.components(node_ids):
+            if node_ids is not None:
+                component = component & node_ids
+            for node_id in component:
+                suppliers = graph.suppliers[node_id]
+                if suppliers:
+                    supplier_score = sum(
+                        graph.risk_scores.get(supplier, 0)
+                        if supplier in component else scores[supplier]
+                        for supplier in suppliers) / len(suppliers)
+                elif graph.node_scs[node_id][2] == node_consts.NodeType.PRODUCER:
+                    supplier_score = 100
                 else:
-                    score = self.calculate_score(
-                        connetion_node_sc,looped_node_scs)
-                    sc_risk_score += score
-            try:
-                sc_risk_score = sc_risk_score/connection_node_scs.count()
-            except:
-                pass
-        node_sc.sc_risk_score = (sc_risk_score+risk_score)/2
-        node_sc.sc_risk_updated_on = timezone.now()
-        node_sc.save()
-        self.updated_node_scs.append(node_sc.id)
+                    supplier_score = 0
+                node_sc_id = graph.node_scs[node_id][0]
+                scores[node_id] = (
+                    supplier_score + graph.risk_scores.get(node_id, 0)) / 2
+                updated_scores[node_id] = scores[node_id]
+                updated.append(NodeSupplyChain(
+                    id=node_sc_id, sc_risk_score=scores[node_id],
+                    sc_risk_updated_on=now))
+                self.updated_node_scs.add(node_sc_id)
+        NodeSupplyChain.objects.bulk_update(
+            updated, ['sc_risk_score', 'sc_risk_updated_on'], batch_size=1000)
+        ConnectionSummary.update_risk_levels(
+            graph.supply_chain_id, updated_scores)
+        return updated
+
+    def calculate_score(self, node_sc, looped_node_scs=None):
+        """
+        Function for calculation sc risk score.
+        """
+        graph = SupplierGraph(node_sc.supply_chain_id)
+        self.calculate_scores(graph, graph.downstream([node_sc.node_id]))
+        node_sc.refresh_from_db(fields=['sc_risk_score', 'sc_risk_updated_on'])
         return node_sc.sc_risk_score
-    
-    def update_sc_score(self,tenant):
+
+    def update_sc_score(self, tenant):
         """
         Function updates sc risk score of all node supplychains.
         """
-        self.updated_node_scs = []
-        node_scs = NodeSupplyChain.objects.filter(
-            node__tenant=tenant).order_by('id')
-        for node_sc in node_scs:
-            if node_sc.id not in self.updated_node_scs:
-                self.calculate_score(node_sc,[])
+        self.updated_node_scs = set()
+        supply_chain_ids = NodeSupplyChain.objects.filter(
+            node__tenant=tenant).values_list(
+            'supply_chain_id', flat=True).distinct()
+        for supply_chain_id in supply_chain_ids:
+            self.calculate_scores(SupplierGraph(supply_chain_id))
+
+    def update_affected(self, node_ids, supply_chain_ids=None):
+        """
+        Recomputes the scores that depend on the nodes, which are the
+        scores of the nodes and of their direct and indirect buyers, in
+        every supply chain of the nodes or in the given ones.
+        """
+        if supply_chain_ids is None:
+            supply_chain_ids = NodeSupplyChain.objects.filter(
+                node_id__in=node_ids).values_list(
+                'supply_chain_id', flat=True).distinct()
+        updated = []
+        for supply_chain_id in supply_chain_ids:
+            graph = SupplierGraph(supply_chain_id)
+            affected = graph.downstream(node_ids)
+            if affected:
+                updated += self.calculate_scores(graph, affected)
+        return updated
+
+
+def schedule_update(*node_ids):
+    """
+    Schedules recomputing the supply chain risk scores that depend on the
+    nodes, once the current transaction is committed.
+    """
+    from django.db import transaction
+    from utilities import tasks
+
+    node_ids = [node_id for node_id in node_ids if node_id]
+    if not node_ids:
+        return False
+    transaction.on_commit(
+        lambda: tasks.update_affected_sc_risk_score.delay(node_ids))
+    return True
 
 
 class GraphUpdateScore:
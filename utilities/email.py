@@ -7,6 +7,8 @@ from celery import shared_task
 
 from django.conf import settings
 from django.core.mail import send_mail
+from django.core.mail import get_connection
+from django.core.mail import EmailMultiAlternatives
 
 from django.utils.html import strip_tags
 
@@ -30,3 +32,28 @@ def send_email(subject, to_email, html):
         logger.info('Email sending failed.')
     return True
 
+
+
+@shared_task(name='send_emails')
+def send_emails(messages):
+    """
+    Function to send a batch of emails over a single connection.
+    Each message is a dict with subject, to_email and html.
+    """
+    emails = []
+    for message in messages:
+        mail = EmailMultiAlternatives(
+            subject=message['subject'],
+            body=strip_tags(message['html']),
+            from_email=settings.FROM_EMAIL,
+            to=[message['to_email']])
+        mail.attach_alternative(message['html'], 'text/html')
+        emails.append(mail)
+    try:
+        connection = get_connection()
+        sent = connection.send_messages(emails)
+        logger.info(f'{sent} of {len(emails)} emails sent.')
+    except Exception as e:
+        capture_exception(e)
+        logger.info('Email sending failed.')
+    return True
@@ -7,7 +7,6 @@ import hashlib
 import requests
 import calendar
 import phonenumbers
-from hashids import Hashids
 from datetime import datetime
 from datetime import date
 from datetime import timedelta
@@ -19,6 +18,8 @@ from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 from django.utils.functional import Promise
 
+from utilities import idencode
+
 
 def encode(value):
     """
@@ -29,14 +30,8 @@ def encode(value):
     Returns:
         hashed string.
     """
-    hasher = Hashids(
-        min_length=settings.HASHID_MIN_LENGTH,
-        salt=settings.HASHID_SALT,
-        alphabet=settings.HASHID_ALPHABETS,
-    )
     try:
-        value = int(value)
-        return hasher.encode(value)
+        return idencode.codec.encode(value)
     except Exception as e:
         raise ValueError(_("Invalid input {value} for Encoder. Should be of type int").format(value=value))
 
@@ -50,12 +45,7 @@ def is_decodable(value):
     Returns:
         int value.
     """
-    hasher = Hashids(
-        min_length=settings.HASHID_MIN_LENGTH,
-        salt=settings.HASHID_SALT,
-        alphabet=settings.HASHID_ALPHABETS,
-    )
-    return bool(hasher.decode(value))
+    return idencode.codec.is_decodable(value)
 
 
 def decode(value):
@@ -67,13 +57,8 @@ def decode(value):
     Returns:
         int value.
     """
-    hasher = Hashids(
-        min_length=settings.HASHID_MIN_LENGTH,
-        salt=settings.HASHID_SALT,
-        alphabet=settings.HASHID_ALPHABETS,
-    )
     try:
-        return hasher.decode(value)[0]
+        return idencode.codec.decode(value)
     except Exception as e:
         raise ValueError(_("Invalid input({value}) for Decoder.").format(value=value))
 
@@ -236,14 +221,20 @@ def encode_list(id_list):
     """
     Function encodes list of ids.
     """
-    return [encode(id) for id in id_list]
+    try:
+        return idencode.codec.encode_many(id_list)
+    except Exception as e:
+        raise ValueError(_("Invalid input {value} for Encoder. Should be of type int").format(value=id_list))
 
 
 def decode_list(id_list):
     """
     Function decodes list of encoded ids.
     """
-    return [decode(id) for id in id_list]
+    try:
+        return idencode.codec.decode_many(id_list)
+    except Exception as e:
+        raise ValueError(_("Invalid input({value}) for Decoder.").format(value=id_list))
 
 
 def week_start_end():
@@ -0,0 +1,108 @@
+"""
+Codec for the encoded ids (idencode) exposed in the APIs.
+
+Building a Hashids object shuffles its alphabets from the salt, which costs
+more than encoding an id with it. A single encoder is built for each set of
+options, and encoded and decoded values are kept in an LRU cache, since the
+same ids are encoded over and over across the rows and requests.
+"""
+import functools
+
+from hashids import Hashids
+
+from django.conf import settings
+
+CACHE_SIZE = 2 ** 16
+
+
+class Codec:
+    """
+    Encodes and decodes ids with a single Hashids object built on first
+    use, caching the most recently used values.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE, **options):
+        self.options = options
+        self._hasher = None
+        self.encode_int = functools.lru_cache(maxsize=cache_size)(
+            self._encode_int)
+        self.decode_values = functools.lru_cache(maxsize=cache_size)(
+            self._decode_values)
+
+    @property
+    def hasher(self):
+        """Returns the Hashids object of the codec."""
+        if self._hasher is None:
+            self._hasher = Hashids(**self.options)
+        return self._hasher
+
+    def _encode_int(self, value):
+        return self.hasher.encode(value)
+
+    def _decode_values(self, value):
+        return self.hasher.decode(value)
+
+    def encode(self, value):
+        """
+        Returns the encoded string of the int value. Raises ValueError
+        if the value is not an int.
+        """
+        return self.encode_int(int(value))
+
+    def decode(self, value):
+        """
+        Returns the int encoded in the value. Raises ValueError if the
+        value cannot be decoded.
+        """
+        try:
+            return self.decode_values(value)[0]
+        except (IndexError, TypeError):
+            raise ValueError(value)
+
+    def is_decodable(self, value):
+        """Returns whether the value can be decoded."""
+        try:
+            return bool(self.decode_values(value))
+        except TypeError:
+            return False
+
+    def encode_many(self, values):
+        """
+        Returns the encoded strings of the values, in order. Each distinct
+        value is encoded once.
+        """
+        values = list(values)
+        encoded = {value: None for value in values}
+        for value in encoded:
+            encoded[value] = self.encode(value)
+        return [encoded[value] for value in values]
+
+    def decode_many(self, values):
+        """
+        Returns the ints encoded in the values, in order. Each distinct
+        value is decoded once.
+        """
+        values = list(values)
+        decoded = {value: None for value in values}
+        for value in decoded:
+            decoded[value] = self.decode(value)
+        return [decoded[value] for value in values]
+
+    def encode_queryset(self, queryset, field='id'):
+        """
+        Returns the encoded ids of the objects of the queryset, fetching
+        only the field.
+        """
+        return self.encode_many(queryset.values_list(field, flat=True))
+
+    def cache_clear(self):
+        """Clears the cached values."""
+        self.encode_int.cache_clear()
+        self.decode_values.cache_clear()
+
+
+codec = Codec(
+    min_length=settings.HASHID_MIN_LENGTH,
+    salt=settings.HASHID_SALT,
+    alphabet=settings.HASHID_ALPHABETS,
+)
@@ -0,0 +1,111 @@
+"""
+Trigram search of the nodes, batches, transactions and claims.
+
+The searches used to OR icontains lookups over the names of several
+joined tables, which no index can serve. Batches, transactions and
+attached claims instead keep a search_document, the text of everything
+they are searched on, that is updated when they are saved and in the
+background when a name in it changes. Translated names are in the
+document in every language, so that they match in any of them. The
+documents, and the names that are searched directly, have pg_trgm GIN
+indexes on their upper case, which is what icontains compares on
+Postgres, so that a search is a single index scan.
+
+search() is the API the filters call. It filters a queryset with the value
+and orders it by the trigram word similarity of the value, best matches
+first.
+"""
+from modeltranslation.utils import build_localized_fieldname
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import OpClass
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import transaction as django_transaction
+from django.db.models.functions import Upper
+
+DOCUMENT = 'search_document'
+REFRESH_BATCH_SIZE = 1000
+
+
+def make_document(*values):
+    """
+    Returns the search document of the values, skipping empty and repeated
+    ones.
+    """
+    return ' '.join(dict.fromkeys(
+        str(value) for value in values if value not in (None, '')))
+
+
+def localized_fields(field):
+    """
+    Returns the names of the columns of the translated field, one for each
+    language.
+    """
+    return [
+        build_localized_fieldname(field, code)
+        for code, _ in settings.LANGUAGES]
+
+
+def translations(instance, field):
+    """Returns the values of the translated field in every language."""
+    return [getattr(instance, name) for name in localized_fields(field)]
+
+
+def trigram_index(field, name):
+    """Returns a trigram GIN index on the upper case of the field."""
+    return GinIndex(OpClass(Upper(field), name='gin_trgm_ops'), name=name)
+
+
+def search(queryset, value, field=DOCUMENT):
+    """
+    Returns the objects of the queryset with the value in the field, the
+    most similar first and otherwise in the order of the queryset.
+    """
+    value = (value or '').strip()
+    if not value:
+        return queryset
+    ordering = queryset.query.order_by or queryset.model._meta.ordering
+    return queryset.filter(**{f'{field}__icontains': value}).annotate(
+        search_rank=TrigramWordSimilarity(value, field)).order_by(
+        '-search_rank', *ordering)
+
+
+def name_changed(instance, *fields):
+    """
+    Returns whether the saved value of any of the fields, name by default,
+    is different.
+    """
+    if not instance.pk:
+        return False
+    fields = fields or ('name',)
+    return type(instance).objects.filter(pk=instance.pk).exclude(
+        **{field: getattr(instance, field) for field in fields}).exists()
+
+
+def refresh(queryset, batch_size=REFRESH_BATCH_SIZE):
+    """
+    Recomputes the search documents of the objects in the queryset,
+    batch_size at a time. Returns the number of objects.
+    """
+    model = queryset.model
+    ids = list(queryset.order_by().values_list('pk', flat=True).distinct())
+    for start in range(0, len(ids), batch_size):
+        objects = list(model.objects.filter(
+            pk__in=ids[start:start + batch_size]))
+        for instance in objects:
+            instance.search_document = instance.get_search_document()
+        model.objects.bulk_update(objects, [DOCUMENT])
+    return len(ids)
+
+
+def schedule_refresh(model, **filters):
+    """
+    Refreshes the documents of the objects of the model ('app.Model')
+    matching the filters in the background, once the current transaction
+    is committed.
+    """
+    from utilities import tasks
+
+    django_transaction.on_commit(
+        lambda: tasks.refresh_search_documents.delay(model, filters))
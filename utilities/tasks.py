@@ -16,14 +16,16 @@ def update_country_score():
     Fn to update country score.
     """
     roai_countries = roai_apis.CountryList().call(limit=1000)
-    for roai_country in roai_countries:
-        try:
-            country = Country.objects.get(
-                alpha_3__iexact=roai_country['code'])
-        except:
-            continue
-        country.score = roai_country['score']
-        country.save()
+    scores = {
+        roai_country['code'].upper(): roai_country['score']
+        for roai_country in roai_countries}
+    countries = []
+    for country in Country.objects.all():
+        score = scores.get((country.alpha_3 or '').upper())
+        if score is not None and score != country.score:
+            country.score = score
+            countries.append(country)
+    Country.objects.bulk_update(countries, ['score'])
     capture_message("Country Scores Updated Successfully")
 
 @shared_task(name='update_sc_risk_score')
@@ -39,6 +41,15 @@ def update_sc_risk_score():
             continue
     capture_message("SupplyChain Scores Updated Successfully")
 
+@shared_task(name='update_affected_sc_risk_score')
+def update_affected_sc_risk_score(node_ids):
+    """
+    Fn to update supplychain risk score of the nodes and of the nodes
+    depending on them.
+    """
+    calculate_risk.UpdateScore().update_affected(node_ids)
+    return True
+
 @shared_task(name='sync_roai_standards')
 def sync_roai_standards():
     """
@@ -52,3 +63,34 @@ def sync_roai_standards():
         except:
             pass
     capture_message("ROAI Standards Updated Successfully")
+
+@shared_task(name='refresh_search_documents')
+def refresh_search_documents(model, filters):
+    """
+    Fn to refresh the search documents of the objects of the model
+    matching the filters.
+    """
+    from django.apps import apps
+    from utilities import search
+    queryset = apps.get_model(model).objects.filter(**filters)
+    return search.refresh(queryset)
+
+@shared_task(name='archive_notifications')
+def archive_notifications():
+    """
+    Fn to archive the read notifications and the SMS alerts past their
+    retention period.
+    """
+    from v1.notifications import archive
+    return {
+        'notifications': archive.archive_notifications(),
+        'sms_alerts': archive.archive_sms_alerts(),
+    }
+
+@shared_task(name='process_score_queue')
+def process_score_queue():
+    """
+    Fn to score the nodes queued to be scored, in batches.
+    """
+    from v1.risk import score_queue
+    return score_queue.process()
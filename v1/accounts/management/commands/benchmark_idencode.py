@@ -0,0 +1,86 @@
+"""Command to benchmark encoding and decoding of ids."""
+
+import time
+
+from hashids import Hashids
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from utilities import idencode
+
+
+def legacy_encode(value):
+    """Encodes the way it was done before the codec, for comparison."""
+    hasher = Hashids(
+        min_length=settings.HASHID_MIN_LENGTH,
+        salt=settings.HASHID_SALT,
+        alphabet=settings.HASHID_ALPHABETS,
+    )
+    return hasher.encode(int(value))
+
+
+def legacy_decode(value):
+    """Decodes the way it was done before the codec, for comparison."""
+    hasher = Hashids(
+        min_length=settings.HASHID_MIN_LENGTH,
+        salt=settings.HASHID_SALT,
+        alphabet=settings.HASHID_ALPHABETS,
+    )
+    return hasher.decode(value)[0]
+
+
+class Command(BaseCommand):
+    """
+    Reports the throughput of encoding and decoding ids with a new Hashids
+    object for each call, as it used to be done, and with the shared codec,
+    one at a time and in bulk, with a cold and a warm cache.
+    The ids are drawn from a range smaller than the count, so that ids
+    repeat like they do across the rows of a page.
+    """
+    help = 'Benchmark encoding and decoding of ids.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100000)
+        parser.add_argument('--distinct', type=int, default=5000,
+            help='Number of distinct ids encoded.')
+
+    def run(self, name, function, values):
+        start = time.perf_counter()
+        result = function(values)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'{name}: {len(values)} in {elapsed:.3f}s '
+            f'({len(values) / elapsed:.0f}/second)')
+        return result
+
+    def handle(self, *args, **options):
+        ids = [
+            1 + (i * 7919) % options['distinct']
+            for i in range(options['count'])]
+        codec = idencode.codec
+        codec.cache_clear()
+
+        encoded = self.run(
+            'Encoding with new Hashids',
+            lambda values: [legacy_encode(v) for v in values], ids)
+        self.run(
+            'Encoding with codec, cold cache',
+            lambda values: [codec.encode(v) for v in values], ids)
+        self.run(
+            'Encoding with codec, warm cache',
+            lambda values: [codec.encode(v) for v in values], ids)
+        codec.cache_clear()
+        bulk = self.run('Encoding in bulk, cold cache', codec.encode_many, ids)
+        assert bulk == encoded
+
+        self.run(
+            'Decoding with new Hashids',
+            lambda values: [legacy_decode(v) for v in values], encoded)
+        codec.cache_clear()
+        self.run(
+            'Decoding with codec, cold cache',
+            lambda values: [codec.decode(v) for v in values], encoded)
+        decoded = self.run(
+            'Decoding in bulk, warm cache', codec.decode_many, encoded)
+        assert decoded == ids
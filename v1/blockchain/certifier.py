@@ -14,12 +14,33 @@ from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.hazmat.primitives.serialization import PrivateFormat
 from cryptography.hazmat.primitives.serialization import NoEncryption
 import os.path
+import functools
 
 import jwt
 import time
 import random
 
 
+@functools.lru_cache(maxsize=8)
+def load_signing_key(key_file, key_password=None):
+    """
+    Load and parse a PEM private key from disk.
+
+    The parsed key is cached for the life of the process, so that the key
+    file is not read and parsed again for every request that is signed.
+    Input Params:
+        key_file(str): Path to a file containing the private key.
+        key_password(bytes): Optional. Password to decrypt key_file.
+    Returns:
+        (RSAPrivateKey): Parsed private key.
+    """
+    key_file = os.path.abspath(os.path.expanduser(key_file))
+    with open(key_file, 'rb') as key:
+        key_bytes = key.read()
+    return serialization.load_pem_private_key(
+        key_bytes, password=key_password, backend=default_backend())
+
+
 class APIAuth():
     """Class to manage the api auth header with private key."""
 
@@ -64,7 +85,7 @@ class APIAuth():
             (str): Authentication header value as a string.
         """
         if not key:
-            key = self._load_private_key(key_file, key_password)
+            key = load_signing_key(str(key_file), key_password)
         claim = self._sign(key)
         try:
             claim = claim.decode(self.ENCODING)
@@ -51,3 +51,11 @@ BC_REQUEST_STATUS_CHOICES = (
 )
 
 HEDERA_CONSENSUS_MESSAGE_SIZE = 6000
+
+# Middleware connection pool
+BC_POOL_CONNECTIONS = 4
+BC_POOL_MAXSIZE = 20
+BC_REQUEST_TIMEOUT = 30
+
+# Maximum number of messages submitted together under one merkle root
+MESSAGE_BATCH_SIZE = 1000
@@ -8,16 +8,24 @@ import requests
 import json
 from celery import shared_task
 import binascii
-from hashids import Hashids
 from Crypto.Cipher import AES
+from requests.adapters import HTTPAdapter
 
 from django.conf import settings
 from django.utils.safestring import mark_safe
 from django.utils.timezone import datetime
 from django.core.serializers.json import DjangoJSONEncoder
 
+from utilities import idencode
+
 from . import constants
 
+_session = None
+
+# Encodes with the default alphabet of Hashids, unlike the ids in the APIs.
+codec = idencode.Codec(
+    min_length=settings.HASHID_MIN_LENGTH, salt=settings.HASHID_SALT)
+
 
 def encode(value):
     """
@@ -28,12 +36,8 @@ def encode(value):
     Returns:
         hashed string.
     """
-    hasher = Hashids(
-        min_length=settings.HASHID_MIN_LENGTH,
-        salt=settings.HASHID_SALT)
     try:
-        value = int(value)
-        return hasher.encode(value)
+        return codec.encode(value)
     except:
         return None
 
@@ -47,11 +51,8 @@ def decode(value):
     Returns:
         int value.
     """
-    hasher = Hashids(
-        min_length=settings.HASHID_MIN_LENGTH,
-        salt=settings.HASHID_SALT)
     try:
-        return hasher.decode(value)[0]
+        return codec.decode(value)
     except:
         return None
 
@@ -75,6 +76,22 @@ def decrypt(code, encryption_key=settings.BLOCKCHAIN_ENCRYPTION_KEY):
     return message.decode('utf-8')
 
 
+def get_session():
+    """
+    Returns the HTTP session to the blockchain middleware, created once per
+    process so that connections are kept alive and reused across requests.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=constants.BC_POOL_CONNECTIONS,
+            pool_maxsize=constants.BC_POOL_MAXSIZE)
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+
 @shared_task(name='post_blockchain_request')
 def post_blockchain_request(request_id):
     """
@@ -93,10 +110,10 @@ def post_blockchain_request(request_id):
 
         request.prepare_header()
         request.prepare_body()
-        response = requests.post(
+        response = get_session().post(
             url=settings.BC_MIDDLEWARE_BASE_URL,
             data=json.dumps(request.body, cls=DjangoJSONEncoder),
-            headers=request.header)
+            headers=request.header, timeout=constants.BC_REQUEST_TIMEOUT)
         response_json = response.json()
         BlockchainRequest.objects.filter(
             id=request_id).update(
@@ -114,6 +131,22 @@ def post_blockchain_request(request_id):
         print(e)
 
 
+@shared_task(name='submit_message_batches')
+def submit_message_batches():
+    """
+    Function to submit the queued consensus messages, batched per topic.
+    Each batch is submitted as a single message with the merkle root of
+    the messages in it.
+    """
+    from .models.message_batch import SubmitMessageBatchRequest
+    try:
+        return len(SubmitMessageBatchRequest.submit_pending())
+    except Exception as e:
+        capture_exception(e)
+        print(e)
+    return 0
+
+
 def format_json_readonly(data):
     """
     Function to display pretty version for admin read only.
@@ -0,0 +1,87 @@
+"""Command to benchmark signing and submission of blockchain requests."""
+
+import json
+import time
+
+import requests
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from v1.blockchain import library
+from v1.blockchain import merkle
+from v1.blockchain.certifier import APIAuth
+
+
+class Command(BaseCommand):
+    """
+    Reports the throughput of the steps in submitting consensus messages:
+    signing the auth header with and without the cached key, posting to
+    the middleware with a new connection each time and with the pooled
+    session, and building merkle batches with proofs.
+    Run it against the stub from run_blockchain_stub with --no-callback.
+    """
+    help = 'Benchmark signing and submission of blockchain requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--url', type=str,
+            default=settings.BC_MIDDLEWARE_BASE_URL)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def report(self, name, count, elapsed):
+        self.stdout.write(
+            f'{name}: {count} in {elapsed:.2f}s '
+            f'({count / elapsed:.1f}/second)')
+
+    def sign(self, cached):
+        auth = APIAuth(access_key_id=settings.BLOCKCHAIN_CLIENT_ID)
+        if cached:
+            return auth.sign_auth_header(
+                key_file=settings.BLOCKCHAIN_PRIVATE_KEY_PATH)
+        key = auth._load_private_key(str(settings.BLOCKCHAIN_PRIVATE_KEY_PATH))
+        return auth.sign_auth_header(key=key)
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        for cached in (False, True):
+            start = time.perf_counter()
+            for _ in range(count):
+                self.sign(cached)
+            self.report(
+                'Signing with cached key' if cached else 'Signing',
+                count, time.perf_counter() - start)
+
+        header = {
+            'Accept': 'application/json',
+            'Authorization': self.sign(True),
+            'Content-Type': 'application/json'
+        }
+        body = json.dumps({
+            'action': 0, 'ean_no': 'benchmark', 'params': {}})
+        posts = (
+            ('Posting with new connections', requests.post),
+            ('Posting with pooled session', library.get_session().post))
+        for name, post in posts:
+            start = time.perf_counter()
+            for _ in range(count):
+                post(url=options['url'], data=body, headers=header,
+                     timeout=30)
+            self.report(name, count, time.perf_counter() - start)
+
+        batch_size = options['batch_size']
+        messages = [
+            json.dumps({'index': i, 'message': 'x' * 200})
+            for i in range(batch_size)]
+        start = time.perf_counter()
+        levels = merkle.build_tree([merkle.hash_leaf(m) for m in messages])
+        proofs = [merkle.get_proof(levels, i) for i in range(batch_size)]
+        self.report(
+            'Batching messages', batch_size, time.perf_counter() - start)
+        root = merkle.get_root(levels)
+        start = time.perf_counter()
+        assert all(
+            merkle.verify_proof(message, proof, root)
+            for message, proof in zip(messages, proofs))
+        self.report(
+            'Verifying proofs', batch_size, time.perf_counter() - start)
@@ -0,0 +1,101 @@
+"""Command to run a local stub of the blockchain middleware."""
+
+import json
+import time
+import uuid
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from django.core.management.base import BaseCommand
+
+
+class StubMiddlewareHandler(BaseHTTPRequestHandler):
+    """
+    Accepts requests the same way the blockchain middleware does. Each
+    request is answered with a receipt right away, and the callback url of
+    the request is called with a fake transaction after the delay.
+    """
+    protocol_version = 'HTTP/1.1'
+    callback_delay = 1.0
+    callback = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw_body = self.rfile.read(length)
+        if not self.headers.get('Authorization', '').startswith('JWT '):
+            return self.respond(401, {
+                'success': False, 'message': 'Missing authorization.'})
+        try:
+            body = json.loads(raw_body)
+        except ValueError:
+            return self.respond(400, {
+                'success': False, 'message': 'Invalid body.'})
+        receipt = uuid.uuid4().hex
+        self.respond(200, {'success': True, 'data': {'receipt': receipt}})
+        if self.callback and body.get('callback_url'):
+            threading.Thread(
+                target=self.send_callback, args=(body, raw_body),
+                daemon=True).start()
+
+    def respond(self, status, data):
+        response = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def send_callback(self, body, raw_body):
+        time.sleep(self.callback_delay)
+        data = {
+            'success': True,
+            'data': {
+                'transactionId': f'0.0.2@{time.time():.9f}',
+                'transactionHash': hashlib.sha384(raw_body).hexdigest(),
+            }
+        }
+        try:
+            requests.post(body['callback_url'], json=data, timeout=10)
+        except requests.RequestException as e:
+            print(f'Callback to {body["callback_url"]} failed. {e}')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super(StubMiddlewareHandler, self).log_message(format, *args)
+
+
+class Command(BaseCommand):
+    """
+    Runs a local stand-in for the blockchain middleware to develop and
+    benchmark blockchain submission without reaching Hedera.
+    Point BC_MIDDLEWARE_BASE_URL to the address it listens on.
+    """
+    help = 'Run a local stub of the blockchain middleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', type=str, default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8500)
+        parser.add_argument('--callback-delay', type=float, default=1.0,
+            help='Seconds to wait before calling the callback url.')
+        parser.add_argument('--no-callback', action='store_true',
+            help='Do not call the callback urls of the requests.')
+        parser.add_argument('--verbose', action='store_true')
+
+    def handle(self, *args, **options):
+        StubMiddlewareHandler.callback_delay = options['callback_delay']
+        StubMiddlewareHandler.callback = not options['no_callback']
+        server = ThreadingHTTPServer(
+            (options['host'], options['port']), StubMiddlewareHandler)
+        server.verbose = options['verbose']
+        self.stdout.write(
+            f'Blockchain middleware stub running on '
+            f'http://{options["host"]}:{options["port"]}/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,90 @@
+"""
+Merkle tree helpers for batching consensus messages.
+
+Messages of many objects are submitted to a topic as a single consensus
+message carrying the merkle root of their hashes. The inclusion proof
+saved for each object is enough to verify that its message is part of
+the submitted root.
+
+Leaves and inner nodes are hashed with different prefixes, and an odd
+node at any level is carried up as such instead of being paired with
+itself, so that no two different lists of messages share a root.
+"""
+import hashlib
+
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+LEFT = 'L'
+RIGHT = 'R'
+
+
+def hash_leaf(message):
+    """
+    Returns hex digest of the leaf for a message.
+    """
+    if isinstance(message, str):
+        message = message.encode('utf-8')
+    return hashlib.sha256(LEAF_PREFIX + message).hexdigest()
+
+
+def hash_node(left, right):
+    """
+    Returns hex digest of the inner node of two hex digests.
+    """
+    return hashlib.sha256(
+        NODE_PREFIX + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def build_tree(leaves):
+    """
+    Builds the tree from leaf digests and returns the list of levels, from
+    the leaves up to the root.
+    """
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [
+            hash_node(level[i], level[i + 1])
+            for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def get_root(levels):
+    """
+    Returns the root digest of a tree built with build_tree.
+    """
+    if not levels or not levels[0]:
+        return ''
+    return levels[-1][0]
+
+
+def get_proof(levels, index):
+    """
+    Returns inclusion proof of the leaf at the index as a list of
+    [side, digest] pairs, side being the side of the sibling.
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            side = LEFT if sibling < index else RIGHT
+            proof.append([side, level[sibling]])
+        index //= 2
+    return proof
+
+
+def verify_proof(message, proof, root):
+    """
+    Verifies that the message is included in the tree with the root.
+    """
+    digest = hash_leaf(message)
+    for side, sibling in proof:
+        if side == LEFT:
+            digest = hash_node(sibling, digest)
+        else:
+            digest = hash_node(digest, sibling)
+    return digest == root
@@ -0,0 +1,44 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('blockchain', '0002_createtopicrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SubmitMessageBatchRequest',
+            fields=[
+                ('blockchainrequest_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, serialize=False, to='blockchain.blockchainrequest')),
+                ('topic_id', models.CharField(default='', max_length=100)),
+                ('merkle_root', models.CharField(default='', max_length=64)),
+                ('message_id', models.CharField(default='', max_length=500)),
+                ('message_hash', models.CharField(default='', max_length=500)),
+            ],
+            bases=('blockchain.blockchainrequest',),
+        ),
+        migrations.CreateModel(
+            name='ConsensusMessageLeaf',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic_id', models.CharField(default='', max_length=100)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('message', models.TextField(blank=True, default='')),
+                ('leaf_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('proof', models.JSONField(blank=True, default=list)),
+                ('index', models.IntegerField(blank=True, default=None, null=True)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leaves', to='blockchain.submitmessagebatchrequest')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['content_type', 'object_id'], name='blockchain_leaf_object_idx')],
+            },
+        ),
+    ]
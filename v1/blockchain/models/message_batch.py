@@ -0,0 +1,171 @@
+""" Models for submitting consensus messages in batches """
+import json
+
+from django.db import models
+from django.db import transaction
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.fields import GenericForeignKey
+
+from .. import constants
+from .. import merkle
+
+from .callback_auth import CallBackToken
+from .request import BlockchainRequest
+
+# Create your models here.
+
+
+class SubmitMessageBatchRequest(BlockchainRequest):
+    """
+    Request Model for submitting the messages of many objects to a topic
+    as a single consensus message.
+
+    Only the merkle root of the messages is submitted. Each message is
+    saved in a ConsensusMessageLeaf along with its inclusion proof, which
+    can be verified against the root.
+    """
+    action = constants.ACTION_CREATE_CONSENSUS
+
+    topic_id = models.CharField(max_length=100, default='')
+    merkle_root = models.CharField(max_length=64, default='')
+    message_id = models.CharField(default='', max_length=500)
+    message_hash = models.CharField(default='', max_length=500)
+
+    @classmethod
+    def create_batch(cls, topic_id, leaves):
+        """
+        Creates the batch request for the leaves, computing the merkle
+        root and the proof of each leaf from the current message of its
+        object.
+        """
+        for leaf in leaves:
+            leaf.message = leaf.related_object.message
+            leaf.leaf_hash = merkle.hash_leaf(leaf.message)
+        levels = merkle.build_tree([leaf.leaf_hash for leaf in leaves])
+        batch = cls.objects.create(
+            callback_token=CallBackToken.objects.create(),
+            topic_id=topic_id, merkle_root=merkle.get_root(levels))
+        for index, leaf in enumerate(leaves):
+            leaf.batch = batch
+            leaf.index = index
+            leaf.proof = merkle.get_proof(levels, index)
+        ConsensusMessageLeaf.objects.bulk_update(
+            leaves, ['batch', 'index', 'message', 'leaf_hash', 'proof'])
+        return batch
+
+    @classmethod
+    def submit_pending(cls):
+        """
+        Batches the queued messages per topic and submits each batch.
+        Leaves are locked while being batched, so that concurrent runs
+        do not pick the same messages.
+        """
+        batches = []
+        with transaction.atomic():
+            pending = ConsensusMessageLeaf.objects.filter(
+                batch__isnull=True).select_for_update(
+                skip_locked=True).order_by('id')
+            leaves_by_topic = {}
+            orphans = []
+            for leaf in pending.prefetch_related('related_object'):
+                if leaf.related_object is None:
+                    orphans.append(leaf.id)
+                    continue
+                leaves_by_topic.setdefault(leaf.topic_id, []).append(leaf)
+            ConsensusMessageLeaf.objects.filter(id__in=orphans).delete()
+            for topic_id, leaves in leaves_by_topic.items():
+                for start in range(
+                        0, len(leaves), constants.MESSAGE_BATCH_SIZE):
+                    batch = cls.create_batch(
+                        topic_id,
+                        leaves[start:start + constants.MESSAGE_BATCH_SIZE])
+                    batch.send()
+                    batches.append(batch)
+        return batches
+
+    def prepare_body(self):
+        """ Over-ridden prepare_body to format body for the corresponding reques type """
+        body = super(SubmitMessageBatchRequest, self).prepare_body()
+        body['params'] = {
+            'topic_id': self.topic_id,
+            'message': json.dumps({
+                'merkle_root': self.merkle_root,
+                'count': self.leaves.count(),
+            })
+        }
+        self.body = body
+        self.save()
+        return body
+
+    def top_up_initiator_wallet(self, retry=True):
+        """
+        Batches are paid from the treasury account and have no initiator
+        wallet to top-up.
+        """
+        return False
+
+    def handle_response(self, response):
+        """ Function implemented in the subclass to handle response format """
+        bc_data = response['data']
+        self.message_id = bc_data['transactionId']
+        self.message_hash = bc_data['transactionHash']
+        self.save()
+        for leaf in self.leaves.prefetch_related('related_object'):
+            if leaf.related_object:
+                leaf.related_object.update_message_hash(bc_data)
+        return True
+
+
+class ConsensusMessageLeaf(models.Model):
+    """
+    Message of an object queued to be submitted in a batch, and its
+    inclusion proof once the batch is created.
+
+    Attributes:
+        batch       : Batch request the message is submitted in.
+        topic_id    : Topic the message is submitted to.
+        related_object : Object whose message is submitted.
+        message     : Message as it was when the batch was created.
+        leaf_hash   : Hash of the message.
+        proof       : Inclusion proof of the message in the merkle root
+                      of the batch, as list of [side, hash] pairs.
+        index       : Position of the message in the batch.
+    """
+
+    batch = models.ForeignKey(
+        SubmitMessageBatchRequest, on_delete=models.SET_NULL,
+        related_name='leaves', null=True, blank=True, default=None)
+    topic_id = models.CharField(max_length=100, default='')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    related_object = GenericForeignKey('content_type', 'object_id')
+
+    message = models.TextField(default='', blank=True)
+    leaf_hash = models.CharField(max_length=64, default='', blank=True)
+    proof = models.JSONField(default=list, blank=True)
+    index = models.IntegerField(null=True, blank=True, default=None)
+
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(
+            fields=['content_type', 'object_id'],
+            name='blockchain_leaf_object_idx')]
+
+    def __str__(self):
+        """ str representation """
+        return f"{self.content_type} {self.object_id} : {self.id}"
+
+    def is_pending(self):
+        """ Returns True if the message is queued or is being submitted """
+        return self.batch is None or self.batch.is_pending()
+
+    def verify(self):
+        """
+        Verifies that the message is included in the root submitted for
+        the batch.
+        """
+        if not self.batch or not self.batch.merkle_root:
+            return False
+        return merkle.verify_proof(
+            self.message, self.proof, self.batch.merkle_root)
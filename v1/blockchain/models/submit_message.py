@@ -1,12 +1,14 @@
 """ Custom Models for Creating Blockchain Key """
 from sentry_sdk import capture_exception
 from django.db import models
+from django.contrib.contenttypes.models import ContentType
 
 from .. import library
 from .. import constants
 
 from .callback_auth import CallBackToken
 from .request import BlockchainRequest
+from .message_batch import ConsensusMessageLeaf
 
 from ..constants import HEDERA_CONSENSUS_MESSAGE_SIZE
 
@@ -95,7 +97,49 @@ class AbstractConsensusMessage(models.Model):
         """ To be implemented in the subclass to return name """
         raise NotImplementedError()
 
-    def submit_info_message(self):
+    def get_message_leaves(self):
+        """
+        Returns the batched messages of the object, latest first.
+        """
+        return ConsensusMessageLeaf.objects.filter(
+            content_type=ContentType.objects.get_for_model(self),
+            object_id=self.id).select_related('batch').order_by('-id')
+
+    @property
+    def message_proof(self):
+        """
+        Returns the latest batched message of the object that is
+        submitted, which holds the proof of its inclusion in the batch.
+        """
+        return self.get_message_leaves().filter(
+            batch__status=constants.BC_REQUEST_STATUS_COMPLETED).first()
+
+    def queue_message(self):
+        """
+        Queues the message to be submitted to the topic along with the
+        messages of other objects, unless it is already queued or being
+        submitted. The batches are submitted periodically.
+        """
+        for leaf in self.get_message_leaves():
+            if leaf.is_pending():
+                return False
+            break
+        ConsensusMessageLeaf.objects.create(
+            related_object=self, topic_id=self.topic_id)
+        return True
+
+    def submit_info_message(self, batch=True):
+        """
+        Submits the message of the object. By default, the message is
+        queued to be submitted in a batch. With batch as False, it is
+        submitted right away as a message of its own.
+        """
+        if batch:
+            try:
+                return self.queue_message()
+            except Exception as e:
+                capture_exception(e)
+                return False
         success, message = self.message_pre_check()
         if not success:
             return False
@@ -9,6 +9,8 @@ from . import data_generators
 from . import validators
 from . import template_config
 
+BULK_UPLOAD_CHUNK_SIZE = 50
+
 
 class TemplateType(CallableIntegerChoices):
     TRANSACTION = 101, template_config.TransactionTemplate, _('Transaction')
@@ -46,3 +48,19 @@ class BulkUploadStatuses(models.IntegerChoices):
     IN_PROGRESS = 401, _('In Progress')
     COMPLETED = 501, _('Completed')
     FAILED = 601, _('Failed')
+
+OFFLINE_SYNC_CHUNK_SIZE = 50
+OFFLINE_SYNC_MAX_RECORDS = 1000
+
+
+class SyncRecordType(models.IntegerChoices):
+    FARMER = 101, _('Farmer')
+    EXTERNAL_TRANSACTION = 201, _('External Transaction')
+    INTERNAL_TRANSACTION = 211, _('Internal Transaction')
+    BATCH_CLAIM = 301, _('Batch Claim')
+
+
+class SyncRecordStatus(models.IntegerChoices):
+    CREATED = 101, _('Created')
+    DUPLICATE = 201, _('Duplicate')
+    FAILED = 301, _('Failed')
@@ -7,21 +7,38 @@ All function takes in 3 parameters as standard.
 tenant          : Currently active tenant.
 node            : Current node.
 supply_chain    : Current supply chain.
+
+Only the required columns are fetched with values_list, without
+instantiating the models.
 """
 
+from utilities.functions import encode
+
 from v1.tenants import models as tenant_models
 from v1.products import models as product_models
 
 from v1.nodes import constants as node_constants
 
 
+def _options(queryset, name_field='name'):
+    """
+    Returns list of tuple pairs of name and encoded id of the objects
+    in the queryset.
+    """
+    return [
+        (name, encode(pk))
+        for name, pk in queryset.values_list(name_field, 'id')]
+
+
 def get_countries(tenant, node, supply_chain, **kwargs):
     """
     Gets the selected countries for the tenant and return as list of tuple
     pairs of country name and encoded id
     """
-    countries = tenant.countries.all() or tenant_models.Country.objects.all()
-    return [(c.name, c.idencode) for c in countries]
+    countries = tenant.countries.all()
+    if not countries.exists():
+        countries = tenant_models.Country.objects.all()
+    return _options(countries)
 
 
 def get_provinces(tenant, node, supply_chain, **kwargs):
@@ -29,10 +46,8 @@ def get_provinces(tenant, node, supply_chain, **kwargs):
     Gets the provinces of selected countries for the tenant and
     return as list of tuple pairs of province name and encoded id
     """
-    return [
-        (p.name, p.idencode) for p in tenant_models.Province.objects.filter(
-            country__tenants=tenant)
-    ]
+    return _options(
+        tenant_models.Province.objects.filter(country__tenants=tenant))
 
 
 def get_producers(tenant, node, supply_chain, **kwargs):
@@ -40,9 +55,11 @@ def get_producers(tenant, node, supply_chain, **kwargs):
     Gets the list of producers directly connected to the node in the
     selected supply chain and returns as list of tuple pairs.
     """
+    producers = node.get_connections(supply_chain=supply_chain).filter(
+        type=node_constants.NodeType.PRODUCER)
     return [
-        (f"{n.name}, {n.city}", n.idencode) for n in node.get_connections(
-            supply_chain=supply_chain).filter(type=node_constants.NodeType.PRODUCER)
+        (f"{name}, {city}", encode(pk))
+        for name, city, pk in producers.values_list('name', 'city', 'id')
     ]
 
 
@@ -50,28 +67,26 @@ def get_products(tenant, node, supply_chain, **kwargs):
     """
     Gets the list of products in the supply chain.
     """
-    return [(p.name, p.idencode) for p in supply_chain.products.all()]
+    return _options(supply_chain.products.all())
 
 
 def get_operations(tenant, node, supply_chain, **kwargs):
     """
     Gets the list of operations of the tenant.
     """
-    return [
-        (o.name, o.idencode) for o in tenant.node_operations.filter(
-            node_type=node_constants.NodeType.PRODUCER
-        )]
+    return _options(tenant.node_operations.filter(
+        node_type=node_constants.NodeType.PRODUCER))
 
 
 def get_currencies(tenant, node, supply_chain, **kwargs):
     """
     Gets the list of currencies enabled for the tenant.
     """
-    return [(c.code, c.idencode) for c in tenant.currencies.all()]
+    return _options(tenant.currencies.all(), 'code')
 
 
 def get_units(tenant, node, supply_chain, **kwargs):
     """
     Gets the list of units enabled for the tenant.
     """
-    return [(u.name, u.idencode) for u in product_models.Unit.objects.all()]
+    return _options(product_models.Unit.objects.all())
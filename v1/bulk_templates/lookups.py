@@ -0,0 +1,94 @@
+"""
+Lookup index over the dropdown options of template fields.
+
+Data generators return options as list of tuple pairs of name and encoded
+id. The index is built once per upload so that each cell is matched with
+dict lookups instead of scanning the options.
+"""
+import difflib
+
+
+class OptionIndex:
+    """
+    Index over (name, idencode) option pairs of a template field.
+
+    Values are matched exactly first and then case-insensitively, against
+    both the encoded ids and the names. Case-insensitive keys shared by
+    more than one option are left out, so that they never resolve to the
+    wrong option.
+
+    The index can be iterated, indexed and measured like the list of
+    options it is built from.
+    """
+
+    def __init__(self, options):
+        """
+        Initialize with the options returned by a data generator.
+        """
+        self.items = list(options)
+        self.options = dict(self.items)
+        self.names = {idencode: name for name, idencode in self.items}
+        self._folded = {}
+        self._ambiguous = set()
+        for name, idencode in self.items:
+            self._add_folded(name, idencode)
+            self._add_folded(idencode, idencode)
+        self._folded_names = {}
+        for name in self.options:
+            self._folded_names.setdefault(self._fold(name), name)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __bool__(self):
+        return bool(self.items)
+
+    @staticmethod
+    def _fold(value):
+        """
+        Returns the key used for case-insensitive matching.
+        """
+        return str(value).strip().casefold()
+
+    def _add_folded(self, key, idencode):
+        key = self._fold(key)
+        if key in self._ambiguous:
+            return
+        if self._folded.get(key, idencode) != idencode:
+            self._ambiguous.add(key)
+            del self._folded[key]
+            return
+        self._folded[key] = idencode
+
+    def resolve(self, value):
+        """
+        Returns the encoded id of the option matching the value, which can
+        either be the encoded id or the name of the option. Returns None
+        when nothing matches.
+        """
+        if value in self.names:
+            return value
+        if value in self.options:
+            return self.options[value]
+        return self._folded.get(self._fold(value))
+
+    def get_name(self, idencode, default=None):
+        """
+        Returns name of the option with the encoded id.
+        """
+        return self.names.get(idencode, default)
+
+    def suggest(self, value, count=3, cutoff=0.6):
+        """
+        Returns names of options closely matching the value, to be
+        suggested when a value does not match any option.
+        """
+        matches = difflib.get_close_matches(
+            self._fold(value), self._folded_names.keys(), count, cutoff)
+        return [self._folded_names[match] for match in matches]
@@ -0,0 +1,54 @@
+"""Command to benchmark the bulk upload executor."""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from v1.bulk_templates import models as bulk_models
+from v1.bulk_templates import tasks
+
+
+class Rollback(Exception):
+    """Raised to discard the uploaded rows after benchmarking."""
+
+
+class Command(BaseCommand):
+    """
+    Runs the chunks of a validated bulk upload in-process and reports the
+    rows saved per second. Everything saved is rolled back at the end, so
+    the bulk upload can be benchmarked repeatedly.
+    """
+    help = 'Benchmark bulk upload throughput in rows/second.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('upload_id', type=str,
+            help='Encoded id of a validated bulk upload.')
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        bulk_upload = bulk_models.BulkUpload.objects.select_related(
+            'tenant', 'node', 'supply_chain', 'template', 'creator'
+            ).get(id__encoded=options['upload_id'])
+        chunk_size = options['chunk_size'] or \
+            tasks.constants.BULK_UPLOAD_CHUNK_SIZE
+        total = len(bulk_upload.validated_data)
+        counters = {}
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                for index in range(0, total, chunk_size):
+                    _, chunk_counters = tasks.process_chunk(
+                        bulk_upload, index, index + chunk_size)
+                    for key, value in chunk_counters.items():
+                        counters[key] = counters.get(key, 0) + value
+                elapsed = time.perf_counter() - start
+                raise Rollback
+        except Rollback:
+            pass
+        rows = sum(counters.values())
+        self.stdout.write(
+            f'rows={rows} chunk_size={chunk_size} '
+            f'elapsed={elapsed:.2f}s '
+            f'rows/second={rows / elapsed if elapsed else 0:.2f} '
+            f'{counters}')
@@ -0,0 +1,95 @@
+"""Command to benchmark streaming ingestion and validation of templates."""
+
+import io
+import time
+import datetime
+import tracemalloc
+
+from openpyxl import Workbook
+from openpyxl.utils import column_index_from_string
+
+from django.core.management.base import BaseCommand
+
+from v1.nodes import models as node_models
+from v1.bulk_templates import models as bulk_models
+from v1.bulk_templates import constants as temp_consts
+
+
+SAMPLE_VALUES = {
+    temp_consts.TemplateFieldTypes.PRIMARY_KEY: None,
+    temp_consts.TemplateFieldTypes.STRING: 'Sample',
+    temp_consts.TemplateFieldTypes.INTEGER: 1,
+    temp_consts.TemplateFieldTypes.POSITIVE_INTEGER: 1,
+    temp_consts.TemplateFieldTypes.FLOAT: 1.5,
+    temp_consts.TemplateFieldTypes.POSITIVE_FLOAT: 1.5,
+    temp_consts.TemplateFieldTypes.DATE: datetime.date.today(),
+    temp_consts.TemplateFieldTypes.PHONE: '+14155552671',
+    temp_consts.TemplateFieldTypes.EMAIL: 'sample@example.com',
+    temp_consts.TemplateFieldTypes.BOOL: 'Yes',
+}
+
+
+class Command(BaseCommand):
+    """
+    Generates a synthetic excel for a template and reports the rows read
+    and validated per second along with the peak memory used.
+    Nothing is saved to the database.
+    """
+    help = 'Benchmark streaming excel ingestion and validation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('template_id', type=str,
+            help='Encoded id of the template.')
+        parser.add_argument('node_id', type=str,
+            help='Encoded id of the node uploading the excel.')
+        parser.add_argument('--rows', type=int, default=100000)
+
+    def build_file(self, template, node, supply_chain, rows):
+        """
+        Builds the excel in write-only mode and returns it as a file.
+        """
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(template.sheet_name)
+        pws = wb.create_sheet(template.processing_sheet_name)
+        width = max(
+            col for _, col, _ in template.get_column_map()) + 1
+        data_row, processing_row = [None] * width, [None] * width
+        for field, col, from_processing in template.get_column_map():
+            if from_processing:
+                options = template.get_generated_data(
+                    node.tenant, node, supply_chain,
+                    field.data_generator, field)
+                processing_row[col] = options[0][1] if options else None
+            else:
+                data_row[col] = SAMPLE_VALUES.get(field.type)
+        extras_col = column_index_from_string(template.extras_start_col)
+        for _ in range(1, template.data_row):
+            ws.append([])
+            pws.append([None] * extras_col)
+        for _ in range(rows):
+            ws.append(data_row)
+            pws.append(processing_row)
+        file = io.BytesIO()
+        wb.save(file)
+        file.seek(0)
+        return file
+
+    def handle(self, *args, **options):
+        template = bulk_models.Template.objects.get(
+            id__encoded=options['template_id'])
+        node = node_models.Node.objects.select_related('tenant').get(
+            id__encoded=options['node_id'])
+        supply_chain = node.supply_chains.first().supply_chain
+        file = self.build_file(template, node, supply_chain, options['rows'])
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        validated_data, _ = template.validate_data(
+            template.iter_data(file), node.tenant, node, supply_chain)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.stdout.write(
+            f'rows={len(validated_data)} elapsed={elapsed:.2f}s '
+            f'rows/second={len(validated_data) / elapsed:.2f} '
+            f'peak_memory={peak / (1024 * 1024):.1f}MB')
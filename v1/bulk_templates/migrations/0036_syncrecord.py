@@ -0,0 +1,32 @@
+# Generated by Django 4.0.4 on 2026-10-18 15:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0053_alter_tag_creator_alter_tag_updater'),
+        ('nodes', '0041_nodedocument_openai_file_id'),
+        ('bulk_templates', '0035_alter_template_type_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100, verbose_name='Idempotency Key')),
+                ('type', models.IntegerField(choices=[(101, 'Farmer'), (201, 'External Transaction'), (211, 'Internal Transaction'), (301, 'Batch Claim')], verbose_name='Record Type')),
+                ('result', models.JSONField(blank=True, default=dict, verbose_name='Result')),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_records', to='nodes.node', verbose_name='Node')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_records', to='tenants.tenant', verbose_name='Tenant')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='syncrecord',
+            constraint=models.UniqueConstraint(fields=('node', 'key'), name='bulk_sync_record_unique_key'),
+        ),
+    ]
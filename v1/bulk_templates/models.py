@@ -1,4 +1,5 @@
 """Models of the app Bulk Templates."""
+import itertools
 import openpyxl
 import sentry_sdk
 from openpyxl import Workbook
@@ -21,6 +22,7 @@ from v1.nodes import constants as node_constants
 from v1.transactions import constants as transaction_constants
 from v1.bulk_templates import constants as temp_consts
 from v1.bulk_templates import notifications as bulk_notification
+from v1.bulk_templates.lookups import OptionIndex
 
 from . import excel_styles as styles
 from . import tasks
@@ -373,15 +375,12 @@ class Template(AbstractBaseModel):
     
     def get_extras(self, wb):
         pws = wb[self.processing_sheet_name]
-        i = 0
+        rows = list(pws.iter_rows(min_row=1, max_row=2, values_only=True))
+        keys, values = (rows + [(), ()])[:2]
+        i = column_index_from_string(self.extras_start_col) - 1
         d = {}
-        while True:
-            col = get_column_letter(column_index_from_string(self.extras_start_col) + i)
-            key = pws[f'{col}1'].value
-            value = pws[f'{col}2'].value
-            if not key:
-                break
-            d[key] = value
+        while i < len(keys) and keys[i]:
+            d[keys[i]] = values[i] if i < len(values) else None
             i += 1
         return d
 
@@ -389,35 +388,68 @@ class Template(AbstractBaseModel):
         """
         This function was moved here from TemplateFieldType.get_generated_data
         to optimize the code and avoid re-generation of data for the field in each row.
+        The data is returned as an OptionIndex, built once for all the rows.
         """
         if not generator_type:
-            return []
+            return OptionIndex([])
         if generator_type in self.generated_data_set:
             return self.generated_data_set[generator_type]
-        self.generated_data_set[generator_type] = field.get_generated_data(
-            tenant, node, supply_chain, **self.extras)
+        self.generated_data_set[generator_type] = OptionIndex(
+            field.get_generated_data(
+                tenant, node, supply_chain, **self.extras))
         return self.generated_data_set[generator_type]
 
+    def get_column_map(self):
+        """
+        Returns the template fields with the index of their column and
+        whether the value is read from the processing sheet, resolved once
+        for all the rows.
+        """
+        return [
+            (
+                tem_field.field,
+                column_index_from_string(tem_field.column_pos) - 1,
+                bool(tem_field.field.data_generator)
+            )
+            for tem_field in self.template_fields.select_related('field')
+        ]
+
     def validate_data(self, data, tenant, node, supply_chain):
+        """
+        Validates rows from any iterable of row dicts. Template fields are
+        fetched once and rows are consumed one at a time, so rows can be
+        streamed in from iter_data. The validated rows are all kept in
+        memory, as the template config checks them for duplicates across
+        the sheet and they are saved together in BulkUpload.validated_data,
+        so memory grows with the number of rows.
+        """
         sheet_valid = True
         sheet_data = []
         error_count = 0
+        fields = [field for field, _, _ in self.get_column_map()]
+        # Start the rows before generating dropdown data, since iter_data
+        # reads the extras from the file only when the first row is pulled.
+        data = iter(data)
+        first_row = next(data, None)
+        data = itertools.chain([first_row], data) if first_row else []
+        generated_data = {
+            field.key: self.get_generated_data(
+                tenant, node, supply_chain, field.data_generator, field)
+            for field in fields
+        }
         for row in data:
             row_error_count = 0
             row_valid = True
             row_data = {}
 
-            for tem_field in self.template_fields.select_related('field').filter():
-                value = row.get(tem_field.field.key, None)
-                cell_validation = tem_field.field.validate(
-                    value,
-                    self.get_generated_data(
-                        tenant, node, supply_chain, tem_field.field.data_generator, tem_field.field)
-                )
+            for field in fields:
+                value = row.get(field.key, None)
+                cell_validation = field.validate(
+                    value, generated_data[field.key])
                 row_error_count += not cell_validation['is_valid']
-                row_data[tem_field.field.key] = cell_validation
+                row_data[field.key] = cell_validation
                 row_valid = row_valid and cell_validation['is_valid']
-                row[tem_field.field.key] = cell_validation['value']
+                row[field.key] = cell_validation['value']
             row_data['force_create'] = {
                 "value": row.get('force_create', False),
                 "message": "",
@@ -446,37 +478,49 @@ class Template(AbstractBaseModel):
 
         return util_functions.serialize_promises(sheet_data), sheet_valid and valid
 
-    def extract_data(self, excel_file):
-        wb = openpyxl.load_workbook(excel_file, data_only=True)
-        self.extras = self.get_extras(wb)
-        self.ws = wb[self.sheet_name]
-        pws = wb[self.processing_sheet_name]
-        data = []
-        emtpy_rows = 0
-        row_index = self.data_row
-        while emtpy_rows <= 10:
-            row_filled = False
-            item = {}
-            for tem_field in self.template_fields.select_related('field').all():
-                cell = f"{tem_field.column_pos}{row_index}"
-                if tem_field.field.data_generator:
-                    cell_value = pws[cell].value
+    def iter_data(self, excel_file):
+        """
+        Generator yielding the filled rows of the excel as dicts.
+        The workbook is opened in read-only mode and streamed row by row,
+        so that memory does not grow with the size of the sheet.
+        Stops after more than 10 consecutive empty rows.
+        """
+        wb = openpyxl.load_workbook(
+            excel_file, read_only=True, data_only=True)
+        try:
+            self.extras = self.get_extras(wb)
+            column_map = self.get_column_map()
+            rows = itertools.zip_longest(
+                wb[self.sheet_name].iter_rows(
+                    min_row=self.data_row, values_only=True),
+                wb[self.processing_sheet_name].iter_rows(
+                    min_row=self.data_row, values_only=True),
+                fillvalue=())
+            emtpy_rows = 0
+            for data_row, processing_row in rows:
+                row_filled = False
+                item = {}
+                for field, col_index, from_processing in column_map:
+                    row = processing_row if from_processing else data_row
+                    cell_value = row[col_index] if col_index < len(row) else None
+                    item[field.key] = cell_value
+                    row_filled = row_filled or (
+                            bool(cell_value) and
+                            cell_value is not False and
+                            field.key not in self.extras.keys()
+                    )
+                if row_filled:
+                    emtpy_rows = 0
+                    yield item
                 else:
-                    cell_value = self.ws[cell].value
-                item[tem_field.field.key] = cell_value
-                row_filled = row_filled or (
-                        bool(cell_value) and
-                        cell_value is not False and
-                        tem_field.field.key not in self.extras.keys()
-                )
-            if row_filled:
-                emtpy_rows = 0
-                data.append(item)
-            else:
-                emtpy_rows += 1
-            row_index += 1
+                    emtpy_rows += 1
+                    if emtpy_rows > 10:
+                        break
+        finally:
+            wb.close()
 
-        return data
+    def extract_data(self, excel_file):
+        return list(self.iter_data(excel_file))
 
 
 class TemplateFieldType(AbstractBaseModel):
@@ -541,7 +585,25 @@ class TemplateFieldType(AbstractBaseModel):
             tenant, node, supply_chain, **kwargs)
 
     def validate(self, value, generated_data):
+        """
+        Validates the value of a cell. For fields with a data generator,
+        generated_data is the OptionIndex of the field and the value is
+        resolved to the encoded id of the matching option, with
+        suggestions of close matches when nothing matches.
+        """
+        if not isinstance(generated_data, OptionIndex):
+            generated_data = OptionIndex(generated_data)
+        if self.data_generator and value:
+            value = generated_data.resolve(value) or value
         data = temp_consts.TemplateFieldTypes(self.type).function(value, self.required)
+        if self.data_generator and data['is_valid'] and data['value']:
+            if data['value'] not in generated_data.names:
+                data['message'] += _("Not a valid option.")
+                suggestions = generated_data.suggest(data['value'])
+                if suggestions:
+                    data['message'] += \
+                        f" {_('Did you mean')} {', '.join(suggestions)}?"
+                data['is_valid'] = False
         data['display_text'] = self.get_display_text(
             data['value'], generated_data)
         data['label'] = self.name
@@ -550,7 +612,7 @@ class TemplateFieldType(AbstractBaseModel):
         data['width'] = self.width
         data['type'] = self.type
         data['is_required'] = self.required
-        data['options'] = dict(generated_data)
+        data['options'] = generated_data.options
         data['is_dynamic'] = self.is_dynamic
         return data
 
@@ -565,8 +627,9 @@ class TemplateFieldType(AbstractBaseModel):
     def get_display_text(self, value, generated_data):
         if not self.data_generator:
             return value
-        options_dict = dict([i[::-1] for i in generated_data])
-        return options_dict.get(value, value)
+        if not isinstance(generated_data, OptionIndex):
+            generated_data = OptionIndex(generated_data)
+        return generated_data.get_name(value, value)
 
     def get_excel_validation(self, first_cell='A1'):
         if self.data_generator:
@@ -683,7 +746,7 @@ class TemplateField(AbstractBaseModel):
         supply_chain = session.get_current_user().get_default_sc()
         options = self.template.get_generated_data(
             tenant, node, supply_chain, self.field.data_generator, self.field)
-        return options
+        return options.items
 
 
 class BulkUpload(AbstractBaseModel):
@@ -765,14 +828,14 @@ class BulkUpload(AbstractBaseModel):
         """
         _data = []
         if self.status == temp_consts.BulkUploadStatuses.CREATED:
-            _data = self.template.extract_data(self.file)
+            _data = self.template.iter_data(self.file)
         elif self.status == temp_consts.BulkUploadStatuses.VALIDATED:
             _data = self.data
-        if not _data:
-            raise exceptions.BadRequest(_("Excel is empty."))
         self.validated_data, self.is_valid = \
             self.template.validate_data(
                 _data, self.tenant, self.node, self.supply_chain, **kwargs)
+        if not self.validated_data:
+            raise exceptions.BadRequest(_("Excel is empty."))
 
         self.data = [
             {k: v['value'] for k, v in i['data'].items()}
@@ -826,3 +889,41 @@ class BulkUpload(AbstractBaseModel):
                 user=self.creator, action_object=self, token=None)
             notification_manager.send_notification()
         return True
+
+
+class SyncRecord(models.Model):
+    """
+    Records applied by the offline sync of the mobile clients, keyed on
+    the idempotency key generated by the client for each record, so that
+    a record sent again is not applied twice.
+
+    Attributes:
+        tenant(obj)     : Tenant of the node.
+        node(obj)       : Node that synced the record.
+        key(char)       : Idempotency key of the record.
+        type(int)       : Type of the record.
+        result(json)    : Ids of the objects created for the record.
+        created_on(datetime): Time the record was applied.
+    """
+    tenant = models.ForeignKey(
+        'tenants.Tenant', on_delete=models.CASCADE,
+        related_name='sync_records', verbose_name=_("Tenant"))
+    node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='sync_records', verbose_name=_('Node'))
+    key = models.CharField(max_length=100, verbose_name=_('Idempotency Key'))
+    type = models.IntegerField(
+        choices=temp_consts.SyncRecordType.choices,
+        verbose_name=_('Record Type'))
+    result = models.JSONField(
+        default=dict, blank=True, verbose_name=_('Result'))
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Meta setup"""
+        constraints = [models.UniqueConstraint(
+            fields=['node', 'key'], name='bulk_sync_record_unique_key')]
+
+    def __str__(self):
+        """Object name in django admin."""
+        return f'{self.node_id} : {self.key}'
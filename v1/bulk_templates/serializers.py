@@ -186,4 +186,33 @@ class TemplateSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'description', 'file_name', 'type', 'file', 
             'index_column', 'data_row', 'title_row', 'sheet_name', 'is_default', 
             'is_deleted', 'tenant', 'column_data', 'template')
-        model = bulk_models.Template
\ No newline at end of file
+        model = bulk_models.Template
+
+class SyncRecordSerializer(serializers.Serializer):
+    """
+    Serializer for a record of the offline sync.
+    """
+    key = serializers.CharField(max_length=100)
+    type = serializers.ChoiceField(choices=constants.SyncRecordType.choices)
+    data = serializers.DictField()
+    refs = serializers.DictField(
+        child=serializers.CharField(), required=False, default=dict)
+
+
+class OfflineSyncSerializer(serializers.Serializer):
+    """
+    Serializer to validate the records of an offline sync.
+    """
+    records = SyncRecordSerializer(many=True)
+
+    def validate_records(self, records):
+        """Validates the number of records and that the keys are unique."""
+        if len(records) > constants.OFFLINE_SYNC_MAX_RECORDS:
+            raise serializers.ValidationError(
+                _("A sync can have at most {count} records.").format(
+                    count=constants.OFFLINE_SYNC_MAX_RECORDS))
+        keys = [record['key'] for record in records]
+        if len(keys) != len(set(keys)):
+            raise serializers.ValidationError(
+                _("Idempotency keys of the records should be unique."))
+        return records
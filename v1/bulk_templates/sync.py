@@ -0,0 +1,206 @@
+"""
+Offline sync of the records captured by the mobile clients.
+
+A sync request carries the farmers, transactions and claims captured
+offline, each with an idempotency key generated by the client. Records
+whose key was already applied for the node are answered with their
+earlier result instead of being applied again, so a sync interrupted by
+the connection can simply be sent again.
+
+A record can refer to the objects created for other records with refs,
+a mapping of a path in its data (like 'node' or 'source_batches.0.batch')
+to the key of the other record. '<key>#batch' refers to the first result
+batch of a transaction. Records are applied after the records they refer
+to, otherwise farmers first, then transactions and claims.
+
+Records are applied in chunks, each chunk in one DB transaction and each
+record in a savepoint, so that a failed record does not roll back the
+others.
+"""
+from sentry_sdk import capture_exception
+
+from django.db import IntegrityError
+from django.db import transaction as django_transaction
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework.exceptions import APIException
+
+from base import exceptions
+
+from v1.bulk_templates import constants as temp_consts
+from v1.bulk_templates.models import SyncRecord
+
+RECORD_TYPES = temp_consts.SyncRecordType
+STATUSES = temp_consts.SyncRecordStatus
+BATCH_REF = '#batch'
+
+
+def get_serializer_class(record_type):
+    """Returns the serializer applying the records of the type."""
+    from v1.claims.serializers import batch_claim as batch_claim_serializers
+    from v1.supply_chains.serializers import connections as conn_serializers
+    from v1.transactions.serializers import external as ext_serializers
+    from v1.transactions.serializers import internal as int_serializers
+
+    return {
+        RECORD_TYPES.FARMER: conn_serializers.ConnectNodeSerializer,
+        RECORD_TYPES.EXTERNAL_TRANSACTION:
+            ext_serializers.ExternalTransactionSerializer,
+        RECORD_TYPES.INTERNAL_TRANSACTION:
+            int_serializers.InternalTransactionSerializer,
+        RECORD_TYPES.BATCH_CLAIM:
+            batch_claim_serializers.AttachBatchClaimSerializer,
+    }[record_type]
+
+
+def get_result(record_type, instance):
+    """Returns the ids of the objects created for a record."""
+    if record_type == RECORD_TYPES.FARMER:
+        return {'id': instance.target.idencode}
+    if record_type in (
+            RECORD_TYPES.EXTERNAL_TRANSACTION,
+            RECORD_TYPES.INTERNAL_TRANSACTION):
+        batch = instance.result_batches.order_by('id').first()
+        return {
+            'id': instance.idencode,
+            'batch': batch.idencode if batch else None,
+        }
+    return {'id': None}
+
+
+def resolve_ref(ref, results):
+    """
+    Returns the id the ref points to from the results of the applied
+    records, or None if the record is not applied.
+    """
+    key, field = ref, 'id'
+    if ref.endswith(BATCH_REF):
+        key, field = ref[:-len(BATCH_REF)], 'batch'
+    return results.get(key, {}).get(field)
+
+
+def set_path(data, path, value):
+    """Sets the value at the dotted path of the data."""
+    *parents, last = path.split('.')
+    for part in parents:
+        data = data[int(part) if isinstance(data, list) else part]
+    data[int(last) if isinstance(data, list) else last] = value
+
+
+def get_ref_key(ref):
+    """Returns the key of the record the ref points to."""
+    return ref[:-len(BATCH_REF)] if ref.endswith(BATCH_REF) else ref
+
+
+def order_records(records):
+    """
+    Returns the records in the order they have to be applied, each record
+    after the records it refers to. References in a cycle are ignored.
+    """
+    records_by_key = {record['key']: record for record in records}
+    ordered, visiting, visited = [], set(), set()
+
+    def visit(record):
+        key = record['key']
+        if key in visited or key in visiting:
+            return
+        visiting.add(key)
+        for ref in record.get('refs', {}).values():
+            ref_record = records_by_key.get(get_ref_key(ref))
+            if ref_record:
+                visit(ref_record)
+        visiting.discard(key)
+        visited.add(key)
+        ordered.append(record)
+
+    for record in sorted(records, key=lambda record: record['type']):
+        visit(record)
+    return ordered
+
+
+def apply_record(record, results, tenant, node, context):
+    """
+    Applies the record with its serializer after resolving its refs and
+    records its key. Returns the result of the record.
+    """
+    data = record['data']
+    for path, ref in record.get('refs', {}).items():
+        value = resolve_ref(ref, results)
+        if not value:
+            raise exceptions.BadRequest(
+                _("Referred record {ref} is not synced.").format(ref=ref))
+        set_path(data, path, value)
+    if record['type'] == RECORD_TYPES.EXTERNAL_TRANSACTION:
+        # Duplicates are already excluded by the key.
+        data.setdefault('force_create', True)
+    serializer = get_serializer_class(record['type'])(
+        data=data, context=context)
+    serializer.is_valid(raise_exception=True)
+    result = get_result(record['type'], serializer.save())
+    SyncRecord.objects.create(
+        tenant=tenant, node=node, key=record['key'], type=record['type'],
+        result=result)
+    return result
+
+
+def apply_chunk(records, results, tenant, node, context):
+    """
+    Applies the records in one DB transaction, each in a savepoint.
+    Returns the status and errors of each key.
+    """
+    statuses = {}
+    with django_transaction.atomic():
+        for record in records:
+            key = record['key']
+            try:
+                with django_transaction.atomic():
+                    results[key] = apply_record(
+                        record, results, tenant, node, context)
+                statuses[key] = (STATUSES.CREATED, None)
+            except APIException as e:
+                statuses[key] = (STATUSES.FAILED, e.detail)
+            except Exception as e:
+                # The key may have been applied by a parallel sync.
+                applied = isinstance(e, IntegrityError) and \
+                    SyncRecord.objects.filter(node=node, key=key).first()
+                if applied:
+                    results[key] = applied.result
+                    statuses[key] = (STATUSES.DUPLICATE, None)
+                    continue
+                capture_exception(e)
+                statuses[key] = (STATUSES.FAILED, str(e))
+    return statuses
+
+
+def sync(records, tenant, node, context):
+    """
+    Applies the records not synced yet and returns the result of each
+    record, in the order of the records.
+    """
+    keys = {record['key'] for record in records}
+    keys.update(
+        get_ref_key(ref) for record in records
+        for ref in record.get('refs', {}).values())
+    results = dict(SyncRecord.objects.filter(
+        node=node, key__in=keys).values_list('key', 'result'))
+    statuses = {
+        record['key']: (STATUSES.DUPLICATE, None)
+        for record in records if record['key'] in results}
+    pending = order_records([
+        record for record in records if record['key'] not in results])
+    chunk_size = temp_consts.OFFLINE_SYNC_CHUNK_SIZE
+    for start in range(0, len(pending), chunk_size):
+        statuses.update(apply_chunk(
+            pending[start:start + chunk_size], results, tenant, node,
+            context))
+    response = []
+    for record in records:
+        status, errors = statuses[record['key']]
+        response.append({
+            'key': record['key'],
+            'type': record['type'],
+            'status': status,
+            'result': results.get(record['key']),
+            'errors': errors,
+        })
+    return response
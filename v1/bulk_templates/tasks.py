@@ -1,14 +1,15 @@
 """
 Celery tasks
 """
-import time
 import traceback
 import logging
 import copy
 from sentry_sdk import capture_exception
-from celery import shared_task
+from celery import shared_task, chord
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
 
 from utilities import functions
 
@@ -22,9 +23,132 @@ from . import constants
 logger = logging.getLogger(__name__)
 
 
+def process_item(bulk_upload, config_class, item, extra_data=None):
+    """
+    Saves a single validated row inside a savepoint so that a failed row
+    is rolled back without affecting the rest of the chunk.
+
+    Returns a tuple of the counter to be incremented for the row and the
+    row result with its index, status, errors of the row and errors added
+    to the bulk upload. Returns None for rows
+    that are already processed.
+    """
+    item_data = item['data']
+    serializer_data = {k: v['value'] for k, v in item_data.items()}
+    serializer_data = config_class.annotate_extras(serializer_data)
+    serializer_data['current_tenant'] = bulk_upload.tenant
+    serializer_data['current_node'] = bulk_upload.node
+    serializer_data['current_user'] = bulk_upload.creator
+    if serializer_data['_status'] in [
+            constants.BulkUploadStatuses.COMPLETED,
+            constants.BulkUploadStatuses.FAILED]:
+        return None
+    serializer_data['supply_chain'] = bulk_upload.supply_chain.idencode
+    if extra_data:
+        for key,value in extra_data.items():
+            serializer_data[key] = value
+    instance = config_class.get_instance(serializer_data)
+    serializer_class = config_class.get_serializer_class(instance)
+    serializer = serializer_class(instance=instance, data=serializer_data, partial=True)
+
+    result = {
+        'status': constants.BulkUploadStatuses.COMPLETED,
+        'errors': None,
+        'upload_errors': None,
+    }
+    try:
+        with transaction.atomic():
+            if serializer.is_valid():
+                serializer.save()
+            else:
+                result['status'] = constants.BulkUploadStatuses.FAILED
+                result['errors'] = functions.serialize_promises(
+                    serializer.errors)
+                result['upload_errors'] = result['errors']
+    except Exception as e:
+        err = traceback.format_exc()
+        capture_exception(e)
+        result['status'] = constants.BulkUploadStatuses.FAILED
+        result['errors'] = [str(err)]
+        result['upload_errors'] = str(err)
+    success = result['status'] == constants.BulkUploadStatuses.COMPLETED
+    if instance:
+        counter = 'updations_completed' if success else 'updations_failed'
+    else:
+        counter = 'new_items_completed' if success else 'new_items_failed'
+    return counter, result
+
+
+def process_chunk(bulk_upload, start, end, extra_data=None):
+    """
+    Saves the validated rows from start to end in a single transaction.
+
+    Returns the row results and the number of rows to be added to each
+    progress counter of the bulk upload.
+    """
+    config_class = constants.TemplateType(bulk_upload.template.type).function()
+    results = []
+    counters = {}
+    with transaction.atomic():
+        for index in range(start, min(end, len(bulk_upload.validated_data))):
+            processed = process_item(
+                bulk_upload, config_class, bulk_upload.validated_data[index],
+                extra_data)
+            if not processed:
+                continue
+            counter, result = processed
+            result['index'] = index
+            results.append(result)
+            counters[counter] = counters.get(counter, 0) + 1
+    return results, counters
+
+
+@shared_task(name='upload_chunk')
+def upload_chunk(upload_id: int, start: int, end: int, extra_data=None):
+    """
+    Uploads one chunk of a bulk upload and updates its progress counters
+    atomically, so that chunks can run in parallel on multiple workers.
+    """
+    bulk_upload = bulk_models.BulkUpload.objects.select_related(
+        'tenant', 'node', 'supply_chain', 'template', 'creator').get(
+        id=upload_id)
+    results, counters = process_chunk(bulk_upload, start, end, extra_data)
+    if counters:
+        bulk_models.BulkUpload.objects.filter(id=upload_id).update(
+            **{key: F(key) + value for key, value in counters.items()})
+    return results
+
+
+@shared_task(name='finish_upload')
+def finish_upload(chunk_results, upload_id: int):
+    """
+    Writes row statuses and errors of all the chunks back to the bulk
+    upload in one save and notifies the user.
+    """
+    bulk_upload = bulk_models.BulkUpload.objects.get(id=upload_id)
+    for results in chunk_results:
+        for result in results:
+            item = bulk_upload.validated_data[result['index']]
+            item['data']['_status']['value'] = result['status']
+            if result['errors'] is not None:
+                item['errors'] = result['errors']
+                bulk_upload.errors.append(result['upload_errors'])
+    if bulk_upload.errors:
+        bulk_upload.status = constants.BulkUploadStatuses.FAILED
+    else:
+        bulk_upload.status = constants.BulkUploadStatuses.COMPLETED
+    bulk_upload.save(update_fields=[
+        'validated_data', 'errors', 'status', 'updater', 'updated_on'])
+    bulk_upload.notify()
+    return True
+
+
 @shared_task(name='upload')
 def upload(upload_id: int,extra_data=None):
-    """Function to create Validator email."""
+    """
+    Splits the validated rows of the bulk upload into chunks and uploads
+    them in parallel, finishing the upload once all the chunks are done.
+    """
     bulk_upload = bulk_models.BulkUpload.objects.get(id=upload_id)
     bulk_upload.status = constants.BulkUploadStatuses.IN_PROGRESS
     for item in bulk_upload.validated_data:
@@ -35,60 +159,12 @@ def upload(upload_id: int,extra_data=None):
             "hidden": True,
         }
     bulk_upload.save()
-    config_class = constants.TemplateType(bulk_upload.template.type).function()
-    for item in bulk_upload.validated_data:
-        item_data = item['data']
-        # serializer_data = copy.deepcopy(item)
-        serializer_data = {k: v['value'] for k, v in item_data.items()}
-        serializer_data = config_class.annotate_extras(serializer_data)
-        serializer_data['current_tenant'] = bulk_upload.tenant
-        serializer_data['current_node'] = bulk_upload.node
-        serializer_data['current_user'] = bulk_upload.creator
-        if serializer_data['_status'] in [
-                constants.BulkUploadStatuses.COMPLETED,
-                constants.BulkUploadStatuses.FAILED]:
-            continue
-        serializer_data['supply_chain'] = bulk_upload.supply_chain.idencode
-        if extra_data:
-            for key,value in extra_data.items():
-                serializer_data[key] = value
-        instance = config_class.get_instance(serializer_data)
-        serializer_class = config_class.get_serializer_class(instance)
-        serializer = serializer_class(instance=instance, data=serializer_data, partial=True)
-
-        try:
-            if serializer.is_valid():
-                serializer.save()
-                item_data['_status']['value'] = constants.BulkUploadStatuses.COMPLETED
-                if instance:
-                    bulk_upload.updations_completed += 1
-                else:
-                    bulk_upload.new_items_completed += 1
-            else:
-                item_data['_status']['value'] = constants.BulkUploadStatuses.FAILED
-                item['errors'] = serializer.errors
-                bulk_upload.errors.append(serializer.errors)
-                if instance:
-                    bulk_upload.updations_failed += 1
-                else:
-                    bulk_upload.new_items_failed += 1
-        except Exception as e:
-            err = traceback.format_exc()
-            capture_exception(e)
-            item_data['_status']['value'] = constants.BulkUploadStatuses.FAILED
-            item['errors'] = [str(err)]
-            bulk_upload.errors.append(str(err))
-            if instance:
-                bulk_upload.updations_failed += 1
-            else:
-                bulk_upload.new_items_failed += 1
-        bulk_upload.save()
-        time.sleep(1)
-    if bulk_upload.errors:
-        bulk_upload.status = constants.BulkUploadStatuses.FAILED
-    else:
-        bulk_upload.status = constants.BulkUploadStatuses.COMPLETED
-    bulk_upload.save()
-    bulk_upload.notify()
+    chunk_size = constants.BULK_UPLOAD_CHUNK_SIZE
+    chunks = [
+        upload_chunk.s(upload_id, start, start + chunk_size, extra_data)
+        for start in range(0, len(bulk_upload.validated_data), chunk_size)
+    ]
+    if not chunks:
+        return finish_upload([], upload_id)
+    chord(chunks)(finish_upload.s(upload_id))
     return True
-
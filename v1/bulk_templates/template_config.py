@@ -123,12 +123,12 @@ class TransactionTemplate(object):
 
                 if item['is_valid']:
                     # Checking if similar transaction exists in the system.
-                    transactions = ExternalTransaction.objects.filter(
-                        source__encoded=td['node'], destination=node,
-                        price=td['price'], unit__encoded=td['unit'],
-                        destination_quantity=td['quantity'],
-                        result_batches__product__encoded=td['product'],
-                        date=util_functions.read_date(td['date']))
+                    transactions = ExternalTransaction.find_duplicates(
+                        util_functions.decode(td['node']), node.id,
+                        td['price'], td['quantity'],
+                        util_functions.decode(td['unit']),
+                        util_functions.decode(td['product']),
+                        util_functions.read_date(td['date']))
                     if transactions.exists() and not force_create:
                         valid = False
                         item['is_valid'] = False
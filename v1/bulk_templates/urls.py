@@ -21,5 +21,6 @@ urlpatterns += [
     path('template/<idencode:pk>/', views.TemplateFieldsViewset.as_view()),
     path('template-check/', views.TemplateCheckView.as_view()),
     path('custom-template/', views.CustomTemplateView.as_view()),
-    path('templates/', views.TemplateListView.as_view())
+    path('templates/', views.TemplateListView.as_view()),
+    path('sync/', views.OfflineSyncView.as_view(), name='offline-sync'),
 ]
@@ -28,6 +28,7 @@ from . import models as bulk_models
 from . import serializers
 from . import constants
 from . import filters as bulk_filters
+from . import sync
 
 import openpyxl
 from sentry_sdk import capture_exception
@@ -112,6 +113,29 @@ class InitiateBulkUpload(APIView):
         return response.SuccessResponse(_("Bulk upload started successfully."))
 
 
+class OfflineSyncView(APIView):
+    """
+    API to sync the farmers, transactions and claims captured offline by
+    the mobile clients in a single request.
+
+    Each record has an idempotency key and records already synced are not
+    applied again. The result of each record is returned in the order of
+    the records.
+    """
+
+    def post(self, request, *args, **kwargs):
+        """
+        Post overrode to apply the records.
+        """
+        serializer = serializers.OfflineSyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = sync.sync(
+            serializer.validated_data['records'],
+            session.get_current_tenant(), session.get_current_node(),
+            {'request': request, 'view': self})
+        return response.SuccessResponse(results)
+
+
 class TemplateFieldsViewset(generics.ListAPIView):
     """API to get fields for the template and their respective details like
     label, placeholder, list of countries for dropdown etc"""
@@ -9,6 +9,7 @@ from common.drf_custom import filters as custom_filters
 from base import session
 
 from utilities.functions import decode, decode_list
+from utilities import search
 
 from v1.claims import constants as claim_constants
 from v1.claims import models as claim_models
@@ -274,10 +275,11 @@ class VerificationFilter(filters.FilterSet):
         return queryset
 
     def search_fields(self, queryset, name, value):
-        query =Q(attached_by__name__icontains=value) | Q(
-            verifier__name__icontains=value) | Q(
-            claim__name__icontains=value)
-        return queryset.filter(query)
+        """
+        Search on the names of the claim, the node that attached it and
+        the verifier, see utilities.search.
+        """
+        return search.search(queryset, value)
 
     def filter_product(self, queryset, name, value):
         query = Q(claim__product__id=decode(value))
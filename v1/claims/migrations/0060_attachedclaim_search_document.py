@@ -0,0 +1,25 @@
+# Generated by Django 4.0.4 on 2026-10-18 17:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0042_node_name_trgm'),
+        ('claims', '0059_alter_attachedclaimcomment_attached_claim_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachedclaim',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Search Document'),
+        ),
+        migrations.AddIndex(
+            model_name='attachedclaim',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('search_document'), name='gin_trgm_ops'), name='attached_claim_search_trgm'),
+        ),
+    ]
@@ -12,6 +12,7 @@ from base.models import AbstractBaseModel
 from base import session
 from common.library import _get_file_path, get_random_string
 from utilities.function_generators import formatter
+from utilities import search
 
 from v1.risk.integrations.roai import apis as roai_apis
 from v1.blockchain.models.submit_message import AbstractConsensusMessage
@@ -145,6 +146,17 @@ class Claim(AbstractBaseModel):
         """Object name in django admin."""
         return f'{self.name} - {self.tenant.name} - {self.version}'
 
+    def save(self, *args, **kwargs):
+        """
+        Override to refresh the search documents of the attached claims
+        when the claim is renamed.
+        """
+        renamed = search.name_changed(
+            self, *search.localized_fields('name'))
+        super(Claim, self).save(*args, **kwargs)
+        if renamed:
+            search.schedule_refresh('claims.AttachedClaim', claim_id=self.id)
+
 
 class Criterion(AbstractBaseModel):
     """
@@ -215,6 +227,8 @@ class AttachedClaim(AbstractBaseModel, AbstractConsensusMessage):
         attached_by(obj)    : company which attached the claim.
         status(int)         : status of the claim(approved, rejected...)
         note(text)          : any notes about the claim attachment.
+        search_document(text): text the claim is searched on, see
+                              utilities.search.
 
     Inherited Attribs:
         creator(obj): Creator user of the object.
@@ -269,6 +283,14 @@ class AttachedClaim(AbstractBaseModel, AbstractConsensusMessage):
         max_length=100, default='', 
         verbose_name=_("Certificate Id From RO-AI"), null=True, 
         blank=True)
+    search_document = models.TextField(
+        default='', blank=True, editable=False,
+        verbose_name=_('Search Document'))
+
+    class Meta(AbstractBaseModel.Meta):
+        """Meta setup"""
+        indexes = [search.trigram_index(
+            'search_document', 'attached_claim_search_trgm')]
 
     def __str__(self):
         """Object name in django admin."""
@@ -276,14 +298,27 @@ class AttachedClaim(AbstractBaseModel, AbstractConsensusMessage):
 
     def save(self, *args, **kwargs):
         """
+        Override to approve claims that need no verification and to update
+        the search document.
         """
         auto_approvals = [
             claim_consts.ClaimVerificationMethod.NONE, 
             claim_consts.ClaimVerificationMethod.SYSTEM]
         if self.claim.verification_type in auto_approvals:
             self.status = claim_consts.ClaimStatus.APPROVED
+        self.search_document = self.get_search_document()
         return super().save(*args, **kwargs)
 
+    def get_search_document(self):
+        """
+        Returns the text the claim is searched on, the names of the claim,
+        the node that attached it and the verifier.
+        """
+        return search.make_document(
+            *search.translations(self.claim, 'name'),
+            self.attached_by.name if self.attached_by else '',
+            self.verifier.name if self.verifier else '')
+
     @property
     def claim_object(self): #TODO: REWORK
         """
@@ -392,20 +427,16 @@ class AttachedClaim(AbstractBaseModel, AbstractConsensusMessage):
         """Method notifies verifier that claim is attached.."""
         if not self.verifier:
             return False
-        for user in self.verifier.members.all():
-            notification_manager = notifications.ClaimAddedNotificationManager(
-                user=user, action_object=self.claim_object, token=None)
-            notification_manager.send_notification()
+        notifications.ClaimAddedNotificationManager.notify_members(
+            self.verifier, self.claim_object)
         return True
 
     def notify_claim_verified(self):
         """Method notifies claim attached nodes that the claims are verified."""
         if not self.verifier:
             return False
-        for user in self.get_node().members.all():
-            notification_manager = notifications.ClaimVerifiedNotificationManager(
-                user=user, action_object=self.claim_object, token=None)
-            notification_manager.send_notification()
+        notifications.ClaimVerifiedNotificationManager.notify_members(
+            self.get_node(), self.claim_object)
         return True
 
     def extra_info(self):
@@ -506,6 +537,27 @@ class BatchClaim(AttachedClaim):
         """Object name in django admin."""
         return f'{self.claim.name} - {self.idencode}'
 
+    def save(self, *args, **kwargs):
+        """
+        Override to clear the cached consumer interface pages showing the
+        claims of the batch.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        super(BatchClaim, self).save(*args, **kwargs)
+        ci_caching.invalidate_nodes([self.batch.node_id])
+        return self
+
+    def delete(self, *args, **kwargs):
+        """
+        Override to clear the cached consumer interface pages showing the
+        claims of the batch.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        node_id = self.batch.node_id
+        result = super(BatchClaim, self).delete(*args, **kwargs)
+        ci_caching.invalidate_nodes([node_id])
+        return result
+
     def claim_info(self):
         """ Additional info that is to be logged into blockchain """
         info = super(BatchClaim, self).claim_info()
@@ -548,16 +600,26 @@ class NodeClaim(AttachedClaim):
         return f'{self.claim.name} - {self.idencode}'
 
     def save(self, *args, **kwargs):
+        from v1.dashboard import caching
         super(NodeClaim, self).save(*args, **kwargs) # TODO: Issue in save fixed.
+        caching.invalidate_stats(self.node.tenant_id)
         if self.status == claim_consts.ClaimStatus.APPROVED:
             try:
                 response = roai_apis.AddStandard(self).call()
                 NodeClaim.objects.filter(id=self.id).update(certification_id=response['id'])
-                self.node.initialize_risk_score()
+                self.node.queue_risk_score()
             except:
                 pass
         return self
 
+    def delete(self, *args, **kwargs):
+        """Override to clear the cached dashboard stats of the tenant."""
+        from v1.dashboard import caching
+        tenant_id = self.node.tenant_id
+        result = super(NodeClaim, self).delete(*args, **kwargs)
+        caching.invalidate_stats(tenant_id)
+        return result
+
     def claim_info(self):
         info = super(NodeClaim, self).claim_info()
 
@@ -807,10 +869,8 @@ class AttachedClaimComment(AbstractBaseModel):
             node = self.attached_claim.attached_by
         if not node:
             return False
-        for user in node.members.all():
-            notification_manager = notifications.ClaimCommentNotificationManager(
-                user=user, action_object=self, token=None)
-            notification_manager.send_notification()
+        notifications.ClaimCommentNotificationManager.notify_members(
+            node, self)
         return True
 
 
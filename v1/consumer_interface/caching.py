@@ -0,0 +1,177 @@
+"""
+Response cache of the public consumer interface.
+
+The pages behind the product QR codes are rendered once for each object,
+tenant and language and cached along with the versions of the nodes they
+depend on (the nodes in the lineage of the batch) and of the tenant at the
+time they were rendered. Node, claim and transaction changes move the
+versions of the nodes forward and ci setting changes the version of the
+tenant, so an entry is served only while none of its versions moved.
+
+Versions are moved only after the changes are committed, otherwise a page
+rendered in between would be cached with the old data under the new
+version.
+"""
+import hashlib
+import json
+import time
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as django_transaction
+from django.utils import translation
+
+from v1.consumer_interface import constants as ci_consts
+
+from v1.products import models as prod_models
+
+from v1.tracker import operations as tracker_operations
+
+ALL_TENANTS = 'all'
+BATCH_INFO = 'batch_info'
+
+
+def _node_key(node_id):
+    return ci_consts.CI_NODE_VERSION_KEY.format(node=node_id)
+
+
+def _tenant_key(tenant_id):
+    return ci_consts.CI_TENANT_VERSION_KEY.format(
+        tenant=tenant_id or ALL_TENANTS)
+
+
+def get_versions(keys):
+    """
+    Returns the current version of each of the keys, 0 for the keys that
+    were never moved.
+    """
+    versions = cache.get_many(keys)
+    return {key: versions.get(key, 0) for key in keys}
+
+
+def _move_versions(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def invalidate_nodes(node_ids):
+    """
+    Invalidates the cached pages of every batch that has any of the nodes
+    in its lineage.
+    """
+    keys = [_node_key(node_id) for node_id in set(node_ids) if node_id]
+    if keys:
+        django_transaction.on_commit(lambda: _move_versions(keys))
+    return True
+
+
+def invalidate_tenant(tenant_id=None):
+    """
+    Invalidates the cached pages of the tenant, or of all the tenants when
+    no tenant is given.
+    """
+    keys = [_tenant_key(tenant_id)]
+    django_transaction.on_commit(lambda: _move_versions(keys))
+    return True
+
+
+def render_entry(render, node_ids, tenant_id):
+    """
+    Renders the data of a page into a cache entry with the current
+    versions of the nodes and the tenant, an ETag of the data and the
+    time it was rendered.
+    """
+    keys = [_node_key(node_id) for node_id in sorted(set(node_ids))]
+    keys += [_tenant_key(None), _tenant_key(tenant_id)]
+    versions = get_versions(list(dict.fromkeys(keys)))
+    data = json.loads(json.dumps(render(), cls=JSONEncoder))
+    content = json.dumps(data, sort_keys=True).encode()
+    return {
+        'data': data,
+        'etag': hashlib.md5(content).hexdigest(),
+        'last_modified': int(time.time()),
+        'versions': versions,
+    }
+
+
+def get_entry(name, object_id, tenant_id, render, get_node_ids=None,
+              **params):
+    """
+    Returns the cached entry of the page with the name, rendering and
+    caching it if it is missing or any of its versions moved.
+
+    render returns the data of the page and get_node_ids the ids of the
+    nodes it depends on, both are called only when the page is rendered.
+    The params are the query params or anything else the page depends on.
+    """
+    key = ci_consts.CI_RESPONSE_CACHE_KEY.format(
+        name=name, object=object_id, tenant=tenant_id or ALL_TENANTS,
+        language=translation.get_language(),
+        params=':'.join(f'{k}={params[k]}' for k in sorted(params)))
+    cached = cache.get(key)
+    if cached:
+        versions = cached['versions']
+        if get_versions(list(versions)) == versions:
+            return cached
+    node_ids = get_node_ids() if get_node_ids else []
+    entry = render_entry(render, node_ids, tenant_id)
+    if cached and cached['etag'] == entry['etag']:
+        entry['last_modified'] = cached['last_modified']
+    cache.set(key, entry, ci_consts.CI_RESPONSE_CACHE_TIMEOUT)
+    return entry
+
+
+def get_batch_node_ids(batch):
+    """Returns ids of the nodes in the lineage of the batch."""
+    lineage = tracker_operations.BatchLineage(batch)
+    return list(prod_models.Batch.objects.filter(
+        id__in=lineage.batch_ids()).exclude(node=None).order_by(
+        ).values_list('node_id', flat=True).distinct())
+
+
+def get_batch_info(batch):
+    """Returns the cached entry of the info page of the batch."""
+    from v1.consumer_interface.serializers import dynamic_data
+
+    return get_entry(
+        BATCH_INFO, batch.id, batch.tenant_id,
+        lambda: dynamic_data.BatchInfoSerializer(batch).data,
+        lambda: get_batch_node_ids(batch))
+
+
+def warm_batches(batch_ids):
+    """
+    Renders the info pages of the batches in the default language, so that
+    the first scans of new batches are served from the cache.
+    """
+    batches = prod_models.Batch.objects.filter(id__in=batch_ids)
+    with translation.override(settings.LANGUAGE_CODE):
+        for batch in batches:
+            get_batch_info(batch)
+    return len(batches)
+
+
+def schedule_transaction_refresh(transaction, invalidate=True):
+    """
+    Once the transaction and its batches are saved, invalidates the pages
+    depending on the nodes of its result batches and, if it is approved,
+    warms the pages of the result batches in the background.
+    """
+    from v1.consumer_interface import tasks
+    from v1.transactions import constants as txn_consts
+
+    def _refresh():
+        batches = list(transaction.result_batches.values_list(
+            'id', 'node_id'))
+        if invalidate:
+            _move_versions({_node_key(node_id) for _, node_id in batches
+                            if node_id})
+        if transaction.status == txn_consts.TransactionStatus.APPROVED:
+            tasks.warm_ci_responses.delay(
+                [batch_id for batch_id, _ in batches])
+    django_transaction.on_commit(_refresh)
@@ -3,3 +3,8 @@
 TENANT_SECTION_GENERIC_MODELS = [
     'header','overviewsection','infosection','mapsection','supplychainsection',
     'aboutsection','moreinfosection','footer',]
+
+CI_RESPONSE_CACHE_KEY = "ci_response:{name}:{object}:{tenant}:{language}:{params}"
+CI_NODE_VERSION_KEY = "ci_node_version:{node}"
+CI_TENANT_VERSION_KEY = "ci_tenant_version:{tenant}"
+CI_RESPONSE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
@@ -40,12 +40,28 @@ class BasicSection(AbstractBaseModel):
     
     def save(self, *args, **kwargs):
         """
-        Sets name and key during the object creation.
+        Sets name and key during the object creation and clears the cached
+        sections of the tenants using the section.
         """
         if not self.id:
             self.name = self.__class__.__name__
             self.key = self.__class__.__name__.lower()
-        return super().save(*args, **kwargs)
+        super().save(*args, **kwargs)
+        self.invalidate_tenants()
+        return self
+
+    def invalidate_tenants(self):
+        """
+        Clears the cached consumer interface of the tenants using the
+        section, or of all the tenants for the default sections.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        if self.is_default:
+            return ci_caching.invalidate_tenant()
+        tenant_ids = set(self.sections.values_list('tenant_id', flat=True))
+        for tenant_id in tenant_ids:
+            ci_caching.invalidate_tenant(tenant_id)
+        return True
     
     def removable_fields(self):
         """
@@ -104,6 +120,16 @@ class CICard(AbstractBaseModel):
     
     def __str__(self) -> str:
         return f'{self.title} : {self.idencode}'
+
+    def save(self, *args, **kwargs):
+        """
+        Override to clear the cached consumer interface, cards are not
+        linked to the tenants showing them.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        super().save(*args, **kwargs)
+        ci_caching.invalidate_tenant()
+        return self
     
     def removable_fields(self):
         """
@@ -274,6 +300,15 @@ class SectionTenantRegister(AbstractBaseModel):
         """
         return f'{self.tenant_name} : {self.idencode}({self.section.name})'
 
+    def save(self, *args, **kwargs):
+        """
+        Override to clear the cached consumer interface of the tenant.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        super().save(*args, **kwargs)
+        ci_caching.invalidate_tenant(self.tenant_id)
+        return self
+
 
 class CITheme(AbstractBaseModel):
     """
@@ -326,3 +361,13 @@ class CITheme(AbstractBaseModel):
     
     def __str__(self) -> str:
         return f'{self.tenant.name} : {self.idencode}'
+
+    def save(self, *args, **kwargs):
+        """
+        Override to clear the cached consumer interface of the tenant, or
+        of all the tenants for the default themes.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        super().save(*args, **kwargs)
+        ci_caching.invalidate_tenant(self.tenant_id)
+        return self
@@ -33,6 +33,7 @@ class BatchInfoSerializer(serializers.ModelSerializer):
     map_info = serializers.SerializerMethodField()
 
     batches = None
+    lineage = None
     target_batch = None
 
     def __init__(self, *args, **kwargs):
@@ -40,10 +41,9 @@ class BatchInfoSerializer(serializers.ModelSerializer):
         Initialize with commonly used data.
         """
         super(BatchInfoSerializer, self).__init__(*args, **kwargs)
-        batch_ids,_ = tracker_operations.BatchSelection().track_batches(
-            batch=self.instance, base_batch=True)
+        self.lineage = tracker_operations.BatchLineage(self.instance)
         self.batches = prod_models.Batch.objects.filter(
-            id__in=batch_ids)
+            id__in=self.lineage.batch_ids())
 
     def get_sc_info(self,obj):
         """
@@ -85,10 +85,8 @@ class BatchInfoSerializer(serializers.ModelSerializer):
         """
         Map data for the ci.
         """
-        _,source_batches = tracker_operations.BatchSelection().track_batches(
-            batch=self.instance, base_batch=True)
-        _,ext_source_batches = tracker_operations.BatchSelection().track_batches(
-            batch=self.instance, base_batch=True,external=True)
+        source_batches = self.lineage.source_batches()
+        ext_source_batches = self.lineage.source_batches(external=True)
         ext_source_batches = ext_source_batches.order_by('-id').distinct('id')
         source_batches = source_batches.order_by('-id').distinct('id')
         node_info = []
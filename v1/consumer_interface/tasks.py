@@ -0,0 +1,14 @@
+"""
+Celery tasks
+"""
+from celery import shared_task
+
+from v1.consumer_interface import caching
+
+
+@shared_task(name='warm_ci_responses')
+def warm_ci_responses(batch_ids):
+    """
+    Task to render the consumer interface pages of the batches.
+    """
+    return caching.warm_batches(batch_ids)
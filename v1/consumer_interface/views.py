@@ -1,7 +1,16 @@
 from rest_framework import generics
+from rest_framework.response import Response
+
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.utils.http import quote_etag
 
 from base import exceptions, response
 
+from v1.consumer_interface import caching
+
 from v1.tenants import models as tenant_models
 
 from v1.consumer_interface.serializers import theme as ci_theme_serializers
@@ -10,7 +19,30 @@ from v1.consumer_interface.serializers import dynamic_data as ci_data_serializer
 from v1.products import models as prod_models
 
 
-class CISectionsView(generics.RetrieveAPIView):
+class CachedResponseMixin:
+    """
+    Mixin to serve responses of the consumer interface cache, with the
+    ETag and Last-Modified of the cached entry. Requests of clients that
+    already have the entry are answered with 304.
+    """
+
+    def get_cached_response(self, entry, entry_response):
+        """
+        Returns the response of the cache entry, or a 304 response if the
+        client has the same entry.
+        """
+        etag = quote_etag(entry['etag'])
+        entry_response = get_conditional_response(
+            self.request, etag=etag, last_modified=entry['last_modified'],
+            response=entry_response)
+        entry_response['ETag'] = etag
+        entry_response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_cache_control(entry_response, public=True, no_cache=True)
+        patch_vary_headers(entry_response, ('Accept-Language',))
+        return entry_response
+
+
+class CISectionsView(CachedResponseMixin, generics.RetrieveAPIView):
     """
     """
     authentication_classes = []
@@ -31,11 +63,13 @@ class CISectionsView(generics.RetrieveAPIView):
         """
         """
         tenant = self.get_object()
-        section_data = tenant.ci_section_data()
-        return response.SuccessResponse(section_data)
+        entry = caching.get_entry(
+            'ci_sections', tenant.id, tenant.id, tenant.ci_section_data)
+        return self.get_cached_response(
+            entry, response.SuccessResponse(entry['data']))
 
 
-class CIThemeView(generics.RetrieveAPIView):
+class CIThemeView(CachedResponseMixin, generics.RetrieveAPIView):
     """Api to retrieve ci theme data."""
 
     authentication_classes = []
@@ -52,8 +86,18 @@ class CIThemeView(generics.RetrieveAPIView):
         except:
             raise exceptions.NotFound("Tenant does not exist.")
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Overrided to serve the theme from the cache.
+        """
+        ci_theme = self.get_object()
+        entry = caching.get_entry(
+            'ci_theme', self.kwargs['pk'], self.kwargs['pk'],
+            lambda: self.get_serializer(ci_theme).data)
+        return self.get_cached_response(entry, Response(entry['data']))
 
-class BatchInfoView(generics.RetrieveAPIView):
+
+class BatchInfoView(CachedResponseMixin, generics.RetrieveAPIView):
     """
     Api to get information about a specific batch.
     """
@@ -72,8 +116,16 @@ class BatchInfoView(generics.RetrieveAPIView):
             raise exceptions.NotFound("Batch does not exist.")
         return batch
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Overrided to serve the batch info from the cache.
+        """
+        batch = self.get_object()
+        entry = caching.get_batch_info(batch)
+        return self.get_cached_response(entry, Response(entry['data']))
+
 
-class BatchChainInfoView(generics.RetrieveAPIView):
+class BatchChainInfoView(CachedResponseMixin, generics.RetrieveAPIView):
     """
     Api return chain info of a batch.
     The contribution of a specific type of nodes into the chain.
@@ -93,3 +145,15 @@ class BatchChainInfoView(generics.RetrieveAPIView):
         except:
             raise exceptions.NotFound("Batch does not exist.")
         return batch
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Overrided to serve the chain info from the cache.
+        """
+        batch = self.get_object()
+        entry = caching.get_entry(
+            'batch_chain_info', batch.id, batch.tenant_id,
+            lambda: self.get_serializer(batch).data,
+            lambda: caching.get_batch_node_ids(batch),
+            operation=request.query_params.get('operation', ''))
+        return self.get_cached_response(entry, Response(entry['data']))
@@ -0,0 +1,53 @@
+"""
+Caching of the dashboard stats.
+
+Stats are cached per tenant under a version number, and every change that
+can affect them, like a connection, transaction, claim or risk score of a
+node of the tenant, moves the tenant to the next version. Stale entries
+are never read again and expire by themselves.
+"""
+
+from django.core.cache import cache
+
+from v1.dashboard import constants as dashboard_consts
+
+
+def get_cache_version(tenant_id):
+    """
+    Returns the current version of the cached stats of the tenant.
+    """
+    key = dashboard_consts.DASHBOARD_STATS_VERSION_KEY.format(tenant=tenant_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def invalidate_stats(tenant_id):
+    """
+    Invalidates the cached stats of all the nodes of the tenant by moving
+    to the next cache version.
+    """
+    key = dashboard_consts.DASHBOARD_STATS_VERSION_KEY.format(tenant=tenant_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+    return True
+
+
+def get_stats(name, tenant_id, compute, **params):
+    """
+    Returns the stats with the name from the cache, computing and caching
+    them if missing. The params are the node, supply chain, date range or
+    anything else the stats depend on.
+    """
+    key = dashboard_consts.DASHBOARD_STATS_CACHE_KEY.format(
+        name=name, tenant=tenant_id, version=get_cache_version(tenant_id),
+        params=':'.join(f'{k}={params[k]}' for k in sorted(params)))
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute()
+        cache.set(key, stats, dashboard_consts.DASHBOARD_STATS_CACHE_TIMEOUT)
+    return stats
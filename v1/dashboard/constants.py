@@ -9,3 +9,8 @@ class Duration(models.IntegerField):
     MONTHLY = 111, _('Monthly')
     WEEKLY = 121, _('Weekly')
     DAILY = 131, _('Daily')
+
+
+DASHBOARD_STATS_CACHE_KEY = "dashboard_stats:{name}:{tenant}:{version}:{params}"
+DASHBOARD_STATS_VERSION_KEY = "dashboard_stats_version:{tenant}"
+DASHBOARD_STATS_CACHE_TIMEOUT = 60 * 60 * 24
@@ -0,0 +1,28 @@
+"""Command to rebuild the daily stock flows of the nodes."""
+
+from django.core.management.base import BaseCommand
+
+from v1.dashboard import stock_flows
+from v1.nodes.models import Node
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the daily stock flows read by the dashboard charts from the
+    transactions. Run it once after the rollup is introduced, and to
+    repair it if it falls out of sync.
+    """
+    help = 'Rebuild the daily stock flows of the nodes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, default=None,
+            help='Id of the tenant to rebuild the stock flows of.')
+
+    def handle(self, *args, **options):
+        if not options['tenant']:
+            count = stock_flows.refresh()
+        else:
+            node_ids = list(Node.objects.filter(
+                tenant_id=options['tenant']).values_list('id', flat=True))
+            count = stock_flows.refresh(node_ids=node_ids)
+        self.stdout.write(f'Rebuilt {count} daily stock flows.')
@@ -0,0 +1,34 @@
+# Generated by Django 4.0.4 on 2026-10-18 11:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0024_batch_date'),
+        ('nodes', '0041_nodedocument_openai_file_id'),
+        ('supply_chains', '0048_connectionsummary'),
+        ('dashboard', '0015_trackertheme_header_boarder_colour_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStockFlow',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('received_kg', models.FloatField(default=0.0, verbose_name='Received Quantity In KG')),
+                ('sent_kg', models.FloatField(default=0.0, verbose_name='Sent Quantity In KG')),
+                ('processed_kg', models.FloatField(default=0.0, verbose_name='Processed Quantity In KG')),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stock_flows', to='nodes.node', verbose_name='Node')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stock_flows', to='products.product', verbose_name='Product')),
+                ('supply_chain', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stock_flows', to='supply_chains.supplychain', verbose_name='Supply Chain')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailystockflow',
+            constraint=models.UniqueConstraint(fields=('node', 'product', 'date'), name='dashboard_stock_flow_unique_day'),
+        ),
+    ]
@@ -232,3 +232,46 @@ class TrackerTheme(AbstractBaseModel):
             except:
                 pass
         return super().save(*args, **kwargs)
+
+
+class DailyStockFlow(models.Model):
+    """
+    Quantities of a product received, sent and processed by a node in a
+    day, rolled up from the approved transactions for the dashboard
+    charts. Maintained by v1.dashboard.stock_flows.
+
+    Attribs:
+        node(obj)           : Node the stock belongs to.
+        product(obj)        : Product of the stock.
+        supply_chain(obj)   : Supply chain of the product.
+        date(date)          : Transaction date.
+        received_kg(float)  : Quantity received in batches, in kg.
+        sent_kg(float)      : Quantity sent from batches, in kg.
+        processed_kg(float) : Quantity used in processing, in kg.
+    """
+    node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='daily_stock_flows', verbose_name=_('Node'))
+    product = models.ForeignKey(
+        'products.Product', on_delete=models.CASCADE,
+        related_name='daily_stock_flows', verbose_name=_('Product'))
+    supply_chain = models.ForeignKey(
+        'supply_chains.SupplyChain', on_delete=models.CASCADE,
+        related_name='daily_stock_flows', verbose_name=_('Supply Chain'))
+    date = models.DateField(verbose_name=_('Date'))
+    received_kg = models.FloatField(
+        default=0.0, verbose_name=_('Received Quantity In KG'))
+    sent_kg = models.FloatField(
+        default=0.0, verbose_name=_('Sent Quantity In KG'))
+    processed_kg = models.FloatField(
+        default=0.0, verbose_name=_('Processed Quantity In KG'))
+
+    class Meta:
+        """Meta setup"""
+        constraints = [UniqueConstraint(
+            fields=['node', 'product', 'date'],
+            name='dashboard_stock_flow_unique_day')]
+
+    def __str__(self):
+        """Object name in django admin."""
+        return f'{self.node_id} - {self.product_id} - {self.date}'
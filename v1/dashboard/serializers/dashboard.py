@@ -1,11 +1,13 @@
 """Serializers used for creating dashboard apis."""
+import datetime
 
+from dateutil.relativedelta import relativedelta
 from rest_framework import serializers
-from django.db.models import Sum, Q, F, Count,Subquery, OuterRef
+from django.db.models import Sum, Q, F, Count, Exists, OuterRef
 from django.db.models.functions import ExtractYear
 from django.utils import timezone
 
-from utilities.functions import decode, percentage, get_past_months, read_date, split_list
+from utilities.functions import decode, percentage, get_past_months, read_date
 
 from base import exceptions
 from base import session
@@ -13,20 +15,26 @@ from base import session
 from v1.nodes import models as node_models
 from v1.nodes import constants as node_consts
 
+from v1.tenants import models as tenant_models
+
 from v1.supply_chains import models as supply_models
 from v1.supply_chains import constants as supply_consts
 
 from v1.claims import constants as claim_consts
+from v1.claims import models as claim_models
 
 from v1.products import models as prod_models
+from v1.products import stock
 
 from v1.transactions import constants as txn_consts
 from v1.transactions import models as txn_models
 
-from v1.risk import models as risk_models
 from v1.risk import constants as risk_consts
 
 from v1.dashboard import constants as dashboard_consts
+from v1.dashboard import caching
+from v1.dashboard import tiers
+from v1.dashboard import stock_flows
 
 
 class ConnectionStatSerializer(serializers.ModelSerializer):
@@ -54,42 +62,65 @@ class ConnectionStatSerializer(serializers.ModelSerializer):
             pass
 
     def get_connection_stats(self, node):
-        """Return numerical stats about connections of a node."""
-        connections = node.get_connections(supply_chain=self.supply_chain).all()
+        """
+        Return numerical stats about connections of a node, cached per
+        node, supply chain and date range.
+        """
         request = self.context['request']
         date1 = request.query_params.get('date1')
         date2 = request.query_params.get('date2')
+        return caching.get_stats(
+            'connection_stats', node.tenant_id,
+            lambda: self.compute_connection_stats(node, date1, date2),
+            node=node.id, sc=getattr(self.supply_chain, 'id', None),
+            date1=date1, date2=date2)
+
+    def compute_connection_stats(self, node, date1, date2):
+        """
+        Computes the connection stats from the types of the connections,
+        the status of the connections with them and the connections that
+        transacted in the date range, each fetched in a single query.
+        """
+        connections = node.get_connections(supply_chain=self.supply_chain).all()
         if date1:
             connections = connections.filter(
                 created_on__date__range=[date1, date2])
-        companies = connections.filter(type=node_consts.NodeType.COMPANY)
-        producers = connections.filter(type=node_consts.NodeType.PRODUCER)
-
-        transacted_connections = connections.filter(
-            Q(outgoing_transactions__date__range=(date1, date2)) |
-            Q(incoming_transactions__date__range=(date1, date2))
-        ).distinct('id')
-        transacted_companies = companies.filter(
-            Q(outgoing_transactions__date__range=(date1, date2)) |
-            Q(incoming_transactions__date__range=(date1, date2))
-        ).distinct('id')
-        transacted_producers = producers.filter(
-            Q(outgoing_transactions__date__range=(date1, date2)) |
-            Q(incoming_transactions__date__range=(date1, date2))
-        ).distinct('id')
+        types = dict(connections.values_list('id', 'type'))
+        statuses = supply_models.Connection.objects.filter(
+            source=node, target_id__in=types)
+        if self.supply_chain:
+            statuses = statuses.filter(supply_chain=self.supply_chain)
+        active = set()
+        pending = set()
+        for target_id, status in statuses.values_list('target_id', 'status'):
+            if status == supply_consts.ConnectionStatus.APPROVED:
+                active.add(target_id)
+            elif status == supply_consts.ConnectionStatus.PENDING:
+                pending.add(target_id)
+        transacted = set()
+        if date1 and date2:
+            txns = txn_models.ExternalTransaction.objects.filter(
+                Q(source_id__in=types) | Q(destination_id__in=types),
+                date__range=(date1, date2))
+            for source_id, destination_id in txns.values_list(
+                    'source_id', 'destination_id').distinct():
+                transacted.update((source_id, destination_id))
+            transacted &= types.keys()
+        companies = {
+            node_id for node_id, node_type in types.items()
+            if node_type == node_consts.NodeType.COMPANY}
+        producers = {
+            node_id for node_id, node_type in types.items()
+            if node_type == node_consts.NodeType.PRODUCER}
         connection_data = {
-            "total": connections.count(),
-            "companies": companies.count(),
-            "producers": producers.count(),
-            "active": connections.filter(
-                target_connections__status=supply_consts.ConnectionStatus.APPROVED
-            ).count(),
-            "pending": connections.filter(
-                target_connections__status=supply_consts.ConnectionStatus.PENDING
-            ).count(),
-            "transacted": transacted_connections.count(),
-            "transacted_companies": transacted_companies.count(),
-            "transacted_producers": transacted_producers.count(),
+            "total": len(types),
+            "companies": len(companies),
+            "producers": len(producers),
+            "active": len(active),
+            "pending": len(pending),
+            "transacted": len(transacted),
+            "transacted_companies": len(transacted & companies),
+            "transacted_producers": len(transacted & producers),
         }
         return connection_data
 
@@ -168,51 +199,69 @@ class SupplierStatSerializer(serializers.ModelSerializer):
         self.connections = self.instance.get_connections(
             supply_chain=self.supply_chain)
         
-    def get_t2_suppliers(self):
-        """
-        Return suppliers of the current nodes connections.
+    def get_suppliers_stats(self, node):
         """
-        t2_suppliers = node_models.Node.objects.filter(
-            target_connections__source__in=self.suppliers,
-            target_connections__is_supplier=True,
-            ).annotate(
-            supply_chain_id=F('target_connections__supply_chain__id')
-            )
+        Return numerical stats about supplier connections of a node,
+        cached per node and supply chain.
+        """
+        return caching.get_stats(
+            'suppliers_stats', node.tenant_id,
+            lambda: self.compute_suppliers_stats(node),
+            node=node.id, sc=getattr(self.supply_chain, 'id', None))
+
+    def compute_suppliers_stats(self, node):
+        """
+        Computes the supplier stats from the country and certification of
+        the suppliers, the status of the connections with them, and the
+        connections of the suppliers, each fetched in a single query.
+        """
+        suppliers = {}
+        countries = {}
+        for supplier_id, country_id, country_score, certified in \
+                self.suppliers.annotate(
+                certified=Exists(claim_models.NodeClaim.objects.filter(
+                    node=OuterRef('pk')))).values_list(
+                'id', 'province__country_id', 'province__country__score',
+                'certified'):
+            suppliers[supplier_id] = certified
+            if country_id is not None:
+                countries[country_id] = country_score
+        statuses = supply_models.Connection.objects.filter(
+            source=node, target_id__in=suppliers,
+            status=supply_consts.ConnectionStatus.APPROVED)
         if self.supply_chain:
-            t2_suppliers = t2_suppliers.filter(
-                supply_chain_id=self.supply_chain.id)
-        return t2_suppliers.distinct()
-
-    def get_suppliers_stats(self, node):
-        """Return numerical stats about supplier connections of a node."""
-        t1_having_suppliers = node.get_t1_having_connections(
-                sc=self.supply_chain, connections=self.suppliers).count()
-        certificate_having_suppliers = self.suppliers.exclude(
-            node_claims=None
-            ).count()
-        t2_suppliers  = self.get_t2_suppliers()
-        active_t2_suppliers = t2_suppliers.filter(
-            status=node_consts.NodeStatus.ACTIVE)
-        countries = self.suppliers.order_by(
-                'province__country__id'
-                ).distinct('province__country__id')
-        high_risk_countries = countries.filter(
-                    province__country__score__lte=43)
+            statuses = statuses.filter(supply_chain=self.supply_chain)
+        active = statuses.values('target_id').distinct().count()
+        t1_having_suppliers = supply_models.Connection.objects.filter(
+            source_id__in=suppliers,
+            initiation=supply_consts.ConnectionInitiation.MANUAL
+            ).values('source_id').distinct().count()
+        t2_suppliers = supply_models.Connection.objects.filter(
+            source_id__in=suppliers, is_supplier=True)
+        if self.supply_chain:
+            t2_suppliers = t2_suppliers.filter(supply_chain=self.supply_chain)
+        t2_statuses = dict(t2_suppliers.values_list(
+            'target_id', 'target__status').distinct())
+        active_t2_suppliers = sum(
+            1 for status in t2_statuses.values()
+            if status == node_consts.NodeStatus.ACTIVE)
+        high_risk_countries = sum(
+            1 for score in countries.values()
+            if score is not None and score <= 43)
+        total = len(suppliers)
         suppliers_data = {
-            "total": self.suppliers.count(),
-            "active": self.suppliers.filter(
-                target_connections__status=supply_consts.ConnectionStatus.APPROVED
-                ).count(),
-            "suppliers_country_count": countries.count(),
+            "total": total,
+            "active": active,
+            "suppliers_country_count": len(countries),
             "high_risk_supplier_countries": percentage(
-                high_risk_countries.count(),countries.count()),
+                high_risk_countries, len(countries)),
             "t1_having_suppliers": t1_having_suppliers,
             "t1_having_suppliers_percentage": percentage(
-                t1_having_suppliers,self.suppliers.count()), 
+                t1_having_suppliers, total), 
             "certificated_suppliers_percentage": percentage(
-                certificate_having_suppliers,self.suppliers.count()),
+                sum(suppliers.values()), total),
             "t2_active_suppliers_percentage": percentage(
-                active_t2_suppliers.count(),t2_suppliers.count())
+                active_t2_suppliers, len(t2_statuses))
         }
         return suppliers_data
     
@@ -251,14 +300,7 @@ class SupplierStatSerializer(serializers.ModelSerializer):
             # txn_stock_quantity = txns.aggregate(
             #     total_quantity=Sum('destination_quantity',default=0.0)
             #     )['total_quantity']
-            batch_quantity = (prod_models.Batch.objects.filter(
-                node=company, product=product,
-                incoming_transactions__status=txn_consts.TransactionStatus.APPROVED
-                ) | prod_models.Batch.objects.filter(
-                node=company, product=product,
-                incoming_transactions=None
-                )).distinct().aggregate(total_quantity=Sum('current_quantity',default=0.0)
-                )['total_quantity']
+            batch_quantity = stock.get_quantity(product, company) or 0.0
             product_data = {
                 "name": product.name, 
                 "suppliers": txns.filter(source__in=self.suppliers).order_by(
@@ -277,9 +319,7 @@ class SupplierStatSerializer(serializers.ModelSerializer):
         Supplier type based data.
         """
         suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('overall')[:1]))
+            risk_score_value=F('current_risk_score__overall'))
         high_risk_suppliers = suppliers.filter(risk_score_value__lte=43)
         medium_risk_suplliers = suppliers.filter(
             risk_score_value__lte=60, risk_score_value__gt=43)
@@ -294,26 +334,48 @@ class SupplierStatSerializer(serializers.ModelSerializer):
     
     def get_location_stats(self,company):
         """
-        Return location wise suppliers info.
+        Return location wise suppliers info, cached per node and supply
+        chain.
         """
-        distinct_nodes = self.suppliers.filter(
-            outgoing_transactions__destination=session.get_current_node()
-            ).order_by(
-            'province_id').distinct('province_id')
-        location_data = []
-        for distinct_node in distinct_nodes:
-            province = distinct_node.province
-            t1_suppliers = self.suppliers.filter(province=province)
-            products = prod_models.Product.objects.filter(
+        return caching.get_stats(
+            'location_stats', company.tenant_id,
+            lambda: self.compute_location_stats(company),
+            node=company.id, sc=getattr(self.supply_chain, 'id', None))
+
+    def compute_location_stats(self, company):
+        """
+        Computes the location stats from the provinces of the suppliers
+        and the products they sent to the company, each fetched in a single
+        query.
+        """
+        suppliers = dict(self.suppliers.exclude(
+            province=None).values_list('id', 'province_id'))
+        current_node = session.get_current_node()
+        senders = set(txn_models.ExternalTransaction.objects.filter(
+            source_id__in=suppliers, destination=current_node
+            ).values_list('source_id', flat=True).distinct())
+        product_names = {}
+        for source_id, name in prod_models.Product.objects.filter(
                 batches__incoming_transactions__externaltransaction__destination=company,
-                batches__incoming_transactions__externaltransaction__source__in=t1_suppliers
-                ).distinct().values_list('name',flat=True)
+                batches__incoming_transactions__externaltransaction__source__in=suppliers.keys()
+                ).values_list(
+                'batches__incoming_transactions__externaltransaction__source_id',
+                'name').distinct():
+            product_names.setdefault(suppliers[source_id], set()).add(name)
+        province_ids = {suppliers[supplier_id] for supplier_id in senders}
+        t1_suppliers = {}
+        for province_id in suppliers.values():
+            t1_suppliers[province_id] = t1_suppliers.get(province_id, 0) + 1
+        provinces = tenant_models.Province.objects.filter(
+            id__in=province_ids).select_related('country').order_by('id')
+        location_data = []
+        for province in provinces:
             info = {
                 "province":province.name,
                 "country": province.country.name,
                 "country_risk": province.country.risk_level,
-                "t1_suppliers": t1_suppliers.count(),
-                "products": products
+                "t1_suppliers": t1_suppliers[province.id],
+                "products": sorted(product_names.get(province.id, []))
             }
             location_data.append(info)
         return location_data
@@ -327,61 +389,11 @@ class SupplierStatSerializer(serializers.ModelSerializer):
         }
         return company_data
     
-    def create_supplier_tier_data(self,suppliers=None,tier_info=[], total_suppliers=[]):
-        """
-        Method creates supplier tier data.
-        """
-        new_suppliers = node_models.Node.objects.none()
-        added_suppliers = []
-        for supplier in suppliers:
-            suppliers = suppliers.exclude(id=supplier.id)
-            if supplier in added_suppliers:
-                tier_data = {
-                    "tier": 0,
-                    "total_suppliers": 0,
-                    "low_risk_suppliers": 0,
-                    "medium_risk_suppliers": 0,
-                    "high_risk_suppliers": 0
-                }
-                return tier_data
-            new_suppliers = new_suppliers | supplier.get_connections(
-                supply_chain=self.supply_chain).filter(
-                is_supplier=True).exclude(id__in=total_suppliers)
-            added_suppliers.append(supplier)
-            total_suppliers.append(supplier.id)
-            if not suppliers and new_suppliers:
-                new_suppliers = new_suppliers.distinct().annotate(
-                    risk_score_value=Subquery(
-                    risk_models.RiskScore.objects.filter(
-                    node=OuterRef('pk')).order_by('-id').values('overall')[:1]))
-                low_risk_suppliers = new_suppliers.filter(risk_score_value__gt=60)
-                high_risk_suppliers = new_suppliers.filter(risk_score_value__lte=43)
-                medium_risk_suplliers = new_suppliers.filter(
-                    risk_score_value__lte=60, risk_score_value__gt=43)
-                tier_data = {
-                    "tier": len(tier_info)+1,
-                    "total_suppliers": new_suppliers.count(),
-                    "low_risk_suppliers": low_risk_suppliers.count(),
-                    "medium_risk_suppliers": medium_risk_suplliers.count(),
-                    "high_risk_suppliers": high_risk_suppliers.count()
-                }
-                tier_info.append(tier_data)
-                suppliers = new_suppliers
-                if suppliers:
-                    self.create_supplier_tier_data(
-                        suppliers,tier_info=tier_info,total_suppliers=total_suppliers)
-                new_suppliers = node_models.Node.objects.none()
-        return tier_info
-
-    
     def get_supplier_tier_stats(self,company):
         """
         Return supplier tier wise statistics.
         """
-        suppliers = node_models.Node.objects.filter(
-            id=company.id)
-        tier_info = self.create_supplier_tier_data(suppliers,tier_info=[],total_suppliers=[])
-        return tier_info
+        return tiers.SupplierTiers(company, self.supply_chain).get_stats()
 
     
 class ProductInfoSerializer(serializers.ModelSerializer):
@@ -398,80 +410,53 @@ class ProductInfoSerializer(serializers.ModelSerializer):
         model = prod_models.Product
         fields = ('name', 'batch_data')
 
-    def get_yearly_data(self, batches, interval,start_date):
+    def get_yearly_data(self, product, interval,start_date):
         """
         Return yearly data.
         """
         current_year = start_date.year
         years = list(range(current_year-interval, current_year+1))
+        series = stock_flows.get_series(
+            session.get_current_node(), product,
+            datetime.date(years[0], 1, 1),
+            datetime.date(current_year + 1, 1, 1), 'year')
+        if not series:
+            return []
+        start_year = min(series).year
         data = []
-        incoming_types = [
-            txn_consts.ExternalTransactionType.INCOMING,
-            txn_consts.ExternalTransactionType.INCOMING_WITHOUT_SOURCE
-        ]
-        all_txn_types = incoming_types + [txn_consts.ExternalTransactionType.OUTGOING]
-        ordered_txns = txn_models.ExternalTransaction.objects.filter(
-            Q(result_batches__in=batches,type__in=all_txn_types,date__year__in=years,
-              status=txn_consts.TransactionStatus.APPROVED)|Q(
-            source_batches__in=batches,type__in=all_txn_types,date__year__in=years,
-            status=txn_consts.TransactionStatus.APPROVED)
-            ).distinct('date__year').order_by('date__year')
-        if not ordered_txns:
-            return data
-        start_year = ordered_txns.first().date.year
-        years = split_list(years,start_year,part2=True)
         for year in years:
-            year_info = {}
-            year_info['span'] = year
-            year_info['receive'] = batches.filter(
-                incoming_transactions__date__year=year,
-                incoming_transactions__externaltransaction__type__in=all_txn_types,
-                incoming_transactions__status=txn_consts.TransactionStatus.APPROVED
-                ).aggregate(quantity=Sum('initial_quantity',default=0.0))['quantity']
-            year_info['send'] = batches.filter(
-                outgoing_transactions__date__year=year,
-                outgoing_transactions__externaltransaction__type__in=all_txn_types,
-                outgoing_transactions__status=txn_consts.TransactionStatus.APPROVED
-                ).aggregate(quantity=Sum('outgoing_transaction_objects__quantity',default=0.00))['quantity']
-            data.append(year_info)
+            if year < start_year:
+                continue
+            flow = series.get(datetime.date(year, 1, 1), {})
+            data.append({
+                'span': year,
+                'receive': flow.get('receive', 0.0),
+                'send': flow.get('send', 0.0)
+            })
         return data
     
-    def get_monthly_data(self, batches, interval,start_date):
+    def get_monthly_data(self, product, interval,start_date):
         """
         get monthly data.
         """
         dates = get_past_months(start_date, interval)
         dates.reverse()
+        series = stock_flows.get_series(
+            session.get_current_node(), product, dates[0],
+            dates[-1] + relativedelta(months=1), 'month')
+        if not series:
+            return []
+        txn_start_date = min(series)
         data = []
-        incoming_types = [
-            txn_consts.ExternalTransactionType.INCOMING,
-            txn_consts.ExternalTransactionType.INCOMING_WITHOUT_SOURCE
-        ]
-        all_txn_types = incoming_types + [txn_consts.ExternalTransactionType.OUTGOING]
-        ordered_txns = txn_models.ExternalTransaction.objects.filter(
-            Q(result_batches__in=batches,type__in=all_txn_types,date__gte=dates[0])|Q(
-            source_batches__in=batches,type__in=all_txn_types,date__gte=dates[0])
-            ).distinct('date').order_by('date')
-        if not ordered_txns:
-            return data
-        txn_start_date = ordered_txns.first().date
-        dates = split_list(dates,txn_start_date.replace(day=1),part2=True)
         for date in dates:
-            month_info = {}
-            month_info['span'] = date.strftime("%B %Y")
-            month_info['receive'] = batches.filter(
-                incoming_transactions__date__year=date.year,
-                incoming_transactions__date__month=date.month,
-                incoming_transactions__externaltransaction__type__in=all_txn_types,
-                incoming_transactions__status=txn_consts.TransactionStatus.APPROVED
-                ).aggregate(quantity=Sum('initial_quantity',default=0.0))['quantity']
-            month_info['send'] = batches.filter(
-                outgoing_transactions__date__year=date.year,
-                outgoing_transactions__date__month=date.month,
-                outgoing_transactions__externaltransaction__type__in=all_txn_types,
-                outgoing_transactions__status=txn_consts.TransactionStatus.APPROVED
-                ).aggregate(quantity=Sum('outgoing_transaction_objects__quantity',default=0.00))['quantity']
-            data.append(month_info)
+            if date < txn_start_date:
+                continue
+            flow = series.get(date, {})
+            data.append({
+                'span': date.strftime("%B %Y"),
+                'receive': flow.get('receive', 0.0),
+                'send': flow.get('send', 0.0)
+            })
         return data
     
     def get_batch_data(self,product):
@@ -489,12 +474,11 @@ class ProductInfoSerializer(serializers.ModelSerializer):
             start_date = read_date(start_date)
         if not start_date:
             start_date = timezone.now().date()
-        batches = product.batches.filter(node=session.get_current_node())
         data = []
         if duration == dashboard_consts.Duration.YEARLY[0]:
-            data = self.get_yearly_data(batches,interval,start_date)
+            data = self.get_yearly_data(product,interval,start_date)
         if duration == dashboard_consts.Duration.MONTHLY[0]:
-            data = self.get_monthly_data(batches,interval,start_date)
+            data = self.get_monthly_data(product,interval,start_date)
         return data
     
     def to_representation(self, instance):
@@ -539,24 +523,16 @@ class ESGStatSerializer(serializers.Serializer):
         Adds risk score suppliers based on the given category.
         """
         suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('overall')[:1]))
+            risk_score_value=F('current_risk_score__overall'))
         if category == risk_consts.Category.ENVIRONMENT:
             suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('environment')[:1]))
+            risk_score_value=F('current_risk_score__environment'))
         elif category == risk_consts.Category.SOCIAL:
             suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('social')[:1]))
+            risk_score_value=F('current_risk_score__social'))
         elif category == risk_consts.Category.GOVERNANCE:
             suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('governance')[:1]))
+            risk_score_value=F('current_risk_score__governance'))
         return suppliers
 
     def get_esg_stats(self,company):
@@ -565,13 +541,30 @@ class ESGStatSerializer(serializers.Serializer):
         """
         category = int(self.context['request'].query_params.get(
             'risk_category', risk_consts.Category.OVERALL))
-        suppliers = self.add_risk_score_to_suppliers(category=category)
-        high_risk_suppliers = suppliers.filter(
-            risk_score_value__lte=43).count()
-        medium_risk_suplliers = suppliers.filter(
-            risk_score_value__lte=60, risk_score_value__gt=43).count()
-        low_risk_suppliers = suppliers.filter(risk_score_value__gt=60).count()
-        total = self.suppliers.count()
+        return caching.get_stats(
+            'esg_stats', company.tenant_id,
+            lambda: self.compute_esg_stats(category),
+            node=company.id, sc=getattr(self.supply_chain, 'id', None),
+            category=category)
+
+    def compute_esg_stats(self, category):
+        """
+        Computes the esg stats from the scores of the suppliers in the
+        category, fetched in a single query.
+        """
+        scores = list(self.add_risk_score_to_suppliers(
+            category=category).values_list('risk_score_value', flat=True))
+        high_risk_suppliers = medium_risk_suplliers = low_risk_suppliers = 0
+        for score in scores:
+            if score is None:
+                continue
+            if score > 60:
+                low_risk_suppliers += 1
+            elif score > 43:
+                medium_risk_suplliers += 1
+            else:
+                high_risk_suppliers += 1
+        total = len(scores)
         low_risk_info = {
             "suppliers": low_risk_suppliers,
             "percentage": percentage(low_risk_suppliers,total)
@@ -627,24 +620,16 @@ class RiskStatSerializer(serializers.Serializer):
         Adds risk score suppliers based on the given category.
         """
         suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('overall')[:1]))
+            risk_score_value=F('current_risk_score__overall'))
         if category == risk_consts.Category.ENVIRONMENT:
             suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('environment')[:1]))
+            risk_score_value=F('current_risk_score__environment'))
         elif category == risk_consts.Category.SOCIAL:
             suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('social')[:1]))
+            risk_score_value=F('current_risk_score__social'))
         elif category == risk_consts.Category.GOVERNANCE:
             suppliers = self.suppliers.annotate(
-            risk_score_value=Subquery(
-            risk_models.RiskScore.objects.filter(
-            node=OuterRef('pk')).order_by('-id').values('governance')[:1]))
+            risk_score_value=F('current_risk_score__governance'))
         return suppliers
         
     def get_sc_score_stats(self,company):
@@ -664,32 +649,33 @@ class RiskStatSerializer(serializers.Serializer):
         """
         ESG Score info.
         """
-        environmental_low_suppliers = self.add_risk_score_to_suppliers(
-            category=risk_consts.Category.ENVIRONMENT).filter(
-            risk_score_value__gt=60).count()
-        social_low_suppliers = self.add_risk_score_to_suppliers(
-            category=risk_consts.Category.SOCIAL).filter(
-            risk_score_value__gt=60).count()
-        governance_low_suppliers = self.add_risk_score_to_suppliers(
-            category=risk_consts.Category.GOVERNANCE).filter(
-            risk_score_value__gt=60).count()
-        total = self.suppliers.count()
+        low_suppliers = [0, 0, 0]
+        total = 0
+        for scores in self.suppliers.values_list(
+                'current_risk_score__environment', 'current_risk_score__social',
+                'current_risk_score__governance'):
+            total += 1
+            for index, score in enumerate(scores):
+                if score is not None and score > 60:
+                    low_suppliers[index] += 1
+        environmental_low_suppliers, social_low_suppliers, \
+            governance_low_suppliers = low_suppliers
         esg_data = {
             "environment": {
-                "risk_score": round(company.risk_score.environment,2),
-                "risk_level": company.risk_score.environment_risk_level,
+                "risk_score": round(company.current_score.environment,2),
+                "risk_level": company.current_score.environment_risk_level,
                 "low_risk_suppliers_percentage": percentage(
                     environmental_low_suppliers,total)
             }, 
             "social": {
-                "risk_score": round(company.risk_score.social,2),
-                "risk_level": company.risk_score.social_risk_level,
+                "risk_score": round(company.current_score.social,2),
+                "risk_level": company.current_score.social_risk_level,
                 "low_risk_suppliers_percentage": percentage(
                     social_low_suppliers,total)
             },
             "governance": {
-                "risk_score": round(company.risk_score.governance,2),
-                "risk_level": company.risk_score.governance_risk_level,
+                "risk_score": round(company.current_score.governance,2),
+                "risk_level": company.current_score.governance_risk_level,
                 "low_risk_suppliers_percentage": percentage(
                     governance_low_suppliers,total)
             }
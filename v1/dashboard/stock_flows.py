@@ -0,0 +1,149 @@
+"""
+Daily stock flow rollup of the nodes.
+
+Quantities received, sent and processed by each node are kept per product
+and day in DailyStockFlow, so that the dashboard charts read a single
+grouped query over the rollup instead of aggregating the transactions of
+each month or year.
+
+The days of a transaction are recomputed from the transactions once it is
+created, approved or rejected. rebuild_stock_flows recomputes all of them.
+"""
+import datetime
+
+from django.db import models
+from django.db import transaction as django_transaction
+from django.db.models.functions import Trunc
+
+from v1.dashboard.models import DailyStockFlow
+
+from v1.nodes.models import Node
+
+from v1.products import models as prod_models
+
+from v1.transactions import constants as txn_consts
+from v1.transactions import models as txn_models
+
+EXTERNAL_TYPES = [
+    txn_consts.ExternalTransactionType.INCOMING,
+    txn_consts.ExternalTransactionType.INCOMING_WITHOUT_SOURCE,
+    txn_consts.ExternalTransactionType.OUTGOING,
+]
+
+FLOW_FIELDS = ('received_kg', 'sent_kg', 'processed_kg')
+
+
+def get_flows(node_ids=None, dates=None):
+    """
+    Returns the quantities of each node, product, supply chain and day in
+    kg, computed from the approved transactions. Only the nodes and dates
+    given are computed.
+    """
+    approved = txn_consts.TransactionStatus.APPROVED
+    received = prod_models.Batch.objects.filter(
+        incoming_transactions__status=approved,
+        incoming_transactions__externaltransaction__type__in=EXTERNAL_TYPES)
+    sent = txn_models.SourceBatch.objects.filter(
+        transaction__status=approved,
+        transaction__externaltransaction__type__in=EXTERNAL_TYPES)
+    processed = txn_models.SourceBatch.objects.filter(
+        transaction__status=approved,
+        transaction__internaltransaction__type=(
+            txn_consts.InternalTransactionType.PROCESSING))
+    queries = (
+        ('received_kg', received, '', 'incoming_transactions__date',
+         'initial_quantity_kg'),
+        ('sent_kg', sent, 'batch__', 'transaction__date', 'quantity_kg'),
+        ('processed_kg', processed, 'batch__', 'transaction__date',
+         'quantity_kg'),
+    )
+    flows = {}
+    for field, query, batch, date, quantity in queries:
+        if node_ids is not None:
+            query = query.filter(**{f'{batch}node_id__in': node_ids})
+        if dates is not None:
+            query = query.filter(**{f'{date}__in': dates})
+        rows = query.order_by().values_list(
+            f'{batch}node_id', f'{batch}product_id',
+            f'{batch}product__supply_chain_id', date).annotate(
+            quantity=models.Sum(quantity))
+        for node_id, product_id, sc_id, day, total in rows:
+            flow = flows.setdefault(
+                (node_id, product_id, sc_id, day),
+                dict.fromkeys(FLOW_FIELDS, 0.0))
+            flow[field] = float(total or 0)
+    return flows
+
+
+@django_transaction.atomic
+def refresh(node_ids=None, dates=None):
+    """
+    Replaces the rollup of the nodes and dates with the quantities
+    computed from the transactions. Everything is rebuilt when no node
+    or date is given.
+
+    The nodes are locked first, in the order of their ids, so that
+    parallel refreshes of a node wait for each other instead of both
+    inserting its days.
+    """
+    nodes = Node.objects.select_for_update().order_by('id')
+    if node_ids is not None:
+        nodes = nodes.filter(id__in=node_ids)
+    list(nodes.values_list('id', flat=True))
+    stale = DailyStockFlow.objects.all()
+    if node_ids is not None:
+        stale = stale.filter(node_id__in=node_ids)
+    if dates is not None:
+        stale = stale.filter(date__in=dates)
+    stale.delete()
+    flows = get_flows(node_ids, dates)
+    DailyStockFlow.objects.bulk_create([
+        DailyStockFlow(
+            node_id=node_id, product_id=product_id, supply_chain_id=sc_id,
+            date=day, **flow)
+        for (node_id, product_id, sc_id, day), flow in flows.items()
+    ], batch_size=1000)
+    return len(flows)
+
+
+def schedule_refresh(transaction):
+    """
+    Refreshes the rollup of the nodes and the day of the transaction in
+    the background, once the transaction and its batches are saved.
+    """
+    from v1.dashboard import tasks
+
+    def _refresh():
+        node_ids = set(prod_models.Batch.objects.filter(
+            models.Q(incoming_transactions=transaction) |
+            models.Q(outgoing_transactions=transaction)
+            ).values_list('node_id', flat=True))
+        if node_ids:
+            tasks.refresh_stock_flows.delay(
+                list(node_ids), [transaction.date.isoformat()])
+    django_transaction.on_commit(_refresh)
+
+
+def get_series(node, product, start_date, end_date, period):
+    """
+    Returns the quantities received and sent by the node between the
+    dates in a single grouped query, as a dict of the first day of each
+    period ('year' or 'month') to the quantities in the unit of the
+    product.
+    """
+    trunc = Trunc('date', period, output_field=models.DateField())
+    rows = DailyStockFlow.objects.filter(
+        node=node, product=product, date__gte=start_date, date__lt=end_date
+        ).annotate(span=trunc).order_by().values('span').annotate(
+        receive=models.Sum('received_kg'), send=models.Sum('sent_kg'))
+    equivalent_kg = float(product.unit.equivalent_kg or 1)
+    return {
+        row['span']: {
+            'receive': row['receive'] / equivalent_kg,
+            'send': row['send'] / equivalent_kg,
+        } for row in rows}
+
+
+def read_dates(dates):
+    """Returns dates from their iso format strings."""
+    return [datetime.date.fromisoformat(date) for date in dates]
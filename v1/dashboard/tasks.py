@@ -0,0 +1,14 @@
+"""
+Celery tasks
+"""
+from celery import shared_task
+
+from v1.dashboard import stock_flows
+
+
+@shared_task(name='refresh_stock_flows')
+def refresh_stock_flows(node_ids, dates):
+    """
+    Task to refresh the daily stock flows of the nodes on the dates.
+    """
+    return stock_flows.refresh(node_ids, stock_flows.read_dates(dates))
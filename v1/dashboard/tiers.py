@@ -0,0 +1,106 @@
+"""Tier wise statistics of the suppliers of a node."""
+
+from v1.risk import models as risk_models
+from v1.supply_chains import models as supply_models
+from v1.supply_chains import constants as supply_consts
+
+from v1.dashboard import caching
+
+
+class SupplierTiers:
+    """
+    Computes tier wise supplier statistics of a node with a breadth-first
+    walk over the supplier connections, fetched in one query.
+
+    Tier 1 is the suppliers of the node, tier 2 their suppliers and so on.
+    A supplier is counted only in the first tier it is reached in. Risk
+    levels of the suppliers of all the tiers are fetched in one more query.
+    """
+
+    def __init__(self, node, supply_chain=None):
+        """
+        Initialize with the node and optionally the supply chain to limit
+        the connections to.
+        """
+        self.node = node
+        self.supply_chain = supply_chain
+
+    def get_suppliers(self):
+        """
+        Returns adjacency list of the supplier connections of the tenant as
+        a dict of node id to the ids of its suppliers.
+        """
+        connections = supply_models.Connection.objects.filter(
+            tenant_id=self.node.tenant_id, is_supplier=True).exclude(
+            status=supply_consts.ConnectionStatus.REVOKED)
+        if self.supply_chain:
+            connections = connections.filter(supply_chain=self.supply_chain)
+        suppliers = {}
+        for source_id, target_id in connections.values_list(
+                'source_id', 'target_id').distinct():
+            suppliers.setdefault(source_id, set()).add(target_id)
+        return suppliers
+
+    def get_tiers(self):
+        """
+        Returns list of sets of supplier ids, one set per tier.
+        """
+        suppliers = self.get_suppliers()
+        visited = {self.node.id}
+        frontier = {self.node.id}
+        tiers = []
+        while frontier:
+            next_frontier = set()
+            for node_id in frontier:
+                next_frontier |= suppliers.get(node_id, set())
+            next_frontier -= visited
+            if not next_frontier:
+                break
+            visited |= next_frontier
+            tiers.append(next_frontier)
+            frontier = next_frontier
+        return tiers
+
+    def get_risk_scores(self, node_ids):
+        """
+        Returns the latest overall risk score of each of the nodes.
+        """
+        return dict(risk_models.CurrentRiskScore.objects.filter(
+            node_id__in=node_ids).values_list('node_id', 'overall'))
+
+    def compute(self):
+        """
+        Returns the stats of each tier.
+        """
+        tiers = self.get_tiers()
+        risk_scores = self.get_risk_scores(set().union(*tiers))
+        tier_info = []
+        for tier, node_ids in enumerate(tiers, start=1):
+            low = medium = high = 0
+            for node_id in node_ids:
+                score = risk_scores.get(node_id)
+                if score is None:
+                    continue
+                if score > 60:
+                    low += 1
+                elif score > 43:
+                    medium += 1
+                else:
+                    high += 1
+            tier_info.append({
+                "tier": tier,
+                "total_suppliers": len(node_ids),
+                "low_risk_suppliers": low,
+                "medium_risk_suppliers": medium,
+                "high_risk_suppliers": high
+            })
+        return tier_info
+
+    def get_stats(self):
+        """
+        Returns the stats of each tier, cached per node and supply chain
+        until a connection or risk score of the tenant changes.
+        """
+        return caching.get_stats(
+            'supplier_tiers', self.node.tenant_id, self.compute,
+            node=self.node.id, sc=getattr(self.supply_chain, 'id', None))
@@ -6,6 +6,9 @@ from django.utils.translation import gettext_lazy as _
 CONNECT_ID_FORMAT = "{r5}-{r5}-{r5}"
 TRACE_CODE_FORMAT = "RO{y}-{R10}"
 
+CONNECTION_CIRCLE_CACHE_KEY = "connection_circle:{node}:{sc}"
+CONNECTION_CIRCLE_CACHE_TIMEOUT = 60 * 60 * 24
+
 class NodeType(models.IntegerChoices):
     COMPANY = 101, _('Company')
     PRODUCER = 111, _('Producer')
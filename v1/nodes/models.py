@@ -2,13 +2,16 @@
 
 import datetime
 from django.db import models
+from django.core.exceptions import ObjectDoesNotExist
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
+from django.core.cache import cache
 
 from base import session
 from base.models import AbstractBaseModel, Address, NumberedModel
 from common.library import _get_file_path
 from utilities import functions as utils_functions
+from utilities import search
 from functools import partial
 from utilities.function_generators import formatter
 
@@ -184,6 +187,10 @@ class Node(AbstractBaseModel, Address, NumberedModel):
         verbose_name=_('Company Website Url'),null=True,blank=True,
         default='')
 
+    class Meta(AbstractBaseModel.Meta):
+        """Meta setup"""
+        indexes = [search.trigram_index('name', 'node_name_trgm')]
+
     def __str__(self):
         """Object name in django admin."""
         return f'{self.name} - {self.type}'
@@ -191,18 +198,33 @@ class Node(AbstractBaseModel, Address, NumberedModel):
     def save(self, *args, **kwargs):
         """
         Override to set created_on to corresponding timestamp in upload_timestamp
+        and to clear the cached dashboard stats of the tenant and the cached
+        consumer interface pages of the node. When the node is renamed, the
+        search documents with its name are refreshed. New nodes of risk
+        analysis tenants are queued to be scored.
         """
+        from v1.dashboard import caching
+        from v1.consumer_interface import caching as ci_caching
         if self.upload_timestamp:
             try:
                 self.created_on = timezone.make_aware(
                     datetime.datetime.fromtimestamp(int(self.upload_timestamp)))
             except Exception as ex:
                 print(ex)
-        if not self.id and self.tenant.risk_analysis:
-            super(Node, self).save(*args, **kwargs)
-            self.initialize_risk_score()
-        else:
-            super(Node, self).save(*args, **kwargs)
+        renamed = search.name_changed(self)
+        created = not self.id
+        super(Node, self).save(*args, **kwargs)
+        if created and self.tenant.risk_analysis:
+            self.queue_risk_score()
+        caching.invalidate_stats(self.tenant_id)
+        ci_caching.invalidate_nodes([self.id])
+        if renamed:
+            for field in ('source_id', 'destination_id'):
+                search.schedule_refresh(
+                    'transactions.ExternalTransaction', **{field: self.id})
+            for field in ('attached_by_id', 'verifier_id'):
+                search.schedule_refresh(
+                    'claims.AttachedClaim', **{field: self.id})
 
     @property
     def country(self):
@@ -210,24 +232,32 @@ class Node(AbstractBaseModel, Address, NumberedModel):
             return self.province.country
         return None
 
+    @property
+    def current_score(self):
+        """
+        Return snapshot of the latest risk score, None if there is none.
+        """
+        try:
+            return self.current_risk_score
+        except ObjectDoesNotExist:
+            return None
+
     @property
     def risk_score(self):
-        return self.risk_scores.all().order_by('-year').first()
+        current_score = self.current_score
+        return current_score.score if current_score else None
     
     def get_risk_score(self):
         """
         Return risk score.
         """
-        try:
-            score = self.risk_score.overall
-        except:
-            score = 0
-        return score
+        current_score = self.current_score
+        return current_score.overall if current_score else 0
 
     @property
     def overall_risk_level(self):
-        risk_score = self.risk_score
-        return risk_score.overall_risk_level if risk_score else None
+        current_score = self.current_score
+        return current_score.overall_risk_level if current_score else None
 
     def get_connections(
             self, supply_chain=None, buyers=True, suppliers=True,
@@ -262,6 +292,32 @@ class Node(AbstractBaseModel, Address, NumberedModel):
         if supplied:
             nodes = nodes.filter(outgoing_transactions__destination=self)
         return nodes.order_by().order_by('-id').distinct('id')
+
+    def annotate_connection_summary(self, nodes, supply_chain=None):
+        """
+        Annotates the summary of the node's trade with each of the nodes.
+        Everything is of the supply chain when given. Otherwise products,
+        date and quantity are of all of them, and the risk level is of the
+        supply chain of the connection.
+        """
+        from v1.supply_chains.models import ConnectionSummary
+        summaries = ConnectionSummary.objects.filter(
+            node=self, counterpart=models.OuterRef('pk'))
+        if supply_chain:
+            sc_id = getattr(supply_chain, 'id', supply_chain)
+            trade = risk = summaries.filter(supply_chain_id=sc_id)
+        else:
+            trade = summaries.filter(supply_chain__isnull=True)
+            risk = summaries.filter(
+                supply_chain_id=models.OuterRef('supply_chain_id'))
+        return nodes.annotate(
+            summary_products=models.Subquery(trade.values('products')[:1]),
+            summary_last_transaction_date=models.Subquery(
+                trade.values('last_transaction_date')[:1]),
+            summary_transacted_quantity=models.Subquery(
+                trade.values('transacted_quantity')[:1]),
+            summary_sc_risk_level=models.Subquery(
+                risk.values('counterpart_sc_risk_level')[:1]))
     
     def get_connection_circle(self,sc=None):
         """
@@ -271,11 +327,58 @@ class Node(AbstractBaseModel, Address, NumberedModel):
             id=self.id).distinct('id')
         return nodes
 
+    def get_connection_circle_ids(self, sc=None):
+        """
+        Method returns ids in the node's connection circle as a set.
+        Resolved once per request and cached until a connection of the node
+        changes, so that membership checks need no query.
+        """
+        sc_id = getattr(sc, 'id', sc)
+        key = node_consts.CONNECTION_CIRCLE_CACHE_KEY.format(
+            node=self.id, sc=sc_id)
+        circles = session.get_from_local('connection_circles', None)
+        if circles is None:
+            circles = {}
+            session.set_to_local('connection_circles', circles)
+        if key not in circles:
+            circle_ids = cache.get(key)
+            if circle_ids is None:
+                circle_ids = set(self.get_connections(
+                    supply_chain=sc_id).values_list('id', flat=True))
+                circle_ids.add(self.id)
+                cache.set(
+                    key, circle_ids,
+                    node_consts.CONNECTION_CIRCLE_CACHE_TIMEOUT)
+            circles[key] = circle_ids
+        return circles[key]
+
+    @staticmethod
+    def invalidate_connection_circles(*node_ids):
+        """
+        Method clears cached connection circles of the nodes.
+        """
+        for node_id in node_ids:
+            cache.delete_pattern(
+                node_consts.CONNECTION_CIRCLE_CACHE_KEY.format(
+                    node=node_id, sc='*'))
+        session.set_to_local('connection_circles', None)
+        return True
+
     def activate_connections(self):
-        """method activates all connections of the node."""
-        self.target_connections.filter(
-            status=supply_consts.ConnectionStatus.PENDING).update(
-                status=supply_consts.ConnectionStatus.APPROVED)
+        """
+        method activates all connections of the node and clears the cached
+        dashboard stats of their tenants, as the update skips
+        Connection.save.
+        """
+        from v1.dashboard import caching
+        connections = self.target_connections.filter(
+            status=supply_consts.ConnectionStatus.PENDING)
+        source_ids = list(connections.values_list('source_id', flat=True))
+        tenant_ids = set(connections.values_list('tenant_id', flat=True))
+        connections.update(status=supply_consts.ConnectionStatus.APPROVED)
+        self.invalidate_connection_circles(self.id, *source_ids)
+        for tenant_id in tenant_ids:
+            caching.invalidate_stats(tenant_id)
         return True
 
     @property
@@ -326,6 +429,12 @@ class Node(AbstractBaseModel, Address, NumberedModel):
         risk_models.RiskScore.update_node_score(self)
         return True
 
+    def queue_risk_score(self):
+        """Queues the node to be scored in the background."""
+        from v1.risk import score_queue
+        score_queue.enqueue([self])
+        return True
+
     def get_recommended_certifications(self, limit=100, offset=0):
         if not self.ro_number:
             self.initialize_risk_score()
@@ -558,10 +667,8 @@ class NodeDocument(AbstractBaseModel):
 
     def notify(self):
         """Notify the node members."""
-        for user in self.node.members.all():
-            notification_manager = notifications.NodeDocumentNotificationManager(
-                user=user, action_object=self, token=None)
-            notification_manager.send_notification()
+        notifications.NodeDocumentNotificationManager.notify_members(
+            self.node, self)
         return True
     
     def file_size(self):
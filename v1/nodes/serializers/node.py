@@ -62,6 +62,10 @@ class NodeConnectionSerializer(serializers.ModelSerializer):
         required=False, allow_blank=True, allow_null=True)
     operation = custom_fields.IdencodeField(read_only=True)
     sc_risk_level = serializers.SerializerMethodField()
+    last_transaction_date = serializers.DateField(
+        source='summary_last_transaction_date', read_only=True, default=None)
+    transacted_quantity = serializers.FloatField(
+        source='summary_transacted_quantity', read_only=True, default=None)
 
     class Meta:
         """ Meta data """
@@ -71,12 +75,19 @@ class NodeConnectionSerializer(serializers.ModelSerializer):
             'connection_id', 'connection_status', 'upload_timestamp', 'image',
             'overall_risk_level', 'rank', 'country', 'products', 'country_id',
             'province', 'province_id', 'city', 'street', 'registration_no', 'phone',
-            'operation', 'sc_risk_level',)
+            'operation', 'sc_risk_level', 'last_transaction_date',
+            'transacted_quantity',)
+        list_serializer_class = custom_fields.IdencodeListSerializer
         
     def get_products(self, obj):
         """
         Return unique products names under the txns between the nodes.
+        Taken from the connection summary when annotated with
+        Node.annotate_connection_summary.
         """
+        products = getattr(obj, 'summary_products', None)
+        if products is not None:
+            return products
         current_node = session.get_current_node()
         sc = self.context['request'].query_params.get(
                 'supply_chain', None)
@@ -95,6 +106,9 @@ class NodeConnectionSerializer(serializers.ModelSerializer):
         """
         Return supply chain risk level.
         """
+        sc_risk_level = getattr(obj, 'summary_sc_risk_level', None)
+        if sc_risk_level is not None:
+            return sc_risk_level
         try:
             sc = decode(self.context['request'].query_params.get(
                 'supply_chain', None))
@@ -195,8 +209,7 @@ class NodeSerializer(serializers.ModelSerializer):
                     instance=instance.members.first(), validated_data=validated_data)
                 instance.target_connections.order_by('created_on').first().send_invite()
         if instance.tenant.risk_analysis:
-            from v1.risk import models as risk_models
-            risk_models.RiskScore.update_node_score(instance)
+            instance.queue_risk_score()
         return instance
 
 
@@ -1,13 +1,11 @@
 def sync_node_risk_score(tenant=None):
     """
-    Sync nodes risk score.
+    Sync nodes risk score. The nodes are queued to be scored in batches
+    in the background, see v1.risk.score_queue.
     """
     from v1.nodes.models import Node
+    from v1.risk import score_queue
     nodes = Node.objects.all()
     if tenant:
         nodes = nodes.filter(tenant=tenant)
-    for node in nodes:
-        try:
-            node.initialize_risk_score()
-        except:
-            pass
+    return score_queue.enqueue(nodes)
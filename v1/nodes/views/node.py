@@ -12,6 +12,7 @@ from base.views import IdDecodeModelViewSet
 from base import exceptions as base_exceptions
 from base.response import SuccessResponse
 from utilities.functions import decode
+from utilities import search as util_search
 
 from v1.tenants import constants as tenant_constants
 from v1.tenants import models as tenant_models
@@ -24,6 +25,7 @@ from v1.nodes import constants as node_consts
 from v1.accounts import constants as user_consts
 
 from v1.risk.integrations.roai import apis as roai_apis
+from v1.risk.integrations.roai import client as roai_client
 
 # from v1.apiauth import permissions as auth_permissions
 from v1.risk.integrations.roai import apis as roai_apis
@@ -201,27 +203,34 @@ class ROAINodeSearch(APIView):
         offset = int(request.query_params.get('offset', 0))
         supply_chain = decode(
             request.query_params.get('supply_chain', None))
-        ai_nodes = roai_apis.NodeSearch().call(
-            search=search,limit=limit,offset=offset)
+        try:
+            ai_nodes = roai_apis.NodeSearch().call(
+                search=search,limit=limit,offset=offset)
+        except roai_client.ROAIUnavailable:
+            # Local nodes are still listed while RO-AI is down.
+            ai_nodes = []
         tenant = session.get_current_tenant()
         current_node = session.get_current_node()
-        current_node_connections = current_node.get_connection_circle(
-            sc=supply_chain).values_list('id',flat=True)
-        existing_nodes = node_models.Node.objects.filter(
-            tenant=tenant,name__icontains=search)
+        current_node_connections = current_node.get_connection_circle_ids(
+            sc=supply_chain)
+        existing_nodes = util_search.search(
+            node_models.Node.objects.filter(tenant=tenant), search, 'name')
         nodes = existing_nodes.exclude(
             id__in=current_node_connections)
         data = node_serializers.BasicNodeSerializer(nodes, many=True).data
+        names = {ai_node['name'] for ai_node in ai_nodes}
+        states = {ai_node['address']['state'] for ai_node in ai_nodes}
+        existing = set(existing_nodes.filter(name__in=names).values_list(
+            'name', 'province__name'))
+        provinces = {}
+        for province in tenant_models.Province.objects.filter(
+                name__in=states).select_related('country'):
+            provinces.setdefault(province.name, province)
         for ai_node in ai_nodes:
-            node_exists = existing_nodes.filter(
-                name=ai_node['name'],
-                province__name=ai_node['address']['state']
-                ).exists()
-            if node_exists:
+            if (ai_node['name'], ai_node['address']['state']) in existing:
                 continue
             try:
-                province = tenant_models.Province.objects.filter(
-                    name=ai_node['address']['state']).first()
+                province = provinces.get(ai_node['address']['state'])
                 country = {
                     "id": province.country.idencode,
                     "name": province.country.name
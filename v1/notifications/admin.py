@@ -15,3 +15,13 @@ class NotificationAdmin(ReadOnlyAdmin):
 @admin.register(models.SMSAlerts)
 class SMSAlertsAdmin(ReadOnlyAdmin):
     list_display = ('phone', 'message')
+
+
+@admin.register(models.NotificationArchive)
+class NotificationArchiveAdmin(ReadOnlyAdmin):
+    list_display = ('user', 'target_node', 'period', 'count')
+
+
+@admin.register(models.SMSAlertsArchive)
+class SMSAlertsArchiveAdmin(ReadOnlyAdmin):
+    list_display = ('period', 'count')
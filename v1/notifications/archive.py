@@ -0,0 +1,246 @@
+"""
+Retention of the notifications and SMS alerts.
+
+Every event creates a Notification per recipient, with the title and body
+in every language, and nothing was ever removed, so the tables kept
+growing and slowing down the notification list and summary.
+archive_notifications() moves the read notifications older than
+NOTIFICATION_RETENTION_DAYS out of the table, and archive_sms_alerts() the
+SMS alerts older than SMS_ALERT_RETENTION_DAYS, into zlib compressed
+archives of a month each. The archive_notifications celery task runs
+both daily.
+
+The notifications are archived as NotificationSerializer rendered them,
+with the title and body in every language, in one NotificationArchive per
+user, tenant, target node and month. The notification list reads the
+archives only when history is requested, through History.
+"""
+import itertools
+from datetime import timedelta
+
+from modeltranslation.utils import build_localized_fieldname
+
+from django.conf import settings
+from django.db import models
+from django.db import transaction as django_transaction
+from django.utils import timezone
+from django.utils import translation
+
+from v1.notifications import constants as notif_consts
+from v1.notifications import counters
+from v1.notifications.models import Notification
+from v1.notifications.models import NotificationArchive
+from v1.notifications.models import SMSAlerts
+from v1.notifications.models import SMSAlertsArchive
+from v1.notifications.serializers import NotificationSerializer
+
+TRANSLATED_FIELDS = ('title', 'body')
+
+
+def get_period(created_on):
+    """Returns the first day of the month of the date."""
+    return timezone.localdate(created_on).replace(day=1)
+
+
+def make_notification_record(notification):
+    """
+    Returns the notification as it is archived, as NotificationSerializer
+    renders it with the translated fields in every language.
+    """
+    record = dict(NotificationSerializer(notification).data)
+    for field in TRANSLATED_FIELDS:
+        record[field] = {
+            code: getattr(notification, build_localized_fieldname(field, code))
+            for code, _ in settings.LANGUAGES}
+    return record
+
+
+def localize(record):
+    """
+    Returns the archived notification with the translated fields in the
+    active language, falling back to the default language as
+    modeltranslation does.
+    """
+    record = dict(record)
+    language = translation.get_language()
+    for field in TRANSLATED_FIELDS:
+        values = record[field]
+        record[field] = values.get(language) or values.get(
+            settings.MODELTRANSLATION_DEFAULT_LANGUAGE) or ''
+    return record
+
+
+def make_sms_record(sms):
+    """Returns the SMS alert as it is archived."""
+    return {
+        'id': sms.id,
+        'phone': sms.phone,
+        'message': sms.message,
+        'response': sms.response,
+        'response_text': sms.response_text,
+        'created_on': int(sms.created_on.timestamp()),
+    }
+
+
+def archive_batch(queryset, get_key, make_record, archive_model, batch_size):
+    """
+    Moves up to batch_size objects of the queryset into the archives of
+    their keys, the field values of the archive as a tuple of pairs, in
+    one DB transaction. Objects locked by a parallel request are left for
+    the next run. An archive created by a parallel run is found again by
+    get_or_create, as the unique constraints of the archives also hold for
+    the NULL keys. Returns the archived objects.
+    """
+    with django_transaction.atomic():
+        objects = list(queryset.select_for_update(
+            skip_locked=True, of=('self',)).order_by('id')[:batch_size])
+        records = {}
+        for instance in objects:
+            records.setdefault(get_key(instance), []).append(
+                make_record(instance))
+        for key, key_records in records.items():
+            archive, _ = archive_model.objects.select_for_update(
+                ).get_or_create(**dict(key))
+            archive.add_records(key_records)
+        queryset.model.objects.filter(
+            id__in=[instance.id for instance in objects]).delete()
+    return objects
+
+
+def archive_notifications(
+        days=notif_consts.NOTIFICATION_RETENTION_DAYS,
+        batch_size=notif_consts.ARCHIVE_BATCH_SIZE):
+    """
+    Archives the read notifications older than the days, batch_size at a
+    time, and uncounts them. Returns the number of notifications.
+    """
+    queryset = Notification.objects.filter(
+        is_read=True, created_on__lt=timezone.now() - timedelta(days=days)
+        ).select_related('event_type', 'creator__tenant')
+
+    def get_key(notification):
+        return (
+            ('user_id', notification.user_id),
+            ('tenant_id', notification.tenant_id),
+            ('target_node_id', notification.target_node_id),
+            ('visibility', notification.visibility),
+            ('period', get_period(notification.created_on)),
+        )
+
+    total = 0
+    while True:
+        with django_transaction.atomic():
+            notifications = archive_batch(
+                queryset, get_key, make_notification_record,
+                NotificationArchive, batch_size)
+            counters.remove(notifications)
+        if not notifications:
+            return total
+        total += len(notifications)
+
+
+def archive_sms_alerts(
+        days=notif_consts.SMS_ALERT_RETENTION_DAYS,
+        batch_size=notif_consts.ARCHIVE_BATCH_SIZE):
+    """
+    Archives the SMS alerts older than the days, batch_size at a time.
+    Returns the number of SMS alerts.
+    """
+    queryset = SMSAlerts.objects.filter(
+        created_on__lt=timezone.now() - timedelta(days=days))
+    total = 0
+    while True:
+        alerts = archive_batch(
+            queryset, lambda sms: (('period', get_period(sms.created_on)),),
+            make_sms_record, SMSAlertsArchive, batch_size)
+        if not alerts:
+            return total
+        total += len(alerts)
+
+
+class History:
+    """
+    The notifications of the list followed by the archived ones, sliced by
+    the pagination like a queryset. Archives are decompressed only for the
+    months on the page, the archives of a month merged by date, or all of
+    them when searching, as their text is only in the compressed data.
+    Archived notifications are returned as they are rendered, the others
+    as Notification objects.
+    """
+
+    def __init__(self, notifications, archives, search_terms=()):
+        self.notifications = notifications
+        self.archives = archives.order_by('-period', '-id')
+        self.search_terms = [term.lower() for term in search_terms]
+        self._count = None
+        self._records = None
+
+    def matches(self, record):
+        """Returns whether the record has all the search terms."""
+        text = f"{record['title']} {record['body']}".lower()
+        return all(term in text for term in self.search_terms)
+
+    @staticmethod
+    def merge(archives):
+        """
+        Returns the notifications of the archives of a period, the latest
+        first.
+        """
+        records = [
+            record for archive in archives for record in archive.get_records()]
+        records.sort(key=lambda record: int(record['created_on']), reverse=True)
+        return records
+
+    def get_records(self):
+        """Returns the archived notifications matching the search."""
+        if self._records is None:
+            self._records = [
+                record for _, archives in itertools.groupby(
+                    self.archives, key=lambda archive: archive.period)
+                for record in map(localize, self.merge(archives))
+                if self.matches(record)]
+        return self._records
+
+    def get_archived(self, start, stop):
+        """
+        Returns the archived notifications from start to stop. Periods are
+        months, so the notifications of the periods on the page are merged
+        by date and the periods follow each other.
+        """
+        if self.search_terms:
+            return self.get_records()[start:stop]
+        records, offset = [], 0
+        periods = self.archives.order_by('-period').values(
+            'period').annotate(total=models.Sum('count')).values_list(
+            'period', 'total')
+        for period, total in periods:
+            if offset + total > start and offset < stop:
+                records += self.merge(self.archives.filter(period=period))[
+                    max(start - offset, 0):stop - offset]
+            offset += total
+            if offset >= stop:
+                break
+        return [localize(record) for record in records]
+
+    def get_current_count(self):
+        if self._count is None:
+            self._count = self.notifications.count()
+        return self._count
+
+    def count(self):
+        if self.search_terms:
+            archived = len(self.get_records())
+        else:
+            archived = self.archives.aggregate(
+                total=models.Sum('count'))['total'] or 0
+        return self.get_current_count() + archived
+
+    def __getitem__(self, item):
+        current_count = self.get_current_count()
+        start, stop = item.start or 0, item.stop
+        items = list(self.notifications[start:stop]) \
+            if start < current_count else []
+        if stop > current_count:
+            items += self.get_archived(
+                max(start - current_count, 0), stop - current_count)
+        return items
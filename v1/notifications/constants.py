@@ -8,3 +8,15 @@ class NotificationCondition(models.IntegerChoices):
     ENABLED = 101, _('Enabled')
     DISABLED = 111, _('Disabled')
     IF_USER_ACTIVE = 121, _('If user is active')
+
+
+# Redis pub/sub channel of the events of the notification stream of a user
+NOTIFICATION_STREAM_CHANNEL = 'rightorigins_v3:notifications:{user}'
+NOTIFICATION_STREAM_PATH = '/v1/notifications/stream/'
+# Seconds between the keep alive comments of the stream
+NOTIFICATION_STREAM_HEARTBEAT = 15
+
+# Days read notifications and SMS alerts are kept before they are archived
+NOTIFICATION_RETENTION_DAYS = 90
+SMS_ALERT_RETENTION_DAYS = 30
+ARCHIVE_BATCH_SIZE = 1000
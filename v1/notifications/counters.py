@@ -0,0 +1,189 @@
+"""
+Unread counters of the notifications and the events of their stream.
+
+NotificationCounter keeps the number of visible notifications and of
+unread ones of each user for each target node. Notifications are counted
+with add() when they are created, uncounted with mark_read() when they
+are read and with remove() when they are archived, with F() updates so
+that parallel changes are not lost.
+rebuild() recomputes all the counters from the notifications.
+
+Every change is also published, once committed, to the Redis channel of
+the user, from where v1.notifications.stream sends it to the connected
+clients: a 'notification' event with each new notification and a
+'counter' event with the change in the counts of a node.
+"""
+import json
+
+from sentry_sdk import capture_exception
+from django_redis import get_redis_connection
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from django.conf import settings
+from django.db import models
+from django.db import transaction as django_transaction
+from django.utils import timezone
+
+from utilities.functions import encode
+
+from v1.notifications import constants as notif_consts
+from v1.notifications.models import Notification
+from v1.notifications.models import NotificationCounter
+
+
+def _is_counted(notification):
+    return notification.visibility and notification.target_node_id
+
+
+def publish(events):
+    """
+    Publishes the events, a dict of user ids to lists of (tenant id, event,
+    data), to the channels of the users once the current transaction is
+    committed. Failures are reported and otherwise ignored, the counters
+    stay right and clients catch up when they reconnect.
+    """
+    if not events:
+        return
+
+    def _publish():
+        try:
+            pipeline = get_redis_connection('default').pipeline()
+            for user_id, user_events in events.items():
+                channel = notif_consts.NOTIFICATION_STREAM_CHANNEL.format(
+                    user=user_id)
+                for tenant_id, event, data in user_events:
+                    pipeline.publish(channel, json.dumps({
+                        'tenant': tenant_id, 'event': event, 'data': data,
+                    }, cls=JSONEncoder))
+            pipeline.execute()
+        except Exception as e:
+            capture_exception(e)
+    django_transaction.on_commit(_publish)
+
+
+def apply(changes):
+    """
+    Adds the changes, a dict of (user id, tenant id, target node id) to
+    the change in count and unread count, to the counters and publishes
+    them.
+    """
+    events = {}
+    for key, (count, unread_count) in changes.items():
+        if not count and not unread_count:
+            continue
+        user_id, tenant_id, node_id = key
+        counter, _ = NotificationCounter.objects.get_or_create(
+            user_id=user_id, tenant_id=tenant_id, target_node_id=node_id)
+        NotificationCounter.objects.filter(id=counter.id).update(
+            count=models.F('count') + count,
+            unread_count=models.F('unread_count') + unread_count,
+            updated_on=timezone.now())
+        events.setdefault(user_id, []).append((tenant_id, 'counter', {
+            'node': encode(node_id),
+            'count': count,
+            'unread_count': unread_count,
+        }))
+    publish(events)
+
+
+def add(notifications):
+    """Counts the new notifications and publishes them."""
+    from v1.notifications.serializers import NotificationSerializer
+
+    changes, events = {}, {}
+    for notification in notifications:
+        if not _is_counted(notification):
+            continue
+        change = changes.setdefault((
+            notification.user_id, notification.tenant_id,
+            notification.target_node_id), [0, 0])
+        change[0] += 1
+        change[1] += not notification.is_read
+        events.setdefault(notification.user_id, []).append((
+            notification.tenant_id, 'notification',
+            NotificationSerializer(notification).data))
+    publish(events)
+    apply(changes)
+
+
+@django_transaction.atomic
+def mark_read(notifications):
+    """
+    Marks the notifications read and uncounts the ones that were unread.
+    The notifications are locked, so that a notification read by parallel
+    requests is uncounted once. Returns the number of notifications read.
+    """
+    rows = list(notifications.select_for_update().filter(
+        is_read=False).order_by().values_list(
+        'id', 'user_id', 'tenant_id', 'target_node_id', 'visibility'))
+    Notification.objects.filter(
+        id__in=[row[0] for row in rows]).update(is_read=True)
+    changes = {}
+    for _, user_id, tenant_id, node_id, visibility in rows:
+        if visibility and node_id:
+            changes.setdefault((user_id, tenant_id, node_id), [0, 0])[1] -= 1
+    apply(changes)
+    return len(rows)
+
+
+def remove(notifications):
+    """Uncounts the notifications, before they are deleted."""
+    changes = {}
+    for notification in notifications:
+        if not _is_counted(notification):
+            continue
+        change = changes.setdefault((
+            notification.user_id, notification.tenant_id,
+            notification.target_node_id), [0, 0])
+        change[0] -= 1
+        change[1] -= not notification.is_read
+    apply(changes)
+
+
+def get_summary(user_id, tenant_id):
+    """
+    Returns the number of notifications and unread notifications of the
+    user for each target node, the nodes with the most first.
+    """
+    rows = NotificationCounter.objects.filter(
+        user_id=user_id, tenant_id__in=[tenant_id, None],
+        count__gt=0).values(
+        'target_node', 'target_node__name', 'target_node__image'
+        ).annotate(
+        total=models.Sum('count'), unread=models.Sum('unread_count')
+        ).order_by('-total')
+    return [
+        {
+            'count': row['total'],
+            'unread_count': row['unread'],
+            'node': {
+                'id': encode(row['target_node']),
+                'name': row['target_node__name'],
+                'image': f"https:{settings.MEDIA_URL}{row['target_node__image']}" \
+                    if row['target_node__image'] else ""
+            }
+        }
+        for row in rows
+    ]
+
+
+@django_transaction.atomic
+def rebuild():
+    """
+    Replaces the counters with counts of the notifications. Returns the
+    number of counters.
+    """
+    NotificationCounter.objects.all().delete()
+    rows = Notification.objects.filter(visibility=True).exclude(
+        target_node=None).order_by().values(
+        'user_id', 'tenant_id', 'target_node_id').annotate(
+        total=models.Count('id'),
+        unread=models.Count('id', filter=models.Q(is_read=False)))
+    counters = NotificationCounter.objects.bulk_create([
+        NotificationCounter(
+            user_id=row['user_id'], tenant_id=row['tenant_id'],
+            target_node_id=row['target_node_id'], count=row['total'],
+            unread_count=row['unread'])
+        for row in rows.iterator()], batch_size=1000)
+    return len(counters)
@@ -5,6 +5,7 @@ from django_filters import rest_framework as filters
 from common.drf_custom import filters as custom_filters
 
 from v1.notifications.models import Notification
+from v1.notifications.models import NotificationArchive
 
 
 class NotificationFilter(filters.FilterSet):
@@ -17,3 +18,19 @@ class NotificationFilter(filters.FilterSet):
     class Meta:
         model = Notification
         fields = ['node', 'is_read']
+
+
+class NotificationArchiveFilter(filters.FilterSet):
+    """
+    Filter for archived Notifications, with the filters of
+    NotificationFilter. Archived notifications are all read.
+    """
+    node = custom_filters.IdencodeFilter(field_name='target_node')
+    is_read = filters.BooleanFilter(method='filter_is_read')
+
+    class Meta:
+        model = NotificationArchive
+        fields = ['node', 'is_read']
+
+    def filter_is_read(self, queryset, name, value):
+        return queryset if value else queryset.none()
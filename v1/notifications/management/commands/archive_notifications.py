@@ -0,0 +1,39 @@
+"""Command to archive the notifications and SMS alerts past retention."""
+
+from django.core.management.base import BaseCommand
+
+from v1.notifications import archive
+from v1.notifications import constants as notif_consts
+
+
+class Command(BaseCommand):
+    """
+    Archives the read notifications and the SMS alerts older than the
+    retention periods, as the archive_notifications task does daily. Run
+    it once with a small batch size to work through the existing backlog
+    without long locks.
+    """
+    help = 'Archive the notifications and SMS alerts past retention.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=notif_consts.NOTIFICATION_RETENTION_DAYS,
+            help='Archive read notifications older than the days.')
+        parser.add_argument(
+            '--sms-days', type=int,
+            default=notif_consts.SMS_ALERT_RETENTION_DAYS,
+            help='Archive SMS alerts older than the days.')
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=notif_consts.ARCHIVE_BATCH_SIZE,
+            help='Number of rows archived in each DB transaction.')
+
+    def handle(self, *args, **options):
+        notifications = archive.archive_notifications(
+            options['days'], options['batch_size'])
+        alerts = archive.archive_sms_alerts(
+            options['sms_days'], options['batch_size'])
+        self.stdout.write(
+            f'Archived {notifications} notifications and {alerts} SMS '
+            f'alerts.')
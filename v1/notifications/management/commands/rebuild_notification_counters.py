@@ -0,0 +1,18 @@
+"""Command to rebuild the notification counters of the users."""
+
+from django.core.management.base import BaseCommand
+
+from v1.notifications import counters
+
+
+class Command(BaseCommand):
+    """
+    Replaces the notification counters with counts of the notifications.
+    Run it once after the counters are introduced, and to repair them if
+    they fall out of sync.
+    """
+    help = 'Rebuild the notification counters of the users.'
+
+    def handle(self, *args, **options):
+        count = counters.rebuild()
+        self.stdout.write(f'Rebuilt {count} notification counters.')
@@ -1,4 +1,5 @@
 
+from types import SimpleNamespace
 from urllib.parse import urlencode
 from django.utils.translation import gettext_lazy as _
 from django.utils import translation
@@ -8,6 +9,7 @@ from utilities.translations import internationalize_attribute
 
 from v1.notifications.models import Notification
 from v1.notifications.constants import NotificationCondition
+from v1.notifications import counters
 
 NOTIFICATION_TYPES = {}
 
@@ -97,6 +99,8 @@ class BaseNotificationManager:
             notification.redirect_id = self.get_redirect_id()
             notification.redirect_type = self.get_redirect_type()
             notification.save()
+            if created:
+                counters.add([notification])
             self.notification_object = notification
 
     def send_notification(self):
@@ -104,6 +108,92 @@ class BaseNotificationManager:
             return False
         return self.notification_object.send()
 
+    @classmethod
+    def notify_members(
+            cls, node, action_object, members=None, tokens=None,
+            context=None):
+        """
+        Notifies all the members of the node about the event in bulk.
+
+        Members and their users are fetched with one query and their
+        preferences are resolved in memory. Title and body are rendered
+        once per language for all the recipients, the notifications are
+        created with bulk_create and the emails are sent with a single
+        celery task.
+
+        members can be a queryset of node members to limit the recipients
+        to, and tokens can map user ids to validation tokens to be attached
+        to the notifications of those users.
+        """
+        from django.contrib.contenttypes.models import ContentType
+
+        tokens = tokens or {}
+        if members is None:
+            members = node.node_members.all()
+        members = list(members.select_related('user'))
+        if not members:
+            return []
+
+        manager = cls.__new__(cls)
+        manager.user = members[0].user
+        manager.action_object = action_object
+        manager.send_to = None
+        manager.notification_object = None
+        manager.tenant = manager.get_tenant()
+        texts = manager.get_texts()
+        common_data = {
+            'tenant': manager.tenant,
+            'type': cls.notification_uid,
+            'event_type': ContentType.objects.get_for_model(action_object),
+            'event_id': action_object.id,
+            'actor_node': manager.get_actor_node(),
+            'target_node': node,
+            'supply_chain': manager.get_supply_chain(),
+            'context': context or {},
+            'redirect_id': manager.get_redirect_id(),
+            'redirect_type': manager.get_redirect_type(),
+            'creator': session.get_current_user(),
+            'updater': session.get_current_user(),
+        }
+
+        notifications = []
+        for member in members:
+            notif_prefs = member.get_notification_pref(cls)
+            if not any(notif_prefs.values()):
+                continue
+            manager.user = member.user
+            notifications.append(Notification(
+                user=member.user,
+                visibility=notif_prefs["visibility"],
+                action_push=notif_prefs["push"],
+                action_email=notif_prefs["email"],
+                action_sms=notif_prefs["sms"],
+                validation_token=tokens.get(member.user.id),
+                send_to=manager.get_send_to(),
+                **texts, **common_data))
+        notifications = Notification.objects.bulk_create(notifications)
+
+        # Action url carries the id of the notification, which is known
+        # only after it is created.
+        for notification in notifications:
+            manager.user = notification.user
+            manager.notification_object = notification
+            notification.action_url = manager.get_action_url()
+        Notification.objects.bulk_update(notifications, ['action_url'])
+        counters.add(notifications)
+        Notification.send_all(notifications)
+        return notifications
+
+    def get_texts(self):
+        """
+        Returns localized titles and bodies of the notification, keyed
+        by the name of the translated field.
+        """
+        texts = SimpleNamespace()
+        internationalize_attribute(texts, 'title', self.get_title)
+        internationalize_attribute(texts, 'body', self.get_body)
+        return vars(texts)
+
     def get_tenant(self):
         return session.get_current_tenant()
 
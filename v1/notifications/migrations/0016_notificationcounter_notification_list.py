@@ -0,0 +1,44 @@
+# Generated by Django 4.0.4 on 2026-10-18 18:00
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    The index is built concurrently, so that notifications can be created
+    while it is built. The counters of the existing notifications are
+    filled by rebuild_notification_counters.
+    """
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0053_alter_tag_creator_alter_tag_updater'),
+        ('nodes', '0042_node_name_trgm'),
+        ('notifications', '0015_alter_smsalerts_message_alter_smsalerts_response_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('unread_count', models.IntegerField(default=0)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('target_node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_counters', to='nodes.node')),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_counters', to='tenants.tenant')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'tenant', 'target_node')},
+            },
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['user', 'tenant', 'visibility', '-created_on'], name='notification_list'),
+        ),
+    ]
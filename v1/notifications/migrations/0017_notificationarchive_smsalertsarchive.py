@@ -0,0 +1,53 @@
+# Generated by Django 4.0.4 on 2026-10-18 20:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    The notifications and SMS alerts past retention are moved into the
+    archives by the archive_notifications task, or by the command of the
+    same name.
+    """
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tenants', '0053_alter_tag_creator_alter_tag_updater'),
+        ('nodes', '0042_node_name_trgm'),
+        ('notifications', '0016_notificationcounter_notification_list'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('data', models.BinaryField(default=b'')),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('visibility', models.BooleanField(default=True)),
+                ('target_node', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_archives', to='nodes.node')),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='notification_archives', to='tenants.tenant')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_archives', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'tenant', 'target_node', 'visibility', 'period')},
+            },
+        ),
+        migrations.CreateModel(
+            name='SMSAlertsArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('data', models.BinaryField(default=b'')),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('period',)},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.0.4 on 2026-10-19 10:00
+
+from django.db import migrations, models
+
+
+def merge_duplicates(apps, schema_editor):
+    NotificationCounter = apps.get_model('notifications', 'NotificationCounter')
+    duplicates = NotificationCounter.objects.filter(
+        tenant=None).order_by().values('user_id', 'target_node_id').annotate(
+        total=models.Count('id')).filter(total__gt=1)
+    for duplicate in duplicates:
+        counters = list(NotificationCounter.objects.filter(
+            tenant=None, user_id=duplicate['user_id'],
+            target_node_id=duplicate['target_node_id']).order_by('id'))
+        kept = counters[0]
+        kept.count = sum(counter.count for counter in counters)
+        kept.unread_count = sum(counter.unread_count for counter in counters)
+        kept.save()
+        NotificationCounter.objects.filter(
+            id__in=[counter.id for counter in counters[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+    """
+    Counters without a tenant could be duplicated by parallel requests, as
+    unique_together does not hold for NULL tenants. Duplicates are merged
+    into one counter before the constraint is added.
+    """
+
+    dependencies = [
+        ('notifications', '0017_notificationarchive_smsalertsarchive'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificationcounter',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant', None)), fields=('user', 'target_node'), name='notification_counter_no_tenant'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.0.4 on 2026-10-19 12:00
+
+import json
+import zlib
+
+from django.db import migrations, models
+
+
+def get_records(archive):
+    if not archive.data:
+        return []
+    return json.loads(zlib.decompress(bytes(archive.data)))
+
+
+def merge_duplicates(apps, schema_editor):
+    NotificationArchive = apps.get_model('notifications', 'NotificationArchive')
+    fields = ('user_id', 'tenant_id', 'target_node_id', 'visibility', 'period')
+    duplicates = NotificationArchive.objects.filter(
+        models.Q(tenant=None) | models.Q(target_node=None)).order_by(
+        ).values(*fields).annotate(total=models.Count('id')).filter(
+        total__gt=1)
+    for duplicate in duplicates:
+        archives = list(NotificationArchive.objects.filter(
+            **{field: duplicate[field] for field in fields}).order_by('id'))
+        records = [
+            record for archive in archives for record in get_records(archive)]
+        records.sort(key=lambda record: int(record['created_on']), reverse=True)
+        kept = archives[0]
+        kept.data = zlib.compress(json.dumps(records).encode())
+        kept.count = len(records)
+        kept.save()
+        NotificationArchive.objects.filter(
+            id__in=[archive.id for archive in archives[1:]]).delete()
+
+
+class Migration(migrations.Migration):
+    """
+    Archives without a tenant or target node could be duplicated by
+    parallel archivers, as unique_together does not hold for NULLs.
+    Duplicates are merged into one archive before the constraints are
+    added.
+    """
+
+    dependencies = [
+        ('notifications', '0018_notificationcounter_no_tenant'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificationarchive',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant', None)), fields=('user', 'target_node', 'visibility', 'period'), name='notification_archive_no_tenant'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationarchive',
+            constraint=models.UniqueConstraint(condition=models.Q(('target_node', None)), fields=('user', 'tenant', 'visibility', 'period'), name='notification_archive_no_target_node'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificationarchive',
+            constraint=models.UniqueConstraint(condition=models.Q(('target_node', None), ('tenant', None)), fields=('user', 'visibility', 'period'), name='notification_archive_no_tenant_target_node'),
+        ),
+    ]
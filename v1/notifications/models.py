@@ -1,6 +1,11 @@
 """
 Notification Models
 """
+import itertools
+import json
+import zlib
+
+from rest_framework.utils.encoders import JSONEncoder
 
 from django.db import models
 from django.conf import settings
@@ -88,18 +93,31 @@ class Notification(AbstractBaseModel):
         """Meta class for the above model."""
 
         ordering = ('-created_on',)
+        indexes = [models.Index(
+            fields=['user', 'tenant', 'visibility', '-created_on'],
+            name='notification_list')]
 
     def __str__(self):
         """Function to return value in django admin."""
         return '%s - %s | %s' % (self.user.name, self.title, self.idencode)
 
-    def send_email(self):
+    def get_email_message(self):
+        """
+        Renders the email of the notification in the language of the
+        user. Returns a dict with subject, to_email and html, or None if
+        email is not to be sent.
+        """
+        with translation.override(self.user.language):
+            return self.render_email_message()
+
+    def render_email_message(self):
+        """
+        Renders the email of the notification like get_email_message, in
+        the active language.
+        """
         notification_manager = self.notification_manager()
         if not self.action_email:
-            return False
-
-        curr_language = translation.get_language()
-        translation.activate(self.user.language)
+            return None
 
         template_name = notification_manager.email_template
 
@@ -110,10 +128,36 @@ class Notification(AbstractBaseModel):
             'action_text': notification_manager.action_text
         }
         html = render_to_string(template_name=template_name, context=render_context)
-        email.send_email.delay(
-            subject=self.title, to_email=self.send_to, html=html
-        )
-        translation.activate(curr_language)
+        return {'subject': self.title, 'to_email': self.send_to, 'html': html}
+
+    def send_email(self):
+        message = self.get_email_message()
+        if not message:
+            return False
+        email.send_email.delay(**message)
+        return True
+
+    @staticmethod
+    def send_all(notifications):
+        """
+        Sends the emails of all the notifications with a single celery
+        task, which reuses one mail connection for all of them.
+        Notifications are rendered grouped by the language of the user,
+        with the language activated once for each group.
+        """
+        def _language(notification):
+            return notification.user.language or ''
+
+        messages = []
+        for language, group in itertools.groupby(
+                sorted(notifications, key=_language), key=_language):
+            with translation.override(language or None):
+                messages += [
+                    message for message in (
+                        notification.render_email_message()
+                        for notification in group) if message]
+        if messages:
+            email.send_emails.delay(messages)
         return True
 
     def send_push(self):
@@ -135,14 +179,55 @@ class Notification(AbstractBaseModel):
 
     def read(self):
         """Function to read notification."""
+        from v1.notifications import counters
+        counters.mark_read(Notification.objects.filter(id=self.id))
         self.is_read = True
-        self.save()
 
     def notification_manager(self):
         from .manager import NOTIFICATION_TYPES
         return NOTIFICATION_TYPES[self.type]
 
 
+class NotificationCounter(models.Model):
+    """
+    Number of visible notifications and of unread ones of a user for a
+    target node, maintained as notifications are created and read so that
+    the notification summary does not group the whole history of the user.
+    See v1.notifications.counters.
+
+    Attribs:
+        user(obj)           : User the notifications are of.
+        tenant(obj)         : Tenant of the notifications.
+        target_node(obj)    : Node the notifications are about.
+        count(int)          : Number of visible notifications.
+        unread_count(int)   : Number of visible unread notifications.
+    """
+    user = models.ForeignKey(
+        'accounts.CustomUser', on_delete=models.CASCADE,
+        related_name='notification_counters')
+    tenant = models.ForeignKey(
+        'tenants.Tenant', on_delete=models.CASCADE,
+        related_name='notification_counters', null=True, blank=True)
+    target_node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='notification_counters')
+    count = models.IntegerField(default=0)
+    unread_count = models.IntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta class for the above model."""
+
+        unique_together = ('user', 'tenant', 'target_node')
+        # Rows with a NULL tenant are not unique by unique_together.
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'target_node'], condition=models.Q(tenant=None),
+            name='notification_counter_no_tenant')]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.target_node_id} | {self.unread_count}'
+
+
 class SMSAlerts(AbstractBaseModel):
     """
     Model to track all the SMSs sent and log the response
@@ -161,3 +246,98 @@ class SMSAlerts(AbstractBaseModel):
 
     def __str__(self):
         return f"{self.phone}"
+
+
+class AbstractArchive(models.Model):
+    """
+    Records moved out of a table by the retention policy, kept as zlib
+    compressed JSON. See v1.notifications.archive.
+
+    Attribs:
+        period(date)        : First day of the month the records were
+            created in.
+        count(int)          : Number of records.
+        data(bytes)         : Compressed JSON list of the records, the
+            latest first.
+    """
+    period = models.DateField()
+    count = models.IntegerField(default=0)
+    data = models.BinaryField(default=b'')
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta class for the above model."""
+
+        abstract = True
+
+    def get_records(self):
+        """Returns the archived records."""
+        if not self.data:
+            return []
+        return json.loads(zlib.decompress(bytes(self.data)))
+
+    def add_records(self, records):
+        """Adds the records to the archive and saves it."""
+        records = records + self.get_records()
+        records.sort(key=lambda record: int(record['created_on']), reverse=True)
+        self.data = zlib.compress(json.dumps(records, cls=JSONEncoder).encode())
+        self.count = len(records)
+        self.save()
+
+
+class NotificationArchive(AbstractArchive):
+    """
+    Read notifications of a user about a target node created in a month,
+    archived after the retention period, as NotificationSerializer
+    rendered them with the title and body in every language.
+
+    Attribs:
+        user(obj)           : User the notifications are of.
+        tenant(obj)         : Tenant of the notifications.
+        target_node(obj)    : Node the notifications are about.
+        visibility(bool)    : Visibility of the notifications.
+    """
+    user = models.ForeignKey(
+        'accounts.CustomUser', on_delete=models.CASCADE,
+        related_name='notification_archives')
+    tenant = models.ForeignKey(
+        'tenants.Tenant', on_delete=models.CASCADE,
+        related_name='notification_archives', null=True, blank=True)
+    target_node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='notification_archives', null=True, blank=True)
+    visibility = models.BooleanField(default=True)
+
+    class Meta:
+        """Meta class for the above model."""
+
+        unique_together = (
+            'user', 'tenant', 'target_node', 'visibility', 'period')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'target_node', 'visibility', 'period'],
+                condition=models.Q(tenant=None),
+                name='notification_archive_no_tenant'),
+            models.UniqueConstraint(
+                fields=['user', 'tenant', 'visibility', 'period'],
+                condition=models.Q(target_node=None),
+                name='notification_archive_no_target_node'),
+            models.UniqueConstraint(
+                fields=['user', 'visibility', 'period'],
+                condition=models.Q(tenant=None, target_node=None),
+                name='notification_archive_no_tenant_target_node')]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.target_node_id} | {self.period}'
+
+
+class SMSAlertsArchive(AbstractArchive):
+    """SMS alerts sent in a month, archived after the retention period."""
+
+    class Meta:
+        """Meta class for the above model."""
+
+        unique_together = ('period',)
+
+    def __str__(self):
+        return f'{self.period} | {self.count}'
@@ -6,9 +6,11 @@ from django.utils.translation import gettext_lazy as _
 
 from rest_framework import serializers
 
+from base import session
 from common.drf_custom import fields
 
 from v1.notifications.models import Notification
+from v1.notifications import counters
 
 from v1.accounts.serializers import user as user_serializers
 
@@ -58,10 +60,11 @@ class ReadNotificationSerializer(serializers.Serializer):
             _("Either 'ids' should be mentioned or 'all' should be True"))
 
     def create(self, validated_data):
-        notifications = Notification.objects.all()
+        notifications = Notification.objects.filter(
+            user_id=session.get_from_local('user_id'))
         if 'ids' in validated_data and validated_data['ids']:
             notifications = notifications.filter(id__in=validated_data['ids'])
-        notifications.update(is_read=True)
+        counters.mark_read(notifications)
         return {}
 
     def to_representation(self, instance):
@@ -0,0 +1,125 @@
+"""
+Server-sent event stream of the notifications of a user.
+
+Served by rightorigins_v3.asgi at NOTIFICATION_STREAM_PATH, outside of
+the Django request handling as the response stays open as long as the
+client is connected. EventSource can not set headers, so the access token
+is passed in the token query param.
+
+The stream starts with a 'summary' event with the counts of each node,
+as NotificationSummaryView returns them, and then sends the events
+published by v1.notifications.counters for the user and the tenant of the
+token as they come:
+
+    event: notification
+    data: {...the notification, as NotificationsListView lists it}
+
+    event: counter
+    data: {"node": "<id>", "count": 1, "unread_count": 1}
+
+A comment is sent every NOTIFICATION_STREAM_HEARTBEAT seconds so that
+proxies do not close an idle connection.
+"""
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from redis import asyncio as aioredis
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from v1.notifications import constants as notif_consts
+
+
+@sync_to_async
+def authenticate(token):
+    """
+    Returns the ids of the user and the tenant of the access token and the
+    summary of the notifications of the user, or None if the token is not
+    valid.
+    """
+    from rest_framework_simplejwt.exceptions import AuthenticationFailed
+    from rest_framework_simplejwt.exceptions import InvalidToken
+
+    from base.authentication import CustomAuthentication
+    from utilities.functions import decode
+    from v1.notifications import counters
+
+    close_old_connections()
+    authentication = CustomAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(token)
+        user = authentication.get_user(validated_token)
+        tenant_id = validated_token['session_data'].get('tenant_id')
+        tenant_id = decode(tenant_id) if tenant_id else None
+        return user.id, tenant_id, counters.get_summary(user.id, tenant_id)
+    except (InvalidToken, AuthenticationFailed, KeyError, ValueError):
+        return None
+    finally:
+        close_old_connections()
+
+
+def format_event(event, data):
+    """Returns the event in the text/event-stream format."""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'.encode()
+
+
+async def send_body(send, body):
+    await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+
+async def application(scope, receive, send):
+    """ASGI application streaming the notification events of the user."""
+    params = parse_qs(scope['query_string'].decode())
+    identity = await authenticate(params.get('token', [''])[0])
+    if not identity:
+        await send({
+            'type': 'http.response.start', 'status': 401,
+            'headers': [(b'content-type', b'application/json')]})
+        await send({
+            'type': 'http.response.body',
+            'body': json.dumps({'detail': 'Invalid token.'}).encode()})
+        return
+    user_id, tenant_id, summary = identity
+
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected.set()
+                return
+
+    redis = aioredis.from_url(settings.CACHES['default']['LOCATION'])
+    pubsub = redis.pubsub()
+    await pubsub.subscribe(
+        notif_consts.NOTIFICATION_STREAM_CHANNEL.format(user=user_id))
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start', 'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ]})
+        await send_body(send, format_event('summary', summary))
+        while not disconnected.is_set():
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=notif_consts.NOTIFICATION_STREAM_HEARTBEAT)
+            if message is None:
+                await send_body(send, b': heartbeat\n\n')
+                continue
+            event = json.loads(message['data'])
+            if event['tenant'] not in (tenant_id, None):
+                continue
+            await send_body(send, format_event(event['event'], event['data']))
+    finally:
+        watcher.cancel()
+        await pubsub.unsubscribe()
+        await pubsub.close()
+        await redis.close()
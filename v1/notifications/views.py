@@ -4,20 +4,20 @@ APIs for Notifications
 from drf_yasg.utils import swagger_auto_schema
 
 from django.shortcuts import render
-from django.db.models import Count
-from django.conf import settings
 from rest_framework import generics
 from rest_framework import views
 from rest_framework.response import Response
 from rest_framework import filters
+from rest_framework.fields import BooleanField
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
 
 from base import session
 from base import exceptions
-from utilities.functions import encode
 
 from v1.notifications.models import Notification
+from v1.notifications.models import NotificationArchive
+from v1.notifications import archive
+from v1.notifications import counters
 from v1.notifications import filters as noti_filters
 from v1.notifications import serializers
 
@@ -25,41 +25,25 @@ from v1.notifications import serializers
 
 
 class NotificationSummaryView(views.APIView):
+    """
+    API to get the count of notifications and unread notifications of the
+    user for each node, from the notification counters. Changes are also
+    pushed by the notification stream, see v1.notifications.stream.
+    """
 
     http_method_names = ['get']
 
     def get(self, request, *args, **kwargs):
-        notif_summary = Notification.objects.filter(
-            user_id=session.get_from_local('user_id'),
-            tenant_id__in=[session.get_from_local('tenant_id'), None],
-            visibility=True
-        ).exclude(target_node=None).values(
-            'target_node', 'target_node__name', 'target_node__image'
-        ).annotate(
-            count=Count('id'), 
-            unread_count=Count('id', filter=Q(is_read=False))
-        ).order_by('-count')
-
-        notification_data = []
-        for notif in notif_summary:
-            notification_data.append(
-                {
-                    'count': notif['count'],
-                    'unread_count': notif['unread_count'],
-                    'node': {
-                        'id': encode(notif['target_node']) if notif['target_node'] else None,
-                        'name': notif['target_node__name'],
-                        'image': f"https:{settings.MEDIA_URL}{notif['target_node__image']}" \
-                            if notif['target_node__image'] else ""
-                    }
-                }
-            )
-        return Response(notification_data)
+        return Response(counters.get_summary(
+            session.get_from_local('user_id'),
+            session.get_from_local('tenant_id')))
 
 
 class NotificationsListView(generics.ListAPIView):
     """
-    API to list notifications with option to filter by node
+    API to list notifications with option to filter by node. Archived
+    notifications are listed after the current ones only when history is
+    requested, see v1.notifications.archive.
     """
 
     serializer_class = serializers.NotificationSerializer
@@ -74,6 +58,26 @@ class NotificationsListView(generics.ListAPIView):
             visibility=True).exclude(target_node=None).select_related(
             'actor_node', 'target_node', 'supply_chain', 'creator')
 
+    def get_archives(self):
+        archives = NotificationArchive.objects.filter(
+            user_id=session.get_from_local('user_id'),
+            tenant_id__in=[session.get_from_local('tenant_id'), None],
+            visibility=True).exclude(target_node=None)
+        return noti_filters.NotificationArchiveFilter(
+            self.request.query_params, queryset=archives).qs
+
+    def list(self, request, *args, **kwargs):
+        history = request.query_params.get('history')
+        if history not in BooleanField.TRUE_VALUES:
+            return super().list(request, *args, **kwargs)
+        notifications = archive.History(
+            self.filter_queryset(self.get_queryset()), self.get_archives(),
+            filters.SearchFilter().get_search_terms(request))
+        page = self.paginate_queryset(notifications)
+        return self.get_paginated_response([
+            self.get_serializer(item).data
+            if isinstance(item, Notification) else item for item in page])
+
 
 class NotificationReadView(views.APIView):
     """
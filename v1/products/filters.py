@@ -8,6 +8,7 @@ import django_filters
 from django.db.models import Q
 
 from utilities.functions import decode
+from utilities import search
 from common.drf_custom import filters as custom_filters
 
 from v1.products import models as product_models
@@ -63,11 +64,10 @@ class BatchFilter(filters.FilterSet):
 
     def search_filter(self, queryset, name, value):
         """
-        Search filter on the basis of country name.
+        Search on the number, name and product name of the batch, see
+        utilities.search.
         """
-        query = Q(product__name__icontains=value) | Q(
-            name__icontains=value) | Q(number__icontains=value)
-        return queryset.filter(query).distinct()
+        return search.search(queryset, value)
 
     def supply_chain_filter(self, queryset, name, value):
         """
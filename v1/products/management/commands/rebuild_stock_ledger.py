@@ -0,0 +1,18 @@
+"""Command to rebuild the stock ledger of the nodes."""
+
+from django.core.management.base import BaseCommand
+
+from v1.products import stock
+
+
+class Command(BaseCommand):
+    """
+    Replaces the stock ledger and balances with the current quantities of
+    the available batches. Run it once after the ledger is introduced, and
+    to repair it if it falls out of sync.
+    """
+    help = 'Rebuild the stock ledger and balances of the nodes.'
+
+    def handle(self, *args, **options):
+        count = stock.rebuild()
+        self.stdout.write(f'Rebuilt {count} stock balances.')
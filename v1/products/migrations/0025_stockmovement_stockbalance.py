@@ -0,0 +1,44 @@
+# Generated by Django 4.0.4 on 2026-10-18 14:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0041_nodedocument_openai_file_id'),
+        ('transactions', '0051_alter_deliverynotification_purchase_order_and_more'),
+        ('products', '0024_batch_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=25, verbose_name='Quantity')),
+                ('quantity_kg', models.DecimalField(decimal_places=3, max_digits=25, verbose_name='Quantity In KG')),
+                ('is_compacted', models.BooleanField(db_index=True, default=False, verbose_name='Is Compacted')),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='products.batch', verbose_name='Batch')),
+                ('node', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='nodes.node', verbose_name='Node')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='products.product', verbose_name='Product')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='transactions.transaction', verbose_name='Transaction')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StockBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=3, default=0.0, max_digits=25, verbose_name='Quantity')),
+                ('quantity_kg', models.DecimalField(decimal_places=3, default=0.0, max_digits=25, verbose_name='Quantity In KG')),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('node', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='stock_balances', to='nodes.node', verbose_name='Node')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_balances', to='products.product', verbose_name='Product')),
+            ],
+            options={
+                'unique_together': {('node', 'product')},
+            },
+        ),
+    ]
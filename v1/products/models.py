@@ -2,13 +2,14 @@
 
 from django.db import models
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Sum, Q
+from django.db.models import Sum
 
 import datetime
 
 from base.models import AbstractBaseModel, NumberedModel
 from common.library import _get_file_path
 from base import session
+from utilities import search
 
 from v1.nodes.constants import NodeMemberType
 
@@ -156,17 +157,30 @@ class Product(AbstractBaseModel):
     def __str__(self):
         """Function to return value in django admin."""
         return f'{self.name} - {self.supply_chain.name} - {self.tenant.name}'
+
+    def save(self, *args, **kwargs):
+        """
+        Override to refresh the search documents of the batches and the
+        transactions of the product when it is renamed.
+        """
+        renamed = search.name_changed(
+            self, *search.localized_fields('name'))
+        super(Product, self).save(*args, **kwargs)
+        if renamed:
+            search.schedule_refresh('products.Batch', product_id=self.id)
+            for model in (
+                    'transactions.ExternalTransaction',
+                    'transactions.InternalTransaction'):
+                search.schedule_refresh(
+                    model, result_batches__product_id=self.id)
+                search.schedule_refresh(
+                    model, source_batches__product_id=self.id)
     
     @property
     def quantity(self):
         """Return available quantity of product under a node/tenant"""
-        batches = self.batches.filter(
-            Q(incoming_transactions__status=txn_consts.TransactionStatus.APPROVED)|Q(
-                incoming_transactions=None))
-        node = session.get_current_node()
-        if node:
-            batches = batches.filter(node=node)
-        return batches.aggregate(total=Sum('current_quantity'))['total']
+        from v1.products import stock
+        return stock.get_quantity(self, session.get_current_node())
 
 
 class Batch(AbstractBaseModel, NumberedModel):
@@ -183,6 +197,8 @@ class Batch(AbstractBaseModel, NumberedModel):
         initial_quantity(float)    : initial quantity of the batch.
         current_quantity(float)    : current quantity of the batch.
         note(char)                 : notes about the batch.
+        search_document(text)      : text the batch is searched on, see
+            utilities.search.
 
     Inherited Attribs:
         creator(obj): Creator user of the object.
@@ -236,6 +252,14 @@ class Batch(AbstractBaseModel, NumberedModel):
     risk_score = models.FloatField(default=0.0)
     date = models.DateField(
         default=datetime.date.today, verbose_name=_('Batch Date'))
+    search_document = models.TextField(
+        default='', blank=True, editable=False,
+        verbose_name=_('Search Document'))
+
+    class Meta(AbstractBaseModel.Meta):
+        """Meta setup"""
+        indexes = [search.trigram_index(
+            'search_document', 'batch_search_trgm')]
 
     def __str__(self):
         """Function to return value in django admin."""
@@ -245,12 +269,24 @@ class Batch(AbstractBaseModel, NumberedModel):
         """
         Over riding save method to update transaction number.
         Transaction number is always the django id + 1200
+        New batches are added to the stock ledger once they are committed.
         """
+        from v1.products import stock
+        self.search_document = self.get_search_document()
         self.initial_quantity_kg = float(
             self.initial_quantity) * self.unit.equivalent_kg
         self.current_quantity_kg = float(
             self.current_quantity) * self.unit.equivalent_kg
+        created = not self.pk
         super(Batch, self).save(*args, **kwargs)
+        if created:
+            stock.schedule_sync([self.id])
+
+    def get_search_document(self):
+        """Returns the text the batch is searched on."""
+        return search.make_document(
+            self.number, *search.translations(self, 'name'),
+            *search.translations(self.product, 'name'))
 
     def transaction_info(self):
         """
@@ -388,3 +424,81 @@ class Batch(AbstractBaseModel, NumberedModel):
         if self.node:
             province = self.node.province.name
         return province
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of the changes in the available stock of the
+    nodes. Each row is a quantity added to (positive) or taken from
+    (negative) an available batch. Maintained by v1.products.stock.
+
+    Attribs:
+        batch(obj)          : Batch whose quantity changed.
+        node(obj)           : Node holding the batch.
+        product(obj)        : Product of the batch.
+        transaction(obj)    : Transaction that caused the change, if any.
+        quantity(decimal)   : Change in the unit of the batch.
+        quantity_kg(decimal): Change in kg.
+        is_compacted(bool)  : Whether the change is added to the
+            StockBalance of the node and product.
+        created_on(datetime): Time of the change.
+    """
+    batch = models.ForeignKey(
+        Batch, on_delete=models.CASCADE,
+        related_name='stock_movements', verbose_name=_('Batch'))
+    node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='stock_movements', verbose_name=_('Node'))
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE,
+        related_name='stock_movements', verbose_name=_('Product'))
+    transaction = models.ForeignKey(
+        'transactions.Transaction', on_delete=models.SET_NULL,
+        null=True, blank=True, related_name='stock_movements',
+        verbose_name=_('Transaction'))
+    quantity = models.DecimalField(
+        max_digits=25, decimal_places=3, verbose_name=_('Quantity'))
+    quantity_kg = models.DecimalField(
+        max_digits=25, decimal_places=3, verbose_name=_('Quantity In KG'))
+    is_compacted = models.BooleanField(
+        default=False, db_index=True, verbose_name=_('Is Compacted'))
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        """Object name in django admin."""
+        return f'{self.batch_id} : {self.quantity}'
+
+
+class StockBalance(models.Model):
+    """
+    Running balance of the available stock of a product with a node, up
+    to the last compacted StockMovement. Maintained by
+    v1.products.stock.
+
+    Attribs:
+        node(obj)           : Node holding the stock.
+        product(obj)        : Product of the stock.
+        quantity(decimal)   : Balance in the units of the batches.
+        quantity_kg(decimal): Balance in kg.
+    """
+    node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE, null=True, blank=True,
+        related_name='stock_balances', verbose_name=_('Node'))
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE,
+        related_name='stock_balances', verbose_name=_('Product'))
+    quantity = models.DecimalField(
+        default=0.0, max_digits=25, decimal_places=3,
+        verbose_name=_('Quantity'))
+    quantity_kg = models.DecimalField(
+        default=0.0, max_digits=25, decimal_places=3,
+        verbose_name=_('Quantity In KG'))
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        """Meta setup"""
+        unique_together = ('node', 'product')
+
+    def __str__(self):
+        """Object name in django admin."""
+        return f'{self.node_id} - {self.product_id} : {self.quantity}'
@@ -0,0 +1,197 @@
+"""
+Stock ledger of the nodes.
+
+Quantities are taken from the batches with a conditional F() update, so
+that parallel transactions on a batch can neither lose an update nor take
+more than what is left, and the batch row is not saved as a whole.
+
+Every change in the available stock is appended to StockMovement, and
+compact_stock_balances periodically folds the movements into the
+StockBalance of each node and product. The available quantity is read
+from the balances and the movements not compacted yet.
+
+A batch is available when it has no incoming transaction or an approved
+one, as Product.quantity always counted it. sync_batches brings the
+movements of a batch in line with its current quantity when it is created
+or its transaction is approved or rejected.
+"""
+from decimal import Decimal
+
+from django.db import models
+from django.db import transaction as django_transaction
+from django.utils import timezone
+
+from v1.products.models import Batch
+from v1.products.models import Product
+from v1.products.models import StockBalance
+from v1.products.models import StockMovement
+
+from v1.transactions import constants as txn_consts
+
+COMPACT_BATCH_SIZE = 5000
+
+
+def to_kg(batch, quantity):
+    """Returns the quantity of the batch in kg."""
+    return quantity * Decimal(str(batch.unit.equivalent_kg))
+
+
+def available_batches():
+    """Returns the batches that count as available stock."""
+    available = Batch.objects.filter(
+        models.Q(incoming_transactions=None) | models.Q(
+            incoming_transactions__status=(
+                txn_consts.TransactionStatus.APPROVED)))
+    return Batch.objects.filter(id__in=available.values('id'))
+
+
+def take(batch, quantity, transaction=None):
+    """
+    Takes the quantity from the batch and adds the change to the ledger
+    if the batch is available. Returns False without changing anything
+    if the batch does not have enough quantity.
+    """
+    quantity = Decimal(str(quantity))
+    quantity_kg = to_kg(batch, quantity)
+    taken = Batch.objects.filter(
+        id=batch.id, current_quantity__gte=quantity).update(
+        current_quantity=models.F('current_quantity') - quantity,
+        current_quantity_kg=models.F('current_quantity_kg') - quantity_kg,
+        updated_on=timezone.now())
+    if not taken:
+        return False
+    batch.refresh_from_db(fields=['current_quantity', 'current_quantity_kg'])
+    if available_batches().filter(id=batch.id).exists():
+        StockMovement.objects.create(
+            batch=batch, node_id=batch.node_id, product_id=batch.product_id,
+            transaction=transaction, quantity=-quantity,
+            quantity_kg=-quantity_kg)
+    return True
+
+
+@django_transaction.atomic
+def sync_batches(batch_ids, transaction=None):
+    """
+    Adds movements for the batches so that the ledger holds the current
+    quantity of each available batch and nothing of the others. Batches
+    already in line are left as they are.
+    """
+    # Lock the batches before reading the ledger, so that a take committed
+    # in between is in both the quantity and the recorded movements.
+    batches = list(Batch.objects.select_for_update(of=('self',)).filter(
+        id__in=batch_ids).select_related('unit'))
+    available = set(available_batches().filter(
+        id__in=batch_ids).values_list('id', flat=True))
+    recorded = dict(StockMovement.objects.filter(
+        batch_id__in=batch_ids).order_by().values('batch_id').annotate(
+        total=models.Sum('quantity')).values_list('batch_id', 'total'))
+    movements = []
+    for batch in batches:
+        target = batch.current_quantity if batch.id in available else 0
+        change = Decimal(target) - (recorded.get(batch.id) or 0)
+        if change:
+            movements.append(StockMovement(
+                batch=batch, node_id=batch.node_id,
+                product_id=batch.product_id, transaction=transaction,
+                quantity=change, quantity_kg=to_kg(batch, change)))
+    StockMovement.objects.bulk_create(movements)
+    return len(movements)
+
+
+def schedule_sync(batch_ids, transaction=None):
+    """Syncs the batches once the current transaction is committed."""
+    batch_ids = list(batch_ids)
+    django_transaction.on_commit(
+        lambda: sync_batches(batch_ids, transaction))
+
+
+@django_transaction.atomic
+def compact(batch_size=COMPACT_BATCH_SIZE):
+    """
+    Adds up to batch_size pending movements to the balances and marks them
+    compacted. Movements locked by another compaction are skipped.
+    Returns the number of movements compacted.
+    """
+    movements = list(StockMovement.objects.select_for_update(
+        skip_locked=True).filter(is_compacted=False).order_by(
+        'id').values_list(
+        'id', 'node_id', 'product_id', 'quantity', 'quantity_kg'
+        )[:batch_size])
+    changes = {}
+    for _, node_id, product_id, quantity, quantity_kg in movements:
+        total = changes.setdefault((node_id, product_id), [0, 0])
+        total[0] += quantity
+        total[1] += quantity_kg
+    for (node_id, product_id), (quantity, quantity_kg) in changes.items():
+        balance, _ = StockBalance.objects.get_or_create(
+            node_id=node_id, product_id=product_id)
+        StockBalance.objects.filter(id=balance.id).update(
+            quantity=models.F('quantity') + quantity,
+            quantity_kg=models.F('quantity_kg') + quantity_kg,
+            updated_on=timezone.now())
+    StockMovement.objects.filter(
+        id__in=[movement[0] for movement in movements]).update(
+        is_compacted=True)
+    return len(movements)
+
+
+def compact_all(batch_size=COMPACT_BATCH_SIZE):
+    """Compacts all the pending movements, batch_size at a time."""
+    total = 0
+    while True:
+        count = compact(batch_size)
+        total += count
+        if count < batch_size:
+            return total
+
+
+def get_quantity(product, node=None, field='quantity'):
+    """
+    Returns the available quantity of the product with the node, or with
+    all the nodes if no node is given, in a single query. None is returned
+    if there was never any stock of the product.
+    """
+    balances = StockBalance.objects.filter(product=product)
+    movements = StockMovement.objects.filter(
+        product=product, is_compacted=False)
+    if node:
+        balances = balances.filter(node=node)
+        movements = movements.filter(node=node)
+    subqueries = {}
+    for name, query in (('balance', balances), ('pending', movements)):
+        subqueries[name] = models.Subquery(
+            query.order_by().values('product').annotate(
+                total=models.Sum(field)).values('total'))
+    totals = Product.objects.filter(id=product.id).annotate(
+        **subqueries).values('balance', 'pending').first()
+    if not totals or totals['balance'] is None and \
+            totals['pending'] is None:
+        return None
+    return (totals['balance'] or 0) + (totals['pending'] or 0)
+
+
+@django_transaction.atomic
+def rebuild():
+    """
+    Replaces the ledger with an opening movement of the current quantity
+    of each available batch, already compacted into the balances. Returns
+    the number of balances.
+    """
+    StockMovement.objects.all().delete()
+    StockBalance.objects.all().delete()
+    batches = available_batches().exclude(current_quantity=0).values_list(
+        'id', 'node_id', 'product_id', 'current_quantity',
+        'current_quantity_kg')
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            batch_id=batch_id, node_id=node_id, product_id=product_id,
+            quantity=quantity, quantity_kg=quantity_kg, is_compacted=True)
+        for batch_id, node_id, product_id, quantity, quantity_kg
+        in batches.iterator()], batch_size=1000)
+    rows = StockMovement.objects.order_by().values(
+        'node_id', 'product_id').annotate(
+        quantity=models.Sum('quantity'),
+        quantity_kg=models.Sum('quantity_kg'))
+    StockBalance.objects.bulk_create([
+        StockBalance(**row) for row in rows], batch_size=1000)
+    return len(rows)
@@ -0,0 +1,14 @@
+"""
+Celery tasks
+"""
+from celery import shared_task
+
+from v1.products import stock
+
+
+@shared_task(name='compact_stock_balances')
+def compact_stock_balances():
+    """
+    Task to add the pending stock movements to the stock balances.
+    """
+    return stock.compact_all()
@@ -0,0 +1,20 @@
+# Generated by Django 4.0.4 on 2026-10-18 17:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0042_node_name_trgm'),
+        ('questionnaire', '0005_alter_questionnaire_tags'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='questionnaire',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('submitter'), name='gin_trgm_ops'), name='questionnaire_submitter_trgm'),
+        ),
+    ]
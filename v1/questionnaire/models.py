@@ -5,6 +5,7 @@ import datetime
 
 from base.models import AbstractBaseModel
 from base import session
+from utilities import search
 
 from v1.questionnaire import constants as question_consts
 from v1.questionnaire import notifications
@@ -47,6 +48,11 @@ class Questionnaire(AbstractBaseModel):
         verbose_name=_('Status Of Questionnaire'))
     is_deleted = models.BooleanField(
         default=False, verbose_name='Is Deleted')
+
+    class Meta(AbstractBaseModel.Meta):
+        """Meta setup"""
+        indexes = [search.trigram_index(
+            'submitter', 'questionnaire_submitter_trgm')]
     
     def __str__(self) -> str:
         return f'{self.name} - {self.owner} - {self.idencode}'
@@ -19,6 +19,13 @@ class RiskCommentAdmin(BaseAdmin):
     list_filter = ('severity',)
 
 
+class ScoreRequestAdmin(admin.ModelAdmin):
+    list_display = ('node', 'tenant', 'status', 'attempts', 'updated_on')
+    list_filter = ('status',)
+    raw_id_fields = ('node',)
+
+
 admin.site.register(models.RiskScore, RiskScoreAdmin)
 admin.site.register(models.CategoryScore, CategoryScoreAdmin)
 admin.site.register(models.RiskComment, RiskCommentAdmin)
+admin.site.register(models.ScoreRequest, ScoreRequestAdmin)
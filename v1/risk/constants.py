@@ -21,3 +21,45 @@ class RiskLevel(models.IntegerChoices):
     RISKY = 101, _('Risky')
     SAFE = 201, _('Safe')
     ALL = 1001, _('All')
+
+
+class ScoreRequestStatus(models.IntegerChoices):
+    PENDING = 101, _('Pending')
+    PROCESSING = 201, _('Processing')
+    COMPLETED = 301, _('Completed')
+    FAILED = 401, _('Failed')
+
+
+# RO-AI client
+ROAI_POOL_CONNECTIONS = 4
+ROAI_POOL_MAXSIZE = 20
+ROAI_CONNECT_TIMEOUT = 5
+ROAI_READ_TIMEOUT = 30
+ROAI_RETRIES = 3
+ROAI_RETRY_BACKOFF = 0.5
+ROAI_RETRY_STATUSES = (502, 503, 504)
+
+# Consecutive failures after which RO-AI is not called for the reset time
+ROAI_BREAKER_THRESHOLD = 5
+ROAI_BREAKER_RESET_TIMEOUT = 60
+ROAI_BREAKER_FAILURES_KEY = 'roai:breaker:failures'
+ROAI_BREAKER_OPEN_KEY = 'roai:breaker:open'
+ROAI_BREAKER_HALF_OPEN_KEY = 'roai:breaker:half_open'
+ROAI_BREAKER_PROBE_KEY = 'roai:breaker:probe'
+
+ROAI_RESPONSE_CACHE_KEY = 'roai:response:{key}'
+ROAI_STANDARDS_CACHE_TIMEOUT = 60 * 60
+ROAI_COUNTRY_CACHE_TIMEOUT = 60 * 60
+ROAI_SEARCH_CACHE_TIMEOUT = 60 * 5
+
+# Number of requests made to RO-AI at a time when fanning out
+ROAI_FANOUT_WORKERS = 8
+# Number of nodes whose scores are refreshed together
+ROAI_SCORE_BATCH_SIZE = 100
+
+# Risk score queue of the nodes
+SCORE_QUEUE_SCHEDULED_KEY = 'risk:score_queue:scheduled'
+SCORE_QUEUE_SCHEDULED_TIMEOUT = 60 * 10
+SCORE_QUEUE_MAX_ATTEMPTS = 3
+# Minutes after which a request left processing by a lost worker is retried
+SCORE_QUEUE_STALE_AFTER = 30
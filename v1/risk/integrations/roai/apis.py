@@ -1,16 +1,19 @@
-import json
-import requests
-
 from django.conf import settings
 
+from v1.risk import constants
+from v1.risk.integrations.roai import client
+
 
 class ROAIBaseAPI:
     """
-    Base class for defining APIs to connect to the RightOrigins AI Module
+    Base class for defining APIs to connect to the RightOrigins AI Module.
+    Responses are cached for cache_timeout seconds when it is set, see
+    client.request.
     """
     base_url: str = settings.ROAI_BASE_URL
     path = "/"
     method = "GET"
+    cache_timeout = None
 
     def __init__(self):
         self.headers = {
@@ -23,10 +26,7 @@ class ROAIBaseAPI:
 
     def call(self, **kwargs):
 
-        response = requests.request(
-            method=self.method, url=self.url, params=kwargs,
-            headers=self.headers, json=self.body, data=json.dumps(self.body)
-        ).json()
+        response = client.request(self, kwargs)
 
         if 'data' in response:
             return response['data']
@@ -86,6 +86,7 @@ class GetAllStandards(ROAIBaseAPI):
 
     path = "data/standards/"
     method = "GET"
+    cache_timeout = constants.ROAI_STANDARDS_CACHE_TIMEOUT
 
 
 class AddStandard(ROAIBaseAPI):
@@ -127,6 +128,7 @@ class NodeSearch(ROAIBaseAPI):
 
     path = "data/actor/search/"
     method = "GET"
+    cache_timeout = constants.ROAI_SEARCH_CACHE_TIMEOUT
 
     def __init__(self):
         super(NodeSearch, self).__init__()
@@ -139,3 +141,4 @@ class CountryList(ROAIBaseAPI):
 
     path = "data/country/"
     method = "GET"
+    cache_timeout = constants.ROAI_COUNTRY_CACHE_TIMEOUT
@@ -0,0 +1,164 @@
+"""
+HTTP client of the RightOrigins AI module.
+
+All the requests go through one keep-alive session per process, with
+connect and read timeouts. GET requests are retried with backoff on
+connection errors and gateway errors.
+
+A circuit breaker, shared by all the processes through the cache, stops
+calling RO-AI for a while after consecutive failures, so that requests
+and tasks fail fast while it is down instead of each waiting on the
+timeouts. After the reset time the breaker is half open: one trial
+request is let through while the others keep failing fast. A success
+closes the breaker and a failure opens it again. ROAIUnavailable is raised for failures
+and while the breaker is open.
+
+Responses of the APIs with a cache_timeout are cached for that long by
+the request, and call_many makes the requests of several APIs
+concurrently.
+"""
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from django.core.cache import cache
+
+from v1.risk import constants
+
+_session = None
+
+
+class ROAIUnavailable(Exception):
+    """Raised when RO-AI fails or is not called because it is failing."""
+
+
+def get_session():
+    """
+    Returns the HTTP session to RO-AI, created once per process so that
+    connections are kept alive and reused across requests.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        retry = Retry(
+            total=constants.ROAI_RETRIES,
+            backoff_factor=constants.ROAI_RETRY_BACKOFF,
+            status_forcelist=constants.ROAI_RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']), raise_on_status=False)
+        adapter = HTTPAdapter(
+            pool_connections=constants.ROAI_POOL_CONNECTIONS,
+            pool_maxsize=constants.ROAI_POOL_MAXSIZE, max_retries=retry)
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+
+def acquire():
+    """
+    Returns whether RO-AI can be called, when the breaker is closed or for
+    the single trial request of a half open breaker.
+    """
+    if cache.get(constants.ROAI_BREAKER_OPEN_KEY):
+        return False
+    if not cache.get(constants.ROAI_BREAKER_HALF_OPEN_KEY):
+        return True
+    # Held for as long as the trial request can take with its retries.
+    timeout = (constants.ROAI_CONNECT_TIMEOUT + constants.ROAI_READ_TIMEOUT
+               ) * (constants.ROAI_RETRIES + 1)
+    return cache.add(constants.ROAI_BREAKER_PROBE_KEY, True, timeout)
+
+
+def record_success():
+    """Closes the breaker."""
+    cache.delete_many([
+        constants.ROAI_BREAKER_FAILURES_KEY,
+        constants.ROAI_BREAKER_HALF_OPEN_KEY,
+        constants.ROAI_BREAKER_PROBE_KEY])
+
+
+def record_failure():
+    """
+    Counts a failure and opens the breaker after too many in a row, half
+    open once the reset time is over.
+    """
+    key = constants.ROAI_BREAKER_FAILURES_KEY
+    cache.add(key, 0, timeout=None)
+    try:
+        failures = cache.incr(key)
+    except ValueError:
+        failures = 1
+        cache.set(key, failures, timeout=None)
+    if failures >= constants.ROAI_BREAKER_THRESHOLD:
+        cache.set(
+            constants.ROAI_BREAKER_OPEN_KEY, True,
+            constants.ROAI_BREAKER_RESET_TIMEOUT)
+        cache.set(constants.ROAI_BREAKER_HALF_OPEN_KEY, True, timeout=None)
+        cache.set(key, constants.ROAI_BREAKER_THRESHOLD - 1, timeout=None)
+        cache.delete(constants.ROAI_BREAKER_PROBE_KEY)
+
+
+def send(api, params):
+    """Makes the request of the API and returns the decoded response."""
+    if not acquire():
+        raise ROAIUnavailable('RO-AI is unavailable.')
+    try:
+        response = get_session().request(
+            method=api.method, url=api.url, params=params,
+            headers=api.headers, data=json.dumps(api.body),
+            timeout=(
+                constants.ROAI_CONNECT_TIMEOUT, constants.ROAI_READ_TIMEOUT))
+        if response.status_code >= 500:
+            raise ROAIUnavailable(
+                f'RO-AI responded with status {response.status_code}.')
+        data = response.json()
+    except ROAIUnavailable:
+        record_failure()
+        raise
+    except (requests.RequestException, ValueError) as e:
+        record_failure()
+        raise ROAIUnavailable(str(e)) from e
+    record_success()
+    return data
+
+
+def get_cache_key(api, params):
+    """Returns the cache key of the request of the API."""
+    content = json.dumps(
+        [api.method, api.url, params, api.body], sort_keys=True, default=str)
+    return constants.ROAI_RESPONSE_CACHE_KEY.format(
+        key=hashlib.md5(content.encode()).hexdigest())
+
+
+def request(api, params):
+    """
+    Returns the response of the API, from the cache if the API caches its
+    responses.
+    """
+    if not api.cache_timeout:
+        return send(api, params)
+    key = get_cache_key(api, params)
+    data = cache.get(key)
+    if data is None:
+        data = send(api, params)
+        cache.set(key, data, api.cache_timeout)
+    return data
+
+
+def call_many(apis, workers=constants.ROAI_FANOUT_WORKERS, **params):
+    """
+    Calls the APIs with the params concurrently and returns their results
+    in the same order, with the exception in place of the result of each
+    call that failed.
+    """
+    def _call(api):
+        try:
+            return api.call(**params)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_call, apis))
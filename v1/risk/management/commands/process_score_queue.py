@@ -0,0 +1,38 @@
+"""Command to score the nodes queued to be scored."""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists
+from django.db.models import OuterRef
+
+from v1.nodes.models import Node
+from v1.risk import constants as risk_consts
+from v1.risk import score_queue
+from v1.risk.models import RiskScore
+
+
+class Command(BaseCommand):
+    """
+    Scores the nodes queued to be scored, as the process_score_queue task
+    does. With --queue-unscored, the nodes of risk analysis tenants
+    without a risk score are queued first, to initialize the scores of the
+    nodes created before the queue.
+    """
+    help = 'Score the nodes queued to be scored.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=risk_consts.ROAI_SCORE_BATCH_SIZE,
+            help='Number of nodes sent to RO-AI together.')
+        parser.add_argument(
+            '--queue-unscored', action='store_true',
+            help='Queue the nodes without a risk score first.')
+
+    def handle(self, *args, **options):
+        if options['queue_unscored']:
+            nodes = Node.objects.filter(tenant__risk_analysis=True).exclude(
+                Exists(RiskScore.objects.filter(node=OuterRef('pk'))))
+            count = score_queue.enqueue(nodes)
+            self.stdout.write(f'Queued {count} nodes.')
+        count = score_queue.process(options['batch_size'])
+        self.stdout.write(f'Scored {count} nodes.')
@@ -0,0 +1,153 @@
+"""Command to run a local fake of the RO-AI module."""
+
+import datetime
+import json
+import random
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.management.base import BaseCommand
+
+STATES = ('Kerala', 'Karnataka', 'Tamil Nadu', 'Sumatra', 'Ashanti')
+STANDARDS = [
+    {
+        'id': f'std{index}', 'key': f'roai-standard-{index}',
+        'name': name, 'description': f'{name} certification.',
+    }
+    for index, name in enumerate(
+        ('Rainforest Alliance', 'Fairtrade', 'Organic', 'RSPO'), 1)]
+COUNTRIES = ('IND', 'IDN', 'GHA', 'CIV', 'BRA', 'VNM')
+
+
+def make_score(ro_number):
+    """Returns score data of the node, the same for each ro_number."""
+    rnd = random.Random(ro_number)
+
+    def category():
+        score = round(rnd.uniform(20, 90), 2)
+        return {
+            'score': score, 'total': score, 'avg': score,
+            'applicable_indicators': rnd.randint(1, 20)}
+
+    overall = {
+        'environment': category(), 'social': category(),
+        'governance': category()}
+    overall['score'] = round(sum(
+        overall[name]['score'] for name in overall) / 3, 2)
+    overall['applicable_indicators'] = rnd.randint(3, 60)
+    return {
+        'id': ro_number,
+        'year': datetime.date.today().year,
+        'certifications': [],
+        'overall': overall,
+        'specs': [{
+            'description': 'Deforestation alerts near the location.',
+            'severity': rnd.choice(('low', 'medium', 'high'))}],
+    }
+
+
+class StubROAIHandler(BaseHTTPRequestHandler):
+    """
+    Answers the RO-AI APIs used by v1.risk.integrations.roai.apis with
+    made up data. Requests are delayed by the delay and a part of them
+    fail with 503 as set by the fail rate, to exercise the timeouts,
+    retries and circuit breaker of the client.
+    """
+    protocol_version = 'HTTP/1.1'
+    delay = 0.0
+    fail_rate = 0.0
+
+    def do_GET(self):
+        self.handle_request('GET')
+
+    def do_POST(self):
+        self.handle_request('POST')
+
+    def handle_request(self, method):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        time.sleep(self.delay)
+        if random.random() < self.fail_rate:
+            return self.respond(503, {'detail': 'Unavailable.'})
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(
+            url.query).items()}
+        path = url.path.rstrip('/') + '/'
+        if method == 'POST' and path.endswith('data/actor/'):
+            return self.respond(201, {'id': uuid.uuid4().hex[:12]})
+        if method == 'POST' and path.endswith('data/certification/'):
+            return self.respond(201, {'id': uuid.uuid4().hex[:12]})
+        if method != 'GET':
+            return self.respond(405, {'detail': 'Method not allowed.'})
+        if path.endswith('data/actor/search/'):
+            search = params.get('search', '') or 'Node'
+            limit = int(params.get('limit', 10))
+            offset = int(params.get('offset', 0))
+            return self.respond(200, {'results': [
+                {
+                    'name': f'{search.title()} Farms {index}',
+                    'address': {'state': STATES[index % len(STATES)]},
+                }
+                for index in range(offset, offset + limit)]})
+        if path.endswith('data/standards/'):
+            return self.respond(200, {'results': STANDARDS})
+        if path.endswith('data/country/'):
+            rnd = random.Random('countries')
+            return self.respond(200, {'results': [
+                {'code': code, 'score': round(rnd.uniform(20, 90), 2)}
+                for code in COUNTRIES]})
+        match = re.search(r'data/(?P<ro_number>[^/]+)/(standards/)?$', path)
+        if match and match.group(2):
+            return self.respond(200, {'results': STANDARDS[:2]})
+        if match:
+            return self.respond(200, make_score(match.group('ro_number')))
+        return self.respond(404, {'detail': 'Not found.'})
+
+    def respond(self, status, data):
+        response = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super(StubROAIHandler, self).log_message(format, *args)
+
+
+class Command(BaseCommand):
+    """
+    Runs a local fake of the RO-AI module to develop and test the risk
+    integration without reaching RO-AI. Point ROAI_BASE_URL to the address
+    it listens on, with a trailing slash.
+    """
+    help = 'Run a local fake of the RO-AI module.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', type=str, default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8600)
+        parser.add_argument('--delay', type=float, default=0.0,
+            help='Seconds to wait before answering each request.')
+        parser.add_argument('--fail-rate', type=float, default=0.0,
+            help='Fraction of the requests answered with 503.')
+        parser.add_argument('--verbose', action='store_true')
+
+    def handle(self, *args, **options):
+        StubROAIHandler.delay = options['delay']
+        StubROAIHandler.fail_rate = options['fail_rate']
+        server = ThreadingHTTPServer(
+            (options['host'], options['port']), StubROAIHandler)
+        server.verbose = options['verbose']
+        self.stdout.write(
+            f'RO-AI stub running on '
+            f'http://{options["host"]}:{options["port"]}/')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
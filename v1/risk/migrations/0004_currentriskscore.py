@@ -0,0 +1,59 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def compute_risk_level(score):
+    if score <= 43:
+        return 301
+    if score <= 60:
+        return 201
+    return 101
+
+
+def create_current_scores(apps, schema_editor):
+    RiskScore = apps.get_model('risk', 'RiskScore')
+    CurrentRiskScore = apps.get_model('risk', 'CurrentRiskScore')
+    scores = RiskScore.objects.order_by(
+        'node_id', '-year', '-id').distinct('node_id')
+    CurrentRiskScore.objects.bulk_create([
+        CurrentRiskScore(
+            node_id=score.node_id, score=score, year=score.year,
+            environment=score.environment, social=score.social,
+            governance=score.governance, overall=score.overall,
+            environment_risk_level=compute_risk_level(score.environment),
+            social_risk_level=compute_risk_level(score.social),
+            governance_risk_level=compute_risk_level(score.governance),
+            overall_risk_level=compute_risk_level(score.overall))
+        for score in scores.iterator()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0041_nodedocument_openai_file_id'),
+        ('risk', '0003_alter_riskscore_node'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentRiskScore',
+            fields=[
+                ('node', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_risk_score', serialize=False, to='nodes.node', verbose_name='Node')),
+                ('year', models.IntegerField(default=1970)),
+                ('environment', models.FloatField(default=0.0)),
+                ('social', models.FloatField(default=0.0)),
+                ('governance', models.FloatField(default=0.0)),
+                ('overall', models.FloatField(db_index=True, default=0.0)),
+                ('environment_risk_level', models.IntegerField(choices=[(101, 'Low'), (201, 'Medium'), (301, 'High')], db_index=True)),
+                ('social_risk_level', models.IntegerField(choices=[(101, 'Low'), (201, 'Medium'), (301, 'High')], db_index=True)),
+                ('governance_risk_level', models.IntegerField(choices=[(101, 'Low'), (201, 'Medium'), (301, 'High')], db_index=True)),
+                ('overall_risk_level', models.IntegerField(choices=[(101, 'Low'), (201, 'Medium'), (301, 'High')], db_index=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('score', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='current', to='risk.riskscore', verbose_name='Risk Score')),
+            ],
+        ),
+        migrations.RunPython(
+            create_current_scores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.0.4 on 2026-10-18 21:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0053_alter_tag_creator_alter_tag_updater'),
+        ('nodes', '0042_node_name_trgm'),
+        ('risk', '0004_currentriskscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreRequest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.IntegerField(choices=[(101, 'Pending'), (201, 'Processing'), (301, 'Completed'), (401, 'Failed')], default=101)),
+                ('attempts', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('node', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_request', to='nodes.node', verbose_name='Node')),
+                ('tenant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_requests', to='tenants.tenant', verbose_name='Tenant')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scorerequest',
+            index=models.Index(fields=['status', 'updated_on'], name='score_request_queue'),
+        ),
+        migrations.AddIndex(
+            model_name='scorerequest',
+            index=models.Index(fields=['tenant', 'status'], name='score_request_progress'),
+        ),
+    ]
@@ -4,6 +4,8 @@ import copy
 
 from django.conf import settings
 from django.db import models
+from django.db import transaction as django_transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from base.models import AbstractBaseModel
@@ -36,6 +38,32 @@ class RiskScore(AbstractBaseModel):
     def __str__(self):
         return f"{self.node.name} - {self.year}"
 
+    def save(self, *args, **kwargs):
+        """
+        Override to refresh the current score of the node, to update the
+        supply chain risk scores depending on the node and to clear the
+        cached dashboard stats of its tenant.
+        """
+        from utilities import calculate_risk
+        from v1.dashboard import caching
+        super(RiskScore, self).save(*args, **kwargs)
+        CurrentRiskScore.refresh(self.node_id)
+        calculate_risk.schedule_update(self.node_id)
+        caching.invalidate_stats(self.node.tenant_id)
+
+    def delete(self, *args, **kwargs):
+        """
+        Override to take the previous score of the node as current and to
+        clear the cached dashboard stats of its tenant.
+        """
+        from v1.dashboard import caching
+        node_id = self.node_id
+        tenant_id = self.node.tenant_id
+        result = super(RiskScore, self).delete(*args, **kwargs)
+        CurrentRiskScore.refresh(node_id)
+        caching.invalidate_stats(tenant_id)
+        return result
+
     @staticmethod
     def compute_risk_level(score):
         if score <= 43:
@@ -127,15 +155,149 @@ class RiskScore(AbstractBaseModel):
         Function to find the score of the node and update it
         """
         cls.update_node(node)
-        score_data = cls.get_score(node)
+        cls.apply_score(node, cls.get_score(node))
+        return True
+
+    @classmethod
+    def update_node_scores(cls, nodes):
+        """
+        Function to update the scores of the nodes like update_node_score,
+        with the requests to RO-AI for all the nodes made concurrently and
+        the scores written in bulk. Returns the nodes updated and a dict of
+        the ids of the nodes that failed to their errors.
+        """
+        from sentry_sdk import capture_exception
+        from v1.nodes.models import Node
+        from v1.risk.integrations.roai import client
+
+        errors = {}
+
+        def _failed(node, error):
+            capture_exception(error)
+            errors[node.id] = str(error) or type(error).__name__
+
+        apis, prepared = [], []
+        for node in nodes:
+            try:
+                node_data = cls.get_node_data(node)
+            except Exception as e:
+                _failed(node, e)
+                continue
+            apis.append(roai_apis.NodeAPI(
+                node_data=node_data, ro_number=node.ro_number))
+            prepared.append(node)
+        registered = []
+        for node, resp in zip(prepared, client.call_many(apis)):
+            if isinstance(resp, Exception):
+                _failed(node, resp)
+            elif 'id' not in resp:
+                _failed(node, ValueError(f'No id in RO-AI response {resp}'))
+            else:
+                node.ro_number = resp['id']
+                registered.append(node)
+        Node.objects.bulk_update(registered, ['ro_number'])
+        scores = client.call_many([
+            roai_apis.GetScore(node.ro_number) for node in registered])
+        scored = []
+        for node, score_data in zip(registered, scores):
+            if isinstance(score_data, Exception):
+                _failed(node, score_data)
+                continue
+            try:
+                cls.update_node_certifications(
+                    node, score_data['certifications'])
+            except Exception as e:
+                _failed(node, e)
+                continue
+            scored.append((node, score_data))
+        cls.apply_scores(scored)
+        return [node for node, score_data in scored], errors
+
+    @classmethod
+    @django_transaction.atomic
+    def apply_scores(cls, scores):
+        """
+        Function to save the score data from RO-AI of each node, a list of
+        (node, score data), like update_all_score does for one, with the
+        scores, category scores and comments written in bulk. The current
+        scores of the nodes are refreshed and the supply chain risk scores
+        depending on them updated in the background. Returns the scores.
+        """
+        from utilities import calculate_risk
+        from v1.dashboard import caching
+
+        if not scores:
+            return []
+        existing = {
+            (score.node_id, score.year): score for score in cls.objects.filter(
+                node__in=[node for node, score_data in scores])}
+        now = timezone.now()
+        results, created, updated = [], [], []
+        for node, score_data in scores:
+            all_scores = score_data['overall']
+            score = existing.get((node.id, score_data['year']))
+            if score:
+                score.updated_on = now
+                updated.append(score)
+            else:
+                score = cls(node=node, year=score_data['year'])
+                created.append(score)
+            score.environment = all_scores['environment']['score']
+            score.social = all_scores['social']['score']
+            score.governance = all_scores['governance']['score']
+            score.overall = all_scores['score']
+            results.append((score, score_data))
+        cls.objects.bulk_create(created)
+        cls.objects.bulk_update(updated, [
+            'environment', 'social', 'governance', 'overall', 'updated_on'])
+
+        CategoryScore.objects.filter(
+            score__in=updated, risk_level=constants.RiskLevel.ALL).delete()
+        RiskComment.objects.filter(score__in=updated).delete()
+        categories, comments = [], []
+        for score, score_data in results:
+            categories += CategoryScore.make_all(
+                score, constants.RiskLevel.ALL, score_data['overall'])
+            comments += [
+                RiskComment(
+                    score=score, comment=comment['description'],
+                    severity=constants.Severity[comment['severity'].upper()])
+                for comment in score_data['specs']]
+        CategoryScore.objects.bulk_create(categories)
+        RiskComment.objects.bulk_create(comments)
+
+        node_ids = [score.node_id for score, score_data in results]
+        CurrentRiskScore.refresh_many(node_ids)
+        calculate_risk.schedule_update(*node_ids)
+        for tenant_id in {node.tenant_id for node, score_data in scores}:
+            caching.invalidate_stats(tenant_id)
+        return [score for score, score_data in results]
+
+    @classmethod
+    def apply_score(cls, node, score_data):
+        """
+        Function to save the score data from RO-AI as the score of the node.
+        """
         cls.update_node_certifications(node, score_data['certifications'])
         score, _ = cls.objects.get_or_create(
             node=node, year=score_data['year'])
         score.update_all_score(score_data)
-        return True
+        return score
 
     @classmethod
     def update_node(cls, node):
+        resp = roai_apis.NodeAPI(
+            node_data=cls.get_node_data(node),
+            ro_number=node.ro_number).call()
+        node.ro_number = resp['id']
+        node.save()
+        return True
+
+    @classmethod
+    def get_node_data(cls, node):
+        """
+        Function to return the data of the node sent to RO-AI.
+        """
         from v1.nodes.serializers.node import NodeSerializer
         node_data = dict(NodeSerializer(node).data)
 
@@ -165,12 +327,7 @@ class RiskScore(AbstractBaseModel):
         for k, v in node_data.items():
             if v is None:
                 node_data[k] = ""
-
-        resp = roai_apis.NodeAPI(
-            node_data=node_data, ro_number=node.ro_number).call()
-        node.ro_number = resp['id']
-        node.save()
-        return True
+        return node_data
     
     @classmethod
     def update_node_certifications(cls, node, certifications):
@@ -214,6 +371,112 @@ class RiskScore(AbstractBaseModel):
         return roai_apis.GetScore(node.ro_number).call()
 
 
+class CurrentRiskScore(models.Model):
+    """
+    Snapshot of the latest risk score of a node, to read, filter and sort
+    nodes by their risk without looking up the latest score of each.
+    Refreshed whenever a risk score of the node is saved or deleted, and
+    for all the nodes at once when their scores are written in bulk.
+
+    Attributes:
+        node(obj)           : Node the score is of.
+        score(obj)          : Latest risk score of the node.
+        year(int)           : Year of the score.
+        environment(float)  : Environment score.
+        social(float)       : Social score.
+        governance(float)   : Governance score.
+        overall(float)      : Overall score.
+        *_risk_level(int)   : Risk level of each of the scores.
+    """
+    node = models.OneToOneField(
+        'nodes.Node', on_delete=models.CASCADE, primary_key=True,
+        related_name='current_risk_score', verbose_name=_('Node'))
+    score = models.OneToOneField(
+        RiskScore, on_delete=models.CASCADE,
+        related_name='current', verbose_name=_('Risk Score'))
+    year = models.IntegerField(default=1970)
+
+    environment = models.FloatField(default=0.0)
+    social = models.FloatField(default=0.0)
+    governance = models.FloatField(default=0.0)
+    overall = models.FloatField(default=0.0, db_index=True)
+
+    environment_risk_level = models.IntegerField(
+        choices=constants.Severity.choices, db_index=True)
+    social_risk_level = models.IntegerField(
+        choices=constants.Severity.choices, db_index=True)
+    governance_risk_level = models.IntegerField(
+        choices=constants.Severity.choices, db_index=True)
+    overall_risk_level = models.IntegerField(
+        choices=constants.Severity.choices, db_index=True)
+
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.node_id} - {self.year}"
+
+    @classmethod
+    def get_defaults(cls, score):
+        """
+        Returns the values of the snapshot for the risk score.
+        """
+        return {
+            'score': score,
+            'year': score.year,
+            'environment': score.environment,
+            'social': score.social,
+            'governance': score.governance,
+            'overall': score.overall,
+            'environment_risk_level': score.environment_risk_level,
+            'social_risk_level': score.social_risk_level,
+            'governance_risk_level': score.governance_risk_level,
+            'overall_risk_level': score.overall_risk_level,
+        }
+
+    @classmethod
+    def refresh(cls, node_id):
+        """
+        Takes the latest risk score of the node as its current score.
+        """
+        score = RiskScore.objects.filter(
+            node_id=node_id).order_by('-year', '-id').first()
+        if not score:
+            cls.objects.filter(node_id=node_id).delete()
+            return None
+        current, _ = cls.objects.update_or_create(
+            node_id=node_id, defaults=cls.get_defaults(score))
+        return current
+
+    @classmethod
+    def refresh_many(cls, node_ids):
+        """
+        Takes the latest risk score of each of the nodes as its current
+        score, with a few queries for all the nodes instead of refresh for
+        each.
+        """
+        latest = RiskScore.objects.filter(node_id__in=node_ids).order_by(
+            'node_id', '-year', '-id').distinct('node_id')
+        now = timezone.now()
+        currents = [
+            cls(node_id=score.node_id, updated_on=now,
+                **cls.get_defaults(score))
+            for score in latest]
+        scored_ids = [current.node_id for current in currents]
+        cls.objects.filter(node_id__in=node_ids).exclude(
+            node_id__in=scored_ids).delete()
+        existing = set(cls.objects.filter(
+            node_id__in=scored_ids).values_list('node_id', flat=True))
+        cls.objects.bulk_create([
+            current for current in currents
+            if current.node_id not in existing], ignore_conflicts=True)
+        cls.objects.bulk_update([
+            current for current in currents if current.node_id in existing], [
+            'score', 'year', 'environment', 'social', 'governance',
+            'overall', 'environment_risk_level', 'social_risk_level',
+            'governance_risk_level', 'overall_risk_level', 'updated_on'])
+        return currents
+
+
 class CategoryScore(AbstractBaseModel):
     """
     Model to store scored for each categories.
@@ -236,6 +499,30 @@ class CategoryScore(AbstractBaseModel):
     def __str__(self):
         return f"{self.score} - {self.category} - {self.risk_level}"
 
+    @classmethod
+    def make_all(cls, score, risk_level, scores):
+        """
+        Returns the unsaved category scores of the score for the risk
+        level, from the scores of a risk level in the RO-AI score data.
+        """
+        scores = copy.deepcopy(scores)
+        by_category = {
+            constants.Category.ENVIRONMENT: scores.pop('environment'),
+            constants.Category.SOCIAL: scores.pop('social'),
+            constants.Category.GOVERNANCE: scores.pop('governance'),
+            constants.Category.OVERALL: scores,
+        }
+        categories = []
+        for category, category_scores in by_category.items():
+            value = category_scores.get('score', 0)
+            categories.append(cls(
+                score=score, category=category, risk_level=risk_level,
+                total=category_scores.get('total', value),
+                average=category_scores.get('avg', value),
+                applicable_indicators=category_scores[
+                    'applicable_indicators']))
+        return categories
+
 
 class RiskComment(AbstractBaseModel):
     """
@@ -250,3 +537,43 @@ class RiskComment(AbstractBaseModel):
 
     def __str__(self):
         return f"{self.score} - {self.severity} - {self.comment[:10]}"
+
+
+class ScoreRequest(models.Model):
+    """
+    Node waiting for its risk score to be initialized or refreshed from
+    RO-AI, processed in batches in the background by v1.risk.score_queue.
+    A node has one request, queued again when its score is to be refreshed.
+
+    Attributes:
+        node(obj)       : Node to score.
+        tenant(obj)     : Tenant of the node, to follow the progress.
+        status(int)     : Status of the request.
+        attempts(int)   : Number of times the node was sent to RO-AI.
+        error(str)      : Error of the last failed attempt.
+    """
+    node = models.OneToOneField(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='score_request', verbose_name=_('Node'))
+    tenant = models.ForeignKey(
+        'tenants.Tenant', on_delete=models.CASCADE,
+        related_name='score_requests', verbose_name=_('Tenant'))
+    status = models.IntegerField(
+        choices=constants.ScoreRequestStatus.choices,
+        default=constants.ScoreRequestStatus.PENDING)
+    attempts = models.IntegerField(default=0)
+    error = models.TextField(default='', blank=True)
+
+    created_on = models.DateTimeField(auto_now_add=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', 'updated_on'], name='score_request_queue'),
+            models.Index(
+                fields=['tenant', 'status'], name='score_request_progress'),
+        ]
+
+    def __str__(self):
+        return f"{self.node_id} - {self.get_status_display()}"
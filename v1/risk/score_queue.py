@@ -0,0 +1,144 @@
+"""
+Queue of the nodes whose risk score is to be initialized or refreshed.
+
+Scoring a node takes two RO-AI requests, one registering the node and one
+getting its score, which used to be made while saving the node, so a bulk
+upload of farmers waited on two sequential requests for every farmer.
+enqueue() instead records a ScoreRequest for each node and, once the
+transaction is committed, schedules the process_score_queue task, once
+for however many nodes are queued.
+
+process() takes the pending requests ROAI_SCORE_BATCH_SIZE at a time and
+scores their nodes with RiskScore.update_node_scores, which calls RO-AI
+ROAI_FANOUT_WORKERS requests at a time, writes the scores in bulk and
+then updates the supply chain risk scores depending on the nodes. Failed
+requests are retried by the next run, up to SCORE_QUEUE_MAX_ATTEMPTS
+times. Celery beat also runs the task every few minutes, to retry them
+and to pick up requests left by a lost worker.
+
+get_progress() returns the number of requests of a tenant in each status.
+"""
+from datetime import timedelta
+
+from sentry_sdk import capture_exception
+
+from django.core.cache import cache
+from django.db import models
+from django.db import transaction as django_transaction
+from django.utils import timezone
+
+from v1.risk import constants as risk_consts
+from v1.risk.models import RiskScore
+from v1.risk.models import ScoreRequest
+
+STATUSES = risk_consts.ScoreRequestStatus
+
+
+def schedule():
+    """Schedules processing the queue, unless it is already scheduled."""
+    from utilities import tasks
+
+    if cache.add(
+            risk_consts.SCORE_QUEUE_SCHEDULED_KEY, True,
+            risk_consts.SCORE_QUEUE_SCHEDULED_TIMEOUT):
+        tasks.process_score_queue.delay()
+
+
+def enqueue(nodes):
+    """
+    Queues the nodes to be scored and schedules processing the queue once
+    the current transaction is committed. Returns the number of nodes.
+    """
+    nodes = [node for node in nodes if node.id]
+    if not nodes:
+        return 0
+    ScoreRequest.objects.filter(node__in=nodes).exclude(
+        status=STATUSES.PENDING).update(
+        status=STATUSES.PENDING, attempts=0, error='',
+        updated_on=timezone.now())
+    ScoreRequest.objects.bulk_create([
+        ScoreRequest(node=node, tenant_id=node.tenant_id) for node in nodes],
+        ignore_conflicts=True)
+    django_transaction.on_commit(schedule)
+    return len(nodes)
+
+
+def reset_stale():
+    """Queues again the requests left processing by a lost worker."""
+    return ScoreRequest.objects.filter(
+        status=STATUSES.PROCESSING,
+        updated_on__lt=timezone.now() - timedelta(
+            minutes=risk_consts.SCORE_QUEUE_STALE_AFTER)).update(
+        status=STATUSES.PENDING, updated_on=timezone.now())
+
+
+def claim(started, batch_size):
+    """
+    Marks up to batch_size of the requests pending since before the run
+    started as processing and returns them. Requests claimed by a parallel
+    run are skipped.
+    """
+    with django_transaction.atomic():
+        ids = list(ScoreRequest.objects.select_for_update(
+            skip_locked=True).filter(
+            status=STATUSES.PENDING, updated_on__lt=started).order_by(
+            'updated_on').values_list('id', flat=True)[:batch_size])
+        ScoreRequest.objects.filter(id__in=ids).update(
+            status=STATUSES.PROCESSING, attempts=models.F('attempts') + 1,
+            updated_on=timezone.now())
+    return list(ScoreRequest.objects.filter(id__in=ids).select_related(
+        'node__tenant', 'node__province__country'))
+
+
+def process_batch(requests):
+    """
+    Scores the nodes of the requests and records the outcome of each.
+    Requests queued again while they were processed stay pending. Returns
+    the number of nodes scored.
+    """
+    nodes = [request.node for request in requests]
+    try:
+        _, errors = RiskScore.update_node_scores(nodes)
+    except Exception as e:
+        capture_exception(e)
+        errors = {node.id: str(e) for node in nodes}
+    processing = ScoreRequest.objects.filter(status=STATUSES.PROCESSING)
+    processing.filter(id__in=[
+        request.id for request in requests
+        if request.node_id not in errors]).update(
+        status=STATUSES.COMPLETED, error='', updated_on=timezone.now())
+    for request in requests:
+        if request.node_id not in errors:
+            continue
+        failed = request.attempts >= risk_consts.SCORE_QUEUE_MAX_ATTEMPTS
+        processing.filter(id=request.id).update(
+            status=STATUSES.FAILED if failed else STATUSES.PENDING,
+            error=errors[request.node_id], updated_on=timezone.now())
+    return len(requests) - len(errors)
+
+
+def process(batch_size=risk_consts.ROAI_SCORE_BATCH_SIZE):
+    """
+    Scores the nodes queued before the run, batch_size at a time. Returns
+    the number of nodes scored.
+    """
+    cache.delete(risk_consts.SCORE_QUEUE_SCHEDULED_KEY)
+    reset_stale()
+    started = timezone.now()
+    count = 0
+    while True:
+        requests = claim(started, batch_size)
+        if not requests:
+            return count
+        count += process_batch(requests)
+
+
+def get_progress(tenant_id):
+    """Returns the number of score requests of the tenant in each status."""
+    counts = dict(ScoreRequest.objects.filter(tenant_id=tenant_id).order_by(
+        ).values_list('status').annotate(count=models.Count('id')))
+    progress = {
+        status.name.lower(): counts.get(status.value, 0)
+        for status in STATUSES}
+    progress['total'] = sum(counts.values())
+    return progress
@@ -4,6 +4,7 @@ from rest_framework import routers
 from django.urls import path
 
 from v1.risk.views import certifications as cert_views
+from v1.risk.views import score as score_views
 
 router = routers.SimpleRouter()
 
@@ -18,4 +19,5 @@ urlpatterns += [
          cert_views.ListNodeCertificationsView.as_view()),
     path('certifications/<idencode:node_id>/',
          cert_views.ListNodeCertificationsView.as_view()),
+    path('score/progress/', score_views.ScoreQueueProgressView.as_view()),
 ]
@@ -1,3 +1,20 @@
-from django.shortcuts import render
+"""
+APIs for the risk scores
+"""
+from rest_framework.views import APIView
 
-# Create your views here.
+from base import session
+from base.response import SuccessResponse
+
+from v1.risk import score_queue
+
+
+class ScoreQueueProgressView(APIView):
+    """
+    API to get the number of nodes of the tenant queued to be scored,
+    being scored, scored and failed.
+    """
+
+    def get(self, request, *args, **kwargs):
+        return SuccessResponse(score_queue.get_progress(
+            session.get_from_local('tenant_id')))
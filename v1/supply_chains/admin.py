@@ -5,7 +5,7 @@ from django.contrib import admin
 from common.admin import BaseAdmin
 
 from v1.supply_chains import models as supply_models
-from v1.supply_chains import graph_models as sc_graph_models
+from v1.supply_chains import graph_queries
 
 
 class OperationAdmin(BaseAdmin):
@@ -37,18 +37,16 @@ class NodeSupplyChainAdmin(BaseAdmin):
     def delete_model(self, request, obj):
         """
         """
-        graph_nodes = sc_graph_models.NodeGraphModel.nodes.filter(
-            pg_node_sc_id=obj.id)
-        for graph_node in graph_nodes:
-            graph_node.disconnect_all()
-            graph_node.delete()
+        graph_queries.get_backend().delete_nodes([obj.id])
         obj.delete()
 
     def delete_queryset(self, request, queryset):
         """
         """
+        graph_queries.get_backend().delete_nodes(
+            list(queryset.values_list('id', flat=True)))
         for node_sc in queryset:
-            self.delete_model(request=request,obj=node_sc)
+            node_sc.delete()
 
     list_display = ('node', 'supply_chain', 'idencode',)
     list_filter = ('supply_chain', 'is_active', 'node__tenant')
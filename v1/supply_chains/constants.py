@@ -12,3 +12,8 @@ class ConnectionStatus(models.IntegerChoices):
 class ConnectionInitiation(models.IntegerChoices):
     MANUAL = 101, _('Manual')
     SYSTEM = 201, _('System')
+
+
+GRAPH_MAX_DEPTH = 10
+GRAPH_SYNC_BATCH_SIZE = 1000
+GRAPH_SYNC_CURSOR_KEY = "supply_graph_sync_cursor"
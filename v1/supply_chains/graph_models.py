@@ -27,6 +27,7 @@ class BaseStructuredNode(neomodel.StructuredNode):
 
 
 class ConnectionRel(neomodel.StructuredRel):
+    pg_connection_id = neomodel.IntegerProperty()
     created_on = neomodel.DateTimeProperty(default=datetime.now)
     supply_chain_id = neomodel.IntegerProperty()
     status = neomodel.IntegerProperty()
@@ -40,7 +41,7 @@ class NodeGraphModel(BaseStructuredNode):
     """
     pg_node_id = neomodel.IntegerProperty()
     pg_node_idencode = neomodel.StringProperty(required=True)
-    pg_node_sc_id = neomodel.IntegerProperty()
+    pg_node_sc_id = neomodel.IntegerProperty(unique_index=True)
     pg_node_sc_idencode = neomodel.StringProperty(required=True)
 
     type = neomodel.IntegerProperty(required=True)
@@ -48,7 +49,7 @@ class NodeGraphModel(BaseStructuredNode):
     managers = neomodel.JSONProperty()
 
     suppliers = neomodel.RelationshipTo('NodeGraphModel', 'BUYS_FROM', model=ConnectionRel)
-    buyers = neomodel.RelationshipFrom('NodeGraphModel', 'SUPPLY_TO', model=ConnectionRel)
+    buyers = neomodel.RelationshipFrom('NodeGraphModel', 'BUYS_FROM', model=ConnectionRel)
 
     def disconnect_all(self):
         self.suppliers.disconnect_all()
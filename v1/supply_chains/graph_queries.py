@@ -1,55 +1,400 @@
-from neomodel import db
+"""
+Access layer for the supply chain graph.
 
+The graph has a node for each NodeSupplyChain, keyed on pg_node_sc_id, and
+a BUYS_FROM relationship from the buyer to the supplier for each
+Connection, keyed on pg_connection_id. Traversals only follow active
+relationships.
 
-class CypherQuery:
+Neo4jBackend runs parameterized Cypher over the pooled neomodel driver.
+MemoryBackend implements the same interface over dicts, to run without a
+Neo4j server. The backend is picked with the SUPPLY_GRAPH_BACKEND setting.
+"""
+from collections import deque
 
-    def __init__(self) -> None:
-        pass
+from django.conf import settings
+from django.utils.module_loading import import_string
 
-    def end_nodes(node_sc_id=None):
+from v1.supply_chains import constants as sc_constants
+
+BACKENDS = {
+    'neo4j': 'v1.supply_chains.graph_queries.Neo4jBackend',
+    'memory': 'v1.supply_chains.graph_queries.MemoryBackend',
+}
+
+_backend = None
+
+
+def get_backend():
+    """Returns the graph backend set in the settings."""
+    global _backend
+    if _backend is None:
+        name = getattr(settings, 'SUPPLY_GRAPH_BACKEND', 'neo4j')
+        _backend = import_string(BACKENDS.get(name, name))()
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the graph backend, like with a MemoryBackend."""
+    global _backend
+    _backend = backend
+    return backend
+
+
+def _check_depth(depth):
+    depth = int(depth or sc_constants.GRAPH_MAX_DEPTH)
+    if not 0 < depth <= sc_constants.GRAPH_MAX_DEPTH:
+        raise ValueError(f'Depth should be from 1 to {sc_constants.GRAPH_MAX_DEPTH}')
+    return depth
+
+
+class GraphBackend:
+    """
+    Interface of the supply chain graph backends.
+
+    Nodes are dicts with pg_node_sc_id, pg_node_sc_idencode, pg_node_id,
+    pg_node_idencode, type and full_name. Relationships are dicts with
+    pg_connection_id, buyer and supplier (node sc ids), supply_chain_id,
+    status and active.
+    """
+
+    def merge_nodes(self, nodes):
+        """Creates or updates the nodes."""
+        raise NotImplementedError
+
+    def merge_relationships(self, relationships):
+        """Creates or updates the relationships."""
+        raise NotImplementedError
+
+    def delete_relationships(self, connection_ids):
+        """Deletes the relationships of the connections."""
+        raise NotImplementedError
+
+    def delete_nodes(self, node_sc_ids):
+        """Deletes the nodes along with their relationships."""
+        raise NotImplementedError
+
+    def suppliers(self, node_sc_id, depth=1):
         """
+        Returns the suppliers of the node up to the depth, as a dict of
+        node sc id to tier, 1 being the direct suppliers.
         """
-        query = """
-                MATCH (n)
-                WHERE NOT (n)-[:BUYS_FROM]->()
-                RETURN n.pg_node_sc_id;
-                """
-        result = db.cypher_query(query)[0]
-        response = [item for sublist in result for item in sublist]
-        return response
-    
-    def connections(node_sc_id=None):
+        raise NotImplementedError
+
+    def buyers(self, node_sc_id, depth=1):
         """
+        Returns the buyers of the node up to the depth, as a dict of node
+        sc id to tier, 1 being the direct buyers.
         """
-        query = """
-                MATCH ({'pg_node_sc_id': {node_sc_id}})-[*]-(connected)
-                RETURN connected.pg_node_sc_id;
-                """%node_sc_id
-        result = db.cypher_query(query)[0]
-        response = [item for sublist in result for item in sublist]
-        return response
-    
-    def parent_nodes(node_sc_id=None):
+        raise NotImplementedError
+
+    def paths(self, buyer_sc_id, supplier_sc_id, depth=None):
         """
+        Returns the shortest supply paths from the buyer up to the
+        supplier, each as a list of node sc ids.
         """
-        query = """
-                MATCH (endNode:NodeGraphModel {'pg_node_sc_id': {node_sc_id}}
-                )<-[r:BUYS_FROM]-(startNode:NodeGraphModel)
-                RETURN startNod.epg_node_sc_id;
-                """%node_sc_id
-        result = db.cypher_query(query)[0]
-        response = [item for sublist in result for item in sublist]
-        return response
-    
-    def child_nodes(node_sc_id=None):
+        raise NotImplementedError
+
+    def edges(self, supply_chain_id):
+        """
+        Returns (buyer, supplier) node sc ids of the active relationships
+        in the supply chain.
+        """
+        raise NotImplementedError
+
+    def end_nodes(self):
+        """Returns the node sc ids of the nodes without suppliers."""
+        raise NotImplementedError
+
+    def components(self, supply_chain_id):
+        """
+        Returns the connected components of the supply chain as a list of
+        sets of node sc ids, largest first.
+        """
+        parents = {}
+
+        def find(node):
+            parents.setdefault(node, node)
+            while parents[node] != node:
+                parents[node] = parents[parents[node]]
+                node = parents[node]
+            return node
+
+        for buyer, supplier in self.edges(supply_chain_id):
+            parents[find(buyer)] = find(supplier)
+        components = {}
+        for node in parents:
+            components.setdefault(find(node), set()).add(node)
+        return sorted(components.values(), key=len, reverse=True)
+
+    def connected(self, node_sc_id):
         """
+        Returns the node sc ids of all the nodes connected to the node in
+        either direction.
         """
-        query = '''
-        MATCH (startNode:NodeGraphModel {pg_node_sc_id:%s}
-        )-[r:BUYS_FROM]->(endNode:NodeGraphModel)
-        RETURN endNode.pg_node_sc_id;
-        '''%node_sc_id
-        result = db.cypher_query(query)[0]
-        response = [item for sublist in result for item in sublist]
-        return response
+        connected = set(self.suppliers(node_sc_id, sc_constants.GRAPH_MAX_DEPTH))
+        connected.update(self.buyers(node_sc_id, sc_constants.GRAPH_MAX_DEPTH))
+        connected.discard(node_sc_id)
+        return connected
+
+
+class Neo4jBackend(GraphBackend):
+    """
+    Graph backend running parameterized Cypher over neomodel's pooled
+    driver. Values are always passed as parameters. Only the depth of
+    variable length patterns, which Cypher does not take as a parameter,
+    is formatted into the query after being checked to be a small int.
+    """
 
+    MERGE_NODES = """
+        UNWIND $rows AS row
+        MERGE (n:NodeGraphModel {pg_node_sc_id: row.pg_node_sc_id})
+        ON CREATE SET
+            n.uid = replace(randomUUID(), '-', ''),
+            n.created_on = row.timestamp
+        SET n.pg_node_sc_idencode = row.pg_node_sc_idencode,
+            n.pg_node_id = row.pg_node_id,
+            n.pg_node_idencode = row.pg_node_idencode,
+            n.type = row.type,
+            n.full_name = row.full_name,
+            n.updated_on = row.timestamp
+        """
+    MERGE_RELATIONSHIPS = """
+        UNWIND $rows AS row
+        MATCH (buyer:NodeGraphModel {pg_node_sc_id: row.buyer})
+        MATCH (supplier:NodeGraphModel {pg_node_sc_id: row.supplier})
+        MERGE (buyer)-[r:BUYS_FROM {pg_connection_id: row.pg_connection_id}]->(supplier)
+        ON CREATE SET r.created_on = row.timestamp
+        SET r.supply_chain_id = row.supply_chain_id,
+            r.status = row.status,
+            r.active = row.active
+        """
+    DELETE_RELATIONSHIPS = """
+        MATCH ()-[r:BUYS_FROM]->()
+        WHERE r.pg_connection_id IN $connection_ids
+        DELETE r
+        """
+    DELETE_NODES = """
+        MATCH (n:NodeGraphModel)
+        WHERE n.pg_node_sc_id IN $node_sc_ids
+        DETACH DELETE n
+        """
+    SUPPLIERS = """
+        MATCH path = (n:NodeGraphModel {pg_node_sc_id: $node_sc_id})
+            -[:BUYS_FROM*1..%d]->(other:NodeGraphModel)
+        WHERE all(r IN relationships(path) WHERE r.active)
+            AND other <> n
+        RETURN other.pg_node_sc_id, min(length(path))
+        """
+    BUYERS = """
+        MATCH path = (n:NodeGraphModel {pg_node_sc_id: $node_sc_id})
+            <-[:BUYS_FROM*1..%d]-(other:NodeGraphModel)
+        WHERE all(r IN relationships(path) WHERE r.active)
+            AND other <> n
+        RETURN other.pg_node_sc_id, min(length(path))
+        """
+    PATHS = """
+        MATCH (buyer:NodeGraphModel {pg_node_sc_id: $buyer_sc_id})
+        MATCH (supplier:NodeGraphModel {pg_node_sc_id: $supplier_sc_id})
+        MATCH path = allShortestPaths((buyer)-[:BUYS_FROM*..%d]->(supplier))
+        WHERE all(r IN relationships(path) WHERE r.active)
+        RETURN [n IN nodes(path) | n.pg_node_sc_id]
+        """
+    EDGES = """
+        MATCH (buyer:NodeGraphModel)-[r:BUYS_FROM]->(supplier:NodeGraphModel)
+        WHERE r.supply_chain_id = $supply_chain_id AND r.active
+        RETURN DISTINCT buyer.pg_node_sc_id, supplier.pg_node_sc_id
+        """
+    END_NODES = """
+        MATCH (n:NodeGraphModel)
+        WHERE NOT (n)-[:BUYS_FROM {active: true}]->()
+        RETURN n.pg_node_sc_id
+        """
+
+    def run(self, query, **params):
+        """Runs the query with the params and returns the rows."""
+        from neomodel import db
+        return db.cypher_query(query, params)[0]
+
+    def merge_nodes(self, nodes):
+        if nodes:
+            self.run(self.MERGE_NODES, rows=nodes)
+        return len(nodes)
+
+    def merge_relationships(self, relationships):
+        if relationships:
+            self.run(self.MERGE_RELATIONSHIPS, rows=relationships)
+        return len(relationships)
+
+    def delete_relationships(self, connection_ids):
+        self.run(self.DELETE_RELATIONSHIPS, connection_ids=list(connection_ids))
+        return True
+
+    def delete_nodes(self, node_sc_ids):
+        self.run(self.DELETE_NODES, node_sc_ids=list(node_sc_ids))
+        return True
+
+    def suppliers(self, node_sc_id, depth=1):
+        return dict(self.run(
+            self.SUPPLIERS % _check_depth(depth), node_sc_id=node_sc_id))
+
+    def buyers(self, node_sc_id, depth=1):
+        return dict(self.run(
+            self.BUYERS % _check_depth(depth), node_sc_id=node_sc_id))
+
+    def paths(self, buyer_sc_id, supplier_sc_id, depth=None):
+        return [row[0] for row in self.run(
+            self.PATHS % _check_depth(depth),
+            buyer_sc_id=buyer_sc_id, supplier_sc_id=supplier_sc_id)]
+
+    def edges(self, supply_chain_id):
+        return [
+            tuple(row) for row in self.run(
+                self.EDGES, supply_chain_id=supply_chain_id)]
+
+    def end_nodes(self):
+        return [row[0] for row in self.run(self.END_NODES)]
+
+
+class MemoryBackend(GraphBackend):
+    """
+    Graph backend keeping the graph in dicts, for tests and development
+    without a Neo4j server. Not shared across processes. Relationships are
+    keyed on their connection, buyer and supplier as the Neo4j backend
+    merges them, since a connection can make an edge each way.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.relationships = {}
+
+    def merge_nodes(self, nodes):
+        for node in nodes:
+            self.nodes.setdefault(node['pg_node_sc_id'], {}).update(node)
+        return len(nodes)
+
+    def merge_relationships(self, relationships):
+        for relationship in relationships:
+            if relationship['buyer'] not in self.nodes or \
+                    relationship['supplier'] not in self.nodes:
+                continue
+            key = (
+                relationship['pg_connection_id'], relationship['buyer'],
+                relationship['supplier'])
+            self.relationships[key] = dict(relationship)
+        return len(relationships)
+
+    def delete_relationships(self, connection_ids):
+        connection_ids = set(connection_ids)
+        self.relationships = {
+            key: relationship
+            for key, relationship in self.relationships.items()
+            if relationship['pg_connection_id'] not in connection_ids}
+        return True
+
+    def delete_nodes(self, node_sc_ids):
+        node_sc_ids = set(node_sc_ids)
+        for node_sc_id in node_sc_ids:
+            self.nodes.pop(node_sc_id, None)
+        self.relationships = {
+            key: relationship
+            for key, relationship in self.relationships.items()
+            if relationship['buyer'] not in node_sc_ids and
+            relationship['supplier'] not in node_sc_ids}
+        return True
+
+    def adjacency(self, reverse=False):
+        """Returns the active relationships as adjacency sets."""
+        adjacency = {}
+        for relationship in self.relationships.values():
+            if not relationship['active']:
+                continue
+            buyer, supplier = relationship['buyer'], relationship['supplier']
+            if reverse:
+                buyer, supplier = supplier, buyer
+            adjacency.setdefault(buyer, set()).add(supplier)
+        return adjacency
+
+    def traverse(self, node_sc_id, depth, reverse=False):
+        """Returns the nodes reached from the node with their tiers."""
+        depth = _check_depth(depth)
+        adjacency = self.adjacency(reverse)
+        tiers = {}
+        frontier = deque([(node_sc_id, 0)])
+        while frontier:
+            node, tier = frontier.popleft()
+            if tier == depth:
+                continue
+            for other in adjacency.get(node, ()):
+                if other == node_sc_id or other in tiers:
+                    continue
+                tiers[other] = tier + 1
+                frontier.append((other, tier + 1))
+        return tiers
+
+    def suppliers(self, node_sc_id, depth=1):
+        return self.traverse(node_sc_id, depth)
+
+    def buyers(self, node_sc_id, depth=1):
+        return self.traverse(node_sc_id, depth, reverse=True)
+
+    def paths(self, buyer_sc_id, supplier_sc_id, depth=None):
+        depth = _check_depth(depth)
+        if buyer_sc_id not in self.nodes or supplier_sc_id not in self.nodes:
+            return []
+        adjacency = self.adjacency()
+        paths = []
+        level = [[buyer_sc_id]]
+        visited = {buyer_sc_id}
+        for _ in range(depth):
+            next_level = []
+            for path in level:
+                for supplier in adjacency.get(path[-1], ()):
+                    if supplier == supplier_sc_id:
+                        paths.append(path + [supplier])
+                    elif supplier not in visited:
+                        next_level.append(path + [supplier])
+            if paths or not next_level:
+                break
+            visited.update(path[-1] for path in next_level)
+            level = next_level
+        return paths
+
+    def edges(self, supply_chain_id):
+        return list({
+            (relationship['buyer'], relationship['supplier'])
+            for relationship in self.relationships.values()
+            if relationship['active'] and
+            relationship['supply_chain_id'] == supply_chain_id})
+
+    def end_nodes(self):
+        adjacency = self.adjacency()
+        return [
+            node_sc_id for node_sc_id in self.nodes
+            if not adjacency.get(node_sc_id)]
+
+
+class CypherQuery:
+    """
+    Queries used by the risk score calculation, kept for its callers.
+    """
+
+    @staticmethod
+    def end_nodes(node_sc_id=None):
+        """Returns the node sc ids of the nodes without suppliers."""
+        return get_backend().end_nodes()
+
+    @staticmethod
+    def connections(node_sc_id=None):
+        """Returns the node sc ids of all the nodes connected to the node."""
+        return list(get_backend().connected(node_sc_id))
+
+    @staticmethod
+    def parent_nodes(node_sc_id=None):
+        """Returns the node sc ids of the direct buyers of the node."""
+        return list(get_backend().buyers(node_sc_id))
+
+    @staticmethod
+    def child_nodes(node_sc_id=None):
+        """Returns the node sc ids of the direct suppliers of the node."""
+        return list(get_backend().suppliers(node_sc_id))
@@ -0,0 +1,115 @@
+"""
+Sync of the supply chain graph from the Connection table.
+
+Connections are read in batches ordered by id, and the nodes and
+relationships of each batch are written with a single UNWIND query each.
+The id of the last synced connection is kept in the cache, so that an
+interrupted sync can resume from it.
+"""
+import time
+
+from django.core.cache import cache
+
+from v1.supply_chains import constants as sc_constants
+from v1.supply_chains import graph_queries
+from v1.supply_chains.models import Connection, NodeSupplyChain
+
+
+def get_graph_rows(connections):
+    """
+    Returns the graph nodes and relationships of the connections, with a
+    query for the connections and one for their node supply chains.
+    """
+    connections = list(connections.values(
+        'id', 'source_id', 'target_id', 'supply_chain_id', 'status',
+        'is_supplier', 'is_buyer'))
+    node_ids = set()
+    sc_ids = set()
+    for connection in connections:
+        node_ids.update((connection['source_id'], connection['target_id']))
+        sc_ids.add(connection['supply_chain_id'])
+    node_scs = NodeSupplyChain.objects.filter(
+        node_id__in=node_ids, supply_chain_id__in=sc_ids).select_related(
+        'node')
+    timestamp = time.time()
+    nodes = {}
+    node_sc_ids = {}
+    for node_sc in node_scs:
+        node_sc_ids[(node_sc.node_id, node_sc.supply_chain_id)] = node_sc.id
+        nodes[node_sc.id] = {
+            'pg_node_sc_id': node_sc.id,
+            'pg_node_sc_idencode': node_sc.idencode,
+            'pg_node_id': node_sc.node_id,
+            'pg_node_idencode': node_sc.node.idencode,
+            'type': node_sc.node.type,
+            'full_name': node_sc.node.name,
+            'timestamp': timestamp,
+        }
+    relationships = []
+    for connection in connections:
+        source = node_sc_ids.get(
+            (connection['source_id'], connection['supply_chain_id']))
+        target = node_sc_ids.get(
+            (connection['target_id'], connection['supply_chain_id']))
+        if not source or not target:
+            continue
+        pairs = []
+        if connection['is_supplier']:
+            pairs.append((source, target))
+        if connection['is_buyer']:
+            pairs.append((target, source))
+        for buyer, supplier in pairs:
+            relationships.append({
+                'pg_connection_id': connection['id'],
+                'buyer': buyer,
+                'supplier': supplier,
+                'supply_chain_id': connection['supply_chain_id'],
+                'status': connection['status'],
+                'active': connection['status'] != (
+                    sc_constants.ConnectionStatus.REVOKED),
+                'timestamp': timestamp,
+            })
+    return list(nodes.values()), relationships
+
+
+def sync_connections(connections, backend=None):
+    """
+    Writes the nodes and relationships of the connections to the graph.
+    The relationships of each connection are replaced as a whole, so that
+    none is left behind when its direction changes.
+    """
+    backend = backend or graph_queries.get_backend()
+    nodes, relationships = get_graph_rows(connections)
+    backend.delete_relationships(
+        {relationship['pg_connection_id'] for relationship in relationships})
+    backend.merge_nodes(nodes)
+    backend.merge_relationships(relationships)
+    return len(relationships)
+
+
+def sync_all(connections=None, batch_size=None, resume=False, backend=None,
+             callback=None):
+    """
+    Syncs the connections in batches ordered by id, saving the id of the
+    last synced connection after each batch. With resume, starts after
+    the id saved by the previous run.
+    """
+    batch_size = batch_size or sc_constants.GRAPH_SYNC_BATCH_SIZE
+    connections = Connection.objects.all() if connections is None \
+        else connections
+    last_id = cache.get(sc_constants.GRAPH_SYNC_CURSOR_KEY, 0) if resume \
+        else 0
+    count = 0
+    while True:
+        batch_ids = list(connections.filter(id__gt=last_id).order_by(
+            'id').values_list('id', flat=True)[:batch_size])
+        if not batch_ids:
+            break
+        count += sync_connections(
+            Connection.objects.filter(id__in=batch_ids), backend)
+        last_id = batch_ids[-1]
+        cache.set(sc_constants.GRAPH_SYNC_CURSOR_KEY, last_id, timeout=None)
+        if callback:
+            callback(last_id, count)
+    cache.delete(sc_constants.GRAPH_SYNC_CURSOR_KEY)
+    return count
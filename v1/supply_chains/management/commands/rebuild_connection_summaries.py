@@ -0,0 +1,41 @@
+"""Command to rebuild the connection summaries of the nodes."""
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from v1.supply_chains.models import Connection, ConnectionSummary
+from v1.transactions.models import ExternalTransaction
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the connection summaries of every pair of connected or
+    trading nodes. Run it once after the summaries are introduced, and
+    to repair them if they fall out of sync.
+    """
+    help = 'Rebuild the connection summaries of the nodes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=int, default=None,
+            help='Id of the tenant to rebuild the summaries of.')
+
+    def handle(self, *args, **options):
+        connections = Connection.objects.all()
+        txns = ExternalTransaction.objects.filter(
+            source__isnull=False, destination__isnull=False)
+        if options['tenant']:
+            connections = connections.filter(tenant_id=options['tenant'])
+            txns = txns.filter(
+                Q(source__tenant_id=options['tenant']) |
+                Q(destination__tenant_id=options['tenant']))
+        pairs = set()
+        for query in (
+                connections.values_list('source_id', 'target_id'),
+                txns.values_list('source_id', 'destination_id')):
+            for node_id, counterpart_id in query.distinct():
+                pairs.add(tuple(sorted((node_id, counterpart_id))))
+        for count, (node_id, counterpart_id) in enumerate(sorted(pairs), 1):
+            ConnectionSummary.refresh(node_id, counterpart_id)
+            if count % 1000 == 0:
+                self.stdout.write(f'{count}/{len(pairs)} pairs done')
+        self.stdout.write(f'Rebuilt summaries of {len(pairs)} pairs.')
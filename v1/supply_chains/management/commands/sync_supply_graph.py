@@ -0,0 +1,35 @@
+"""Command to sync the supply chain graph from the connections."""
+
+from django.core.management.base import BaseCommand
+
+from v1.supply_chains import graph_sync
+from v1.supply_chains.models import Connection
+
+
+class Command(BaseCommand):
+    """
+    Writes the nodes and relationships of the connections to the graph in
+    batches. An interrupted run can be continued with --resume, starting
+    after the last connection synced.
+    """
+    help = 'Sync the supply chain graph from the connections.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--resume', action='store_true',
+            help='Continue after the last connection synced.')
+        parser.add_argument('--tenant', type=int, default=None,
+            help='Id of the tenant to sync the connections of.')
+
+    def report(self, last_id, count):
+        self.stdout.write(
+            f'Synced {count} relationships, up to connection {last_id}')
+
+    def handle(self, *args, **options):
+        connections = Connection.objects.all()
+        if options['tenant']:
+            connections = connections.filter(tenant_id=options['tenant'])
+        count = graph_sync.sync_all(
+            connections, batch_size=options['batch_size'],
+            resume=options['resume'], callback=self.report)
+        self.stdout.write(f'Sync completed, {count} relationships synced.')
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.4 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nodes', '0041_nodedocument_openai_file_id'),
+        ('supply_chains', '0047_alter_connection_tags_delete_tag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConnectionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('products', models.JSONField(blank=True, default=list)),
+                ('last_transaction_date', models.DateField(blank=True, null=True)),
+                ('transacted_quantity', models.FloatField(default=0.0)),
+                ('counterpart_sc_risk_level', models.IntegerField(blank=True, choices=[(101, 'Low'), (201, 'Medium'), (301, 'High')], null=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+                ('counterpart', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counterpart_summaries', to='nodes.node', verbose_name='Counterpart')),
+                ('node', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='connection_summaries', to='nodes.node', verbose_name='Node')),
+                ('supply_chain', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='connection_summaries', to='supply_chains.supplychain', verbose_name='Supply Chain')),
+            ],
+            options={
+                'unique_together': {('node', 'counterpart', 'supply_chain')},
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 """Models of the app Supplychains."""
 
 from django.db import models
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 
@@ -16,7 +17,6 @@ from v1.nodes import constants as node_consts
 
 from v1.supply_chains import constants as sc_constants
 from v1.supply_chains import notifications
-from v1.supply_chains import graph_models as sc_graph_models
 
 from v1.risk import constants as risk_consts
 
@@ -175,16 +175,53 @@ class Connection(AbstractBaseModel, NumberedModel):
         """Object name in django admin."""
         return f'{self.source.name} -> {self.target.name} | {self.idencode}'
 
+    def save(self, *args, **kwargs):
+        """
+        Override to clear cached connection circles and dashboard stats, to
+        update the supply chain risk scores depending on the source and
+        the summaries of the connected nodes.
+        """
+        super(Connection, self).save(*args, **kwargs)
+        self.invalidate_connection_circles()
+        self.invalidate_dashboard_stats()
+        self.update_sc_risk_scores()
+        ConnectionSummary.schedule_refresh(self.source_id, self.target_id)
+
+    def delete(self, *args, **kwargs):
+        """
+        Override to clear cached connection circles and dashboard stats and
+        to update the supply chain risk scores depending on the source.
+        """
+        self.invalidate_connection_circles()
+        self.invalidate_dashboard_stats()
+        self.update_sc_risk_scores()
+        return super(Connection, self).delete(*args, **kwargs)
+
+    def invalidate_dashboard_stats(self):
+        """Clears cached dashboard stats of the tenant."""
+        from v1.dashboard import caching
+        return caching.invalidate_stats(self.tenant_id)
+
+    def update_sc_risk_scores(self):
+        """Schedules update of the risk scores depending on the source."""
+        from utilities import calculate_risk
+        return calculate_risk.schedule_update(self.source_id)
+
+    def invalidate_connection_circles(self):
+        """Clears cached connection circles of source and target."""
+        from v1.nodes.models import Node
+        return Node.invalidate_connection_circles(
+            self.source_id, self.target_id)
+
     def send_invite(self):
         """Function to set password."""
+        tokens = {}
         for user in self.target.members.all():
-            token = None
             if not user.password or not user.has_usable_password():
-                token = ValidationToken.initialize(
+                tokens[user.id] = ValidationToken.initialize(
                     user, acc_constants.ValidationTokenType.INVITE)
-            notification_manager = notifications.NodeInviteNotificationManager(
-                user=user, action_object=self, token=token)
-            notification_manager.send_notification()
+        notifications.NodeInviteNotificationManager.notify_members(
+            self.target, self, tokens=tokens)
         return True
     
     @property
@@ -196,49 +233,10 @@ class Connection(AbstractBaseModel, NumberedModel):
     
     def update_graphdb(self):
         """
+        Writes the nodes and relationships of the connection to the graph.
         """
-        target_node_sc = NodeSupplyChain.objects.get(
-            node=self.target, 
-            supply_chain=self.supply_chain)
-        try:
-            target_connection = sc_graph_models.NodeGraphModel.nodes.first(
-                pg_node_id=self.target.id,pg_node_idencode=self.target.idencode,
-                pg_node_sc_id=target_node_sc.id,
-                pg_node_sc_idencode=target_node_sc.idencode,
-                type=self.target.type,full_name=self.target.name
-            )
-        except:
-            target_connection = sc_graph_models.NodeGraphModel(
-            pg_node_id=self.target.id,pg_node_idencode=self.target.idencode,
-            pg_node_sc_id=target_node_sc.id,
-            pg_node_sc_idencode=target_node_sc.idencode,
-            type=self.target.type,full_name=self.target.name
-            )
-        source_node_sc = NodeSupplyChain.objects.get(
-            node=self.source, 
-            supply_chain=self.supply_chain)
-        try:
-            source_connection = sc_graph_models.NodeGraphModel.nodes.first(
-                pg_node_id=self.source.id,pg_node_idencode=self.source.idencode,
-                pg_node_sc_id=source_node_sc.id,
-                pg_node_sc_idencode=source_node_sc.idencode,
-                type=self.source.type,full_name=self.source.name
-            )
-        except:
-            source_connection = sc_graph_models.NodeGraphModel(
-            pg_node_id=self.source.id,pg_node_idencode=self.source.idencode,
-            pg_node_sc_id=source_node_sc.id,
-            pg_node_sc_idencode=source_node_sc.idencode,
-            type=self.source.type,full_name=self.source.name
-            )
-        target_connection.save()
-        source_connection.save()
-        if self.is_supplier:
-            target_connection.suppliers.connect(
-                source_connection, {"supply_chain_id": self.supply_chain.id})
-        if self.is_buyer:
-            target_connection.buyers.connect(
-                source_connection, {"supply_chain_id": self.supply_chain.id})
+        from v1.supply_chains import graph_sync
+        graph_sync.sync_connections(Connection.objects.filter(id=self.id))
         return True
     
     def get_target_node_sc(self):
@@ -282,16 +280,159 @@ class NodeSupplyChain(AbstractBaseModel):
         """Object name in django admin."""
         return f'{self.node.name} - {self.supply_chain.name} | {self.idencode}'
     
-    @property
-    def sc_risk_level(self):
-        if self.sc_risk_score <= 43:
+    @staticmethod
+    def compute_risk_level(sc_risk_score):
+        if sc_risk_score <= 43:
             return risk_consts.Severity.HIGH
-        if self.sc_risk_score <= 60:
+        if sc_risk_score <= 60:
             return risk_consts.Severity.MEDIUM
         return risk_consts.Severity.LOW
 
+    @property
+    def sc_risk_level(self):
+        return self.compute_risk_level(self.sc_risk_score)
+
     class Meta:
         """
         Meta Setup.
         """
         unique_together = ('supply_chain', 'node')
+
+
+class ConnectionSummary(models.Model):
+    """
+    Denormalized summary of the trade between a node and one of its
+    connections, listed along with the connection without querying
+    transactions for each row.
+
+    There is a row for each supply chain the two nodes are connected or
+    trade in, and a row without supply chain summarizing all of them.
+    Rows are refreshed when a transaction between the nodes or a
+    connection between them is saved, and the risk level when the
+    supply chain risk score of the counterpart is updated.
+
+    Attributes:
+        node(obj)                   : Node the summary is for.
+        counterpart(obj)            : Connected node.
+        supply_chain(obj)           : Supply chain, null for all of them.
+        products(list)              : Names of traded products.
+        last_transaction_date(date) : Date of the latest transaction.
+        transacted_quantity(float)  : Total quantity transacted in kg.
+        counterpart_sc_risk_level(int): Supply chain risk level of the
+                                      counterpart.
+    """
+
+    node = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='connection_summaries', verbose_name=_('Node'))
+    counterpart = models.ForeignKey(
+        'nodes.Node', on_delete=models.CASCADE,
+        related_name='counterpart_summaries', verbose_name=_('Counterpart'))
+    supply_chain = models.ForeignKey(
+        SupplyChain, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='connection_summaries', verbose_name=_('Supply Chain'))
+    products = models.JSONField(default=list, blank=True)
+    last_transaction_date = models.DateField(null=True, blank=True)
+    transacted_quantity = models.FloatField(default=0.0)
+    counterpart_sc_risk_level = models.IntegerField(
+        choices=risk_consts.Severity.choices, null=True, blank=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('node', 'counterpart', 'supply_chain')
+
+    def __str__(self):
+        """Object name in django admin."""
+        return f'{self.node_id} -> {self.counterpart_id} | {self.supply_chain_id}'
+
+    @classmethod
+    def schedule_refresh(cls, node_id, counterpart_id):
+        """
+        Refreshes the summaries of the two nodes once the current
+        transaction is committed.
+        """
+        if not node_id or not counterpart_id:
+            return False
+        transaction.on_commit(lambda: cls.refresh(node_id, counterpart_id))
+        return True
+
+    @classmethod
+    def refresh(cls, node_id, counterpart_id):
+        """
+        Recomputes the summaries of the two nodes about each other from
+        their transactions and connections.
+        """
+        from v1.transactions.models import ExternalTransaction
+
+        txns = ExternalTransaction.objects.filter(
+            models.Q(source_id=node_id, destination_id=counterpart_id) |
+            models.Q(source_id=counterpart_id, destination_id=node_id))
+        sc_field = 'result_batches__product__supply_chain_id'
+        summaries = {None: {'products': set()}}
+        for sc_id, product in txns.values_list(
+                sc_field, 'result_batches__product__name').distinct():
+            if product is None:
+                continue
+            summaries.setdefault(sc_id, {'products': set()})
+            summaries[sc_id]['products'].add(product)
+            summaries[None]['products'].add(product)
+        for sc_id, last_date, quantity in txns.order_by().values(
+                sc_field).annotate(
+                last_date=models.Max('date'),
+                quantity=models.Sum('destination_quantity_kg')).values_list(
+                sc_field, 'last_date', 'quantity'):
+            for key in {sc_id, None}:
+                summary = summaries.setdefault(key, {'products': set()})
+                if last_date and (
+                        not summary.get('last_transaction_date') or
+                        last_date > summary['last_transaction_date']):
+                    summary['last_transaction_date'] = last_date
+                summary['transacted_quantity'] = summary.get(
+                    'transacted_quantity', 0.0) + float(quantity or 0)
+        for sc_id in Connection.objects.filter(
+                models.Q(source_id=node_id, target_id=counterpart_id) |
+                models.Q(source_id=counterpart_id, target_id=node_id)
+                ).values_list('supply_chain_id', flat=True):
+            summaries.setdefault(sc_id, {'products': set()})
+
+        sc_risk_scores = {}
+        for sc_node_id, sc_id, score in NodeSupplyChain.objects.filter(
+                node_id__in=[node_id, counterpart_id],
+                supply_chain_id__in=[key for key in summaries if key]
+                ).values_list('node_id', 'supply_chain_id', 'sc_risk_score'):
+            sc_risk_scores[(sc_node_id, sc_id)] = score
+
+        for owner, other in ((node_id, counterpart_id), (counterpart_id, node_id)):
+            for sc_id, summary in summaries.items():
+                score = sc_risk_scores.get((other, sc_id))
+                cls.objects.update_or_create(
+                    node_id=owner, counterpart_id=other, supply_chain_id=sc_id,
+                    defaults={
+                        'products': sorted(summary['products']),
+                        'last_transaction_date': summary.get(
+                            'last_transaction_date'),
+                        'transacted_quantity': summary.get(
+                            'transacted_quantity', 0.0),
+                        'counterpart_sc_risk_level': None if score is None
+                        else NodeSupplyChain.compute_risk_level(score),
+                    })
+        return True
+
+    @classmethod
+    def update_risk_levels(cls, supply_chain_id, sc_risk_scores):
+        """
+        Updates the risk level of the counterparts in the supply chain,
+        from a dict of node id to supply chain risk score, with one
+        query per risk level.
+        """
+        node_ids_by_level = {}
+        for node_id, score in sc_risk_scores.items():
+            level = NodeSupplyChain.compute_risk_level(score)
+            node_ids_by_level.setdefault(level, []).append(node_id)
+        for level, node_ids in node_ids_by_level.items():
+            cls.objects.filter(
+                supply_chain_id=supply_chain_id,
+                counterpart_id__in=node_ids).exclude(
+                counterpart_sc_risk_level=level).update(
+                counterpart_sc_risk_level=level)
+        return True
@@ -11,8 +11,6 @@ from base import session
 from common.drf_custom import fields
 from base import exceptions
 
-from v1.risk import models as risk_models
-
 from v1.accounts.models import CustomUser
 
 from v1.nodes.models import Node
@@ -187,10 +185,7 @@ class ConnectNodeSerializer(ConnectExistingNodeSerializer):
         node_serializer = node_serializers.NodeSerializer(data=node_data)
         if not node_serializer.is_valid():
             raise serializers.ValidationError(node_serializer.errors)
-        node = node_serializer.save()
-        if validated_data['tenant'].risk_analysis:
-            risk_models.RiskScore.update_node_score(node)
-        return node
+        return node_serializer.save()
 
     @staticmethod
     def create_user(validated_data):
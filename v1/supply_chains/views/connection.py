@@ -59,15 +59,20 @@ class ConnectionsView(generics.ListCreateAPIView):
             'suppliers': suppliers,
             'include_revoked': include_revoked,
         }
-        if 'supply_chain' in self.request.GET and not self.request.GET.get(
-                'exclude_existing', False):
+        current_sc = None
+        if 'supply_chain' in self.request.GET:
             current_sc = decode(self.request.GET.get('supply_chain', None))
-            params['supply_chain'] = current_sc
+            if not self.request.GET.get('exclude_existing', False):
+                params['supply_chain'] = current_sc
         connected_nodes = current_node.get_connections(**params)
-        connected_nodes = connected_nodes.annotate(
+        connected_nodes = current_node.annotate_connection_summary(
+            connected_nodes, current_sc)
+        connected_nodes = connected_nodes.select_related(
+            'current_risk_score').annotate(
             rank=Window(
                 expression=Rank(),
-                order_by = F('risk_scores__overall').desc(nulls_last=True),
+                order_by = F('current_risk_score__overall').desc(
+                    nulls_last=True),
             )
         )
         return connected_nodes
@@ -170,8 +170,11 @@ class Tenant(AbstractBaseModel, AbstractTopic):
     def save(self, *args, **kwargs):
         """
         Checks can create multiple tenants and also makes force logout
-        for all users under the specific tentant.
+        for all users under the specific tentant. The cached consumer
+        interface pages of the tenant are cleared.
         """
+        from v1.consumer_interface import caching as ci_caching
+
         if not self.id and settings.ENTERPRISE_MODE:
             if Tenant.objects.count() > 0:
                 raise ValueError(
@@ -183,6 +186,7 @@ class Tenant(AbstractBaseModel, AbstractTopic):
         else:
             self.users.update(force_logout=True)
             super(Tenant, self).save(*args, **kwargs)
+        ci_caching.invalidate_tenant(self.id)
 
     def create_ci_sections(self):
         """
@@ -0,0 +1,84 @@
+"""Command to benchmark batch lineage resolution on synthetic chains."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from v1.products import models as prod_models
+from v1.transactions import models as txn_models
+from v1.transactions import constants as txn_consts
+
+from v1.tracker.operations import BatchLineage
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic chain after benchmarking."""
+
+
+class Command(BaseCommand):
+    """
+    Builds a synthetic chain of batches, each one created from the previous
+    batch through an internal transaction, resolves the lineage of the last
+    batch and reports the time and number of queries taken.
+    Everything created is rolled back at the end.
+    """
+    help = 'Benchmark batch lineage resolution on a synthetic chain.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--depth', type=int, default=50)
+        parser.add_argument('--width', type=int, default=1,
+            help='Number of source batches merged at each level.')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def build_chain(self, product, depth, width):
+        """
+        Create the chain and return the batch at the end of it.
+        """
+        def create_batch():
+            return prod_models.Batch.objects.create(
+                tenant=product.tenant, product=product, unit=product.unit,
+                initial_quantity=1, current_quantity=1)
+
+        sources = [create_batch() for _ in range(width)]
+        for _ in range(depth):
+            batch = create_batch()
+            txn = txn_models.Transaction.objects.create(
+                tenant=product.tenant, unit=product.unit,
+                transaction_type=txn_consts.TransactionType.INTERNAL,
+                source_quantity=width, destination_quantity=1)
+            txn_models.SourceBatch.objects.bulk_create([
+                txn_models.SourceBatch(
+                    transaction=txn, batch=source, unit=product.unit,
+                    quantity=1, quantity_kg=product.unit.equivalent_kg)
+                for source in sources])
+            txn.result_batches.add(batch)
+            sources = [batch] + [create_batch() for _ in range(width - 1)]
+        return sources[0]
+
+    def handle(self, *args, **options):
+        product = prod_models.Product.objects.exclude(
+            unit=None).select_related('tenant', 'unit').first()
+        if not product:
+            raise CommandError('A product with a unit is required.')
+        depth, width = options['depth'], options['width']
+        try:
+            with transaction.atomic():
+                batch = self.build_chain(product, depth, width)
+                timings = []
+                for _ in range(options['runs']):
+                    start = time.perf_counter()
+                    with CaptureQueriesContext(connection) as queries:
+                        lineage = BatchLineage(batch)
+                        batch_ids = lineage.batch_ids()
+                        list(lineage.source_batches())
+                    timings.append(time.perf_counter() - start)
+                self.stdout.write(
+                    f'depth={depth} width={width} '
+                    f'batches={len(batch_ids)} queries={len(queries)} '
+                    f'best={min(timings) * 1000:.2f}ms '
+                    f'avg={sum(timings) / len(timings) * 1000:.2f}ms')
+                raise Rollback
+        except Rollback:
+            pass
@@ -1,10 +1,129 @@
+from django.db import connection
+
 from v1.products.models import Batch
 from v1.transactions import models as txn_models
 from v1.transactions import constants as txn_consts
 
 
+class BatchLineage:
+    """
+    Resolves the complete upstream graph of a batch (batches, source batch
+    edges and transaction types) with a single recursive query instead of
+    walking the ancestry one batch at a time.
+
+    Each batch is followed through its latest incoming transaction to the
+    source batches of that transaction, same as the tracker always did.
+    UNION is used in the recursive term so that a batch reached through
+    multiple paths is resolved only once and cyclic data can not loop.
+    """
+
+    def __init__(self, batch):
+        """
+        Initialize with the batch whose lineage is to be resolved.
+        """
+        self.batch = batch
+        self._rows = None
+
+    @staticmethod
+    def _query():
+        """
+        Return the recursive CTE resolving the lineage of a batch.
+        """
+        batch_table = Batch._meta.db_table
+        txn_table = txn_models.Transaction._meta.db_table
+        result_table = \
+            txn_models.Transaction.result_batches.through._meta.db_table
+        source_table = txn_models.SourceBatch._meta.db_table
+        incoming_txn = f"""
+            SELECT rb.transaction_id FROM {result_table} rb
+            INNER JOIN {txn_table} t ON t.id = rb.transaction_id
+            WHERE rb.batch_id = %s
+            ORDER BY t.created_on DESC, t.id DESC LIMIT 1
+            """
+        return f"""
+            WITH RECURSIVE lineage(batch_id, transaction_id) AS (
+                SELECT b.id, ({incoming_txn % 'b.id'})
+                FROM {batch_table} b WHERE b.id = %(batch_id)s
+              UNION
+                SELECT sb.batch_id, ({incoming_txn % 'sb.batch_id'})
+                FROM lineage l
+                INNER JOIN {source_table} sb
+                    ON sb.transaction_id = l.transaction_id
+            )
+            SELECT l.batch_id, l.transaction_id, t.transaction_type,
+                EXISTS(
+                    SELECT 1 FROM {source_table} isb
+                    INNER JOIN {txn_table} it ON it.id = isb.transaction_id
+                    WHERE isb.batch_id = l.batch_id
+                        AND it.transaction_type = %(internal)s
+                ) AS is_internal_source
+            FROM lineage l
+            LEFT OUTER JOIN {txn_table} t ON t.id = l.transaction_id
+            """
+
+    @property
+    def rows(self):
+        """
+        Lineage rows as tuples of (batch_id, transaction_id,
+        transaction_type, is_internal_source). Resolved only once.
+        """
+        if self._rows is None:
+            params = {
+                'batch_id': self.batch.id,
+                'internal': txn_consts.TransactionType.INTERNAL
+            }
+            with connection.cursor() as cursor:
+                cursor.execute(self._query(), params)
+                self._rows = cursor.fetchall()
+        return self._rows
+
+    def batch_ids(self, external=False):
+        """
+        Return ids of all the batches in the lineage, including the batch
+        itself. With external, batches consumed by an internal transaction
+        are skipped so that only the batches that changed hands remain.
+        """
+        batch_ids = []
+        for batch_id, _, _, is_internal_source in self.rows:
+            if external and is_internal_source:
+                continue
+            batch_ids.append(batch_id)
+        return list(dict.fromkeys(batch_ids))
+
+    def transaction_ids(self):
+        """
+        Return ids of the incoming transactions of the batches in lineage.
+        """
+        return list({
+            transaction_id for _, transaction_id, _, _ in self.rows
+            if transaction_id})
+
+    def transaction_types(self):
+        """
+        Return mapping of transaction id to its main transaction type.
+        """
+        return {
+            transaction_id: transaction_type
+            for _, transaction_id, transaction_type, _ in self.rows
+            if transaction_id}
+
+    def source_batches(self, external=False):
+        """
+        Return the source batch edges of the lineage. With external, the
+        edges of internal and reversal transactions are excluded.
+        """
+        source_batches = txn_models.SourceBatch.objects.filter(
+            transaction_id__in=self.transaction_ids())
+        if external:
+            source_batches = source_batches.exclude(
+                transaction__transaction_type=txn_consts.TransactionType.INTERNAL
+                ).exclude(transaction__externaltransaction__type=txn_consts.ExternalTransactionType.REVERSAL)
+        return source_batches.distinct()
+
+
 class BatchSelection:
     """
+    Backward compatible wrapper over BatchLineage.
     """
 
     def __init__(self):
@@ -16,29 +135,10 @@ class BatchSelection:
 
     def track_batches(self, batch=None, base_batch=False, external=False):
         """
+        Return ids of batches in the lineage of the batch and the source
+        batches connecting them.
         """
-        if base_batch:
-            self.untracked_batches = Batch.objects.filter(id=batch.id)
-        try:
-            txn = batch.incoming_transactions.first()
-            self.untracked_batches |= txn.source_batches.all()
-            self.source_batches |= txn.source_batch_objects.all()
-        except:
-            pass
-        if batch not in self.tracked_batches:
-            if external:
-                internal_transaction = txn_models.InternalTransaction.objects.filter(
-                    source_batches=batch)
-                if not internal_transaction:
-                    self.tracked_batches.append(batch.id)
-            else:
-                self.tracked_batches.append(batch.id)
-        self.untracked_batches = self.untracked_batches.exclude(
-            id=batch.id)
-        if self.untracked_batches:
-            self.track_batches(self.untracked_batches.first(), external=external)
-        if external:
-            self.source_batches = self.source_batches.exclude(
-                transaction__transaction_type=txn_consts.TransactionType.INTERNAL
-                ).exclude(transaction__externaltransaction__type=txn_consts.ExternalTransactionType.REVERSAL)
-        return self.tracked_batches, self.source_batches.distinct()
+        lineage = BatchLineage(batch)
+        self.tracked_batches = lineage.batch_ids(external=external)
+        self.source_batches = lineage.source_batches(external=external)
+        return self.tracked_batches, self.source_batches
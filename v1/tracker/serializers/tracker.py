@@ -60,7 +60,7 @@ class NodeSerializer(serializers.ModelSerializer):
         node_transparency = \
             tenant_consts.NodeDataTransparency.PARTIALY_TRANSPARENT
         if (tenant.node_data_transparency == node_transparency) and (
-            instance not in current_node.get_connection_circle()):
+            instance.id not in current_node.get_connection_circle_ids()):
             update_dict = {
                 "name": "●●●●●●",
                 "image": None,
@@ -100,7 +100,8 @@ class TransactionSerializer(serializers.ModelSerializer):
             tenant_consts.NodeDataTransparency.PARTIALY_TRANSPARENT
         if tenant.node_data_transparency == node_transparency:
             update_dict = {}
-            if instance.source_node not in current_node.get_connection_circle():
+            if getattr(instance.source_node, 'id', None) not in \
+                    current_node.get_connection_circle_ids():
                 update_dict['sender'] = "●●●●●●"
             data.update(update_dict)
         return data
@@ -201,7 +202,7 @@ class BatchTrackSerializer(serializers.ModelSerializer):
         node_transparency = \
             tenant_consts.NodeDataTransparency.PARTIALY_TRANSPARENT
         if (tenant.node_data_transparency == node_transparency) and (
-            instance.node not in current_node.get_connection_circle()):
+            instance.node_id not in current_node.get_connection_circle_ids()):
             update_dict = {
                 "name": "●●●●●●"
             }
@@ -243,9 +244,8 @@ class BatchSerializer(serializers.ModelSerializer):
             self.is_first = True
         if main_batch:
             self.main_batch = product_models.Batch.objects.get(id=decode(main_batch))
-            batches,_ = operations.BatchSelection().track_batches(
-                batch=self.main_batch, base_batch=True)
-            batches = sorted(batches)
+            batches = sorted(operations.BatchLineage(
+                self.main_batch).batch_ids())
         try:
             nxt_batch = txn_models.Transaction.objects.filter(
                 source_batches=main_batch,result_batches=batches
@@ -393,10 +393,10 @@ class BatchSerializer(serializers.ModelSerializer):
             block_chain_info = data.get('txn_text_info', None)
             if txn_text_info and (
                     self.nxt_txn and 
-                    self.nxt_txn.destination_node not in current_node.get_connection_circle()
+                    self.nxt_txn.destination_node.id not in current_node.get_connection_circle_ids()
                     ):
                 txn_text_info['node'] = "●●●●●●"
-            if instance.node not in current_node.get_connection_circle():
+            if instance.node_id not in current_node.get_connection_circle_ids():
                 block_chain_info = {
                 "txn_hash": "●●●●●●",
                 "source_address": "●●●●●●",
@@ -455,7 +455,7 @@ class TrackerInfoSerializer(serializers.ModelSerializer):
         node_transparency = \
             tenant_consts.NodeDataTransparency.PARTIALY_TRANSPARENT
         if (tenant.node_data_transparency == node_transparency) and (
-            instance.node not in current_node.get_connection_circle()):
+            instance.node_id not in current_node.get_connection_circle_ids()):
             update_dict = {
                 "name": "●●●●●●", 
                 "image": None,
@@ -6,7 +6,7 @@ from v1.tracker.serializers import tracker as tracker_serializers
 
 from v1.products import models as prod_models
 
-from v1.tracker.operations import BatchSelection
+from v1.tracker.operations import BatchLineage
 
 from v1.nodes import constants as node_consts
 from v1.transactions import models as txn_models
@@ -51,8 +51,7 @@ class TrackerInfoView(generics.ListAPIView):
         """
         """
         batch = prod_models.Batch.objects.get(id=self.kwargs['pk'])
-        batches,__ = BatchSelection().track_batches(
-            batch=batch, base_batch=True, external=True)
+        batches = BatchLineage(batch).batch_ids(external=True)
         batches = prod_models.Batch.objects.filter(id__in=batches).exclude(
             node=None).select_related('node', 'node__province__country').order_by('id')
         return batches
@@ -8,6 +8,7 @@ from django_filters import rest_framework as filters
 from django.db.models import Q
 from base import session
 from utilities.functions import decode
+from utilities import search
 
 from common.library import _unix_to_datetime
 from common.drf_custom import filters as custom_filters
@@ -37,12 +38,11 @@ class ExternalTransactionFilter(filters.FilterSet):
         fields = ('product', 'type', 'status', 'supply_chain', 'search', 'creator')
 
     def search_filter(self, queryset, name, value):
-        query = Q(source__name__icontains=value) | \
-                Q(destination__name__icontains=value) | Q(
-                    number__icontains=value) | Q(
-                    source_batches__product__name__icontains=value) | Q(
-                        result_batches__product__name__icontains=value)
-        return queryset.filter(query).distinct()
+        """
+        Search on the number, the nodes and the product names, see
+        utilities.search.
+        """
+        return search.search(queryset, value)
 
     def product_filter(self, queryset, name, value):
         """
@@ -121,10 +121,10 @@ class InternalTransactionFilter(filters.FilterSet):
         return queryset.filter(query).distinct()
 
     def search_filter(self, queryset, name, value):
-        query = Q(source_batches__product__name__icontains=value) | \
-                Q(result_batches__product__name__icontains=value) | Q(
-                    number__icontains=value)
-        return queryset.filter(query).distinct()
+        """
+        Search on the number and the product names, see utilities.search.
+        """
+        return search.search(queryset, value)
 
 
 class PurchaseOrderFilter(filters.FilterSet):
@@ -0,0 +1,45 @@
+"""Command to backfill the fingerprints of the external transactions."""
+
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from v1.products.models import Batch
+from v1.transactions.models import ExternalTransaction
+
+
+class Command(BaseCommand):
+    """
+    Computes the duplicate check fingerprint of the external transactions
+    that do not have one yet, in batches of ids. The command can be
+    stopped and run again, transactions already done are skipped.
+    """
+    help = 'Backfill the fingerprints of the external transactions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000,
+            help='Number of transactions updated at a time.')
+
+    def handle(self, *args, **options):
+        product = Batch.objects.filter(
+            incoming_transactions=models.OuterRef('pk')).order_by(
+            'id').values('product_id')[:1]
+        pending = ExternalTransaction.objects.filter(
+            fingerprint='').annotate(product_id=models.Subquery(product))
+        last_id, total = 0, 0
+        while True:
+            rows = list(pending.filter(pk__gt=last_id).order_by('pk').values_list(
+                'pk', 'source_id', 'destination_id', 'price',
+                'destination_quantity', 'unit_id', 'product_id', 'date'
+                )[:options['batch_size']])
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            transactions = [
+                ExternalTransaction(pk=pk, fingerprint=(
+                    ExternalTransaction.make_fingerprint(*values)))
+                for pk, *values in rows if values[5]]
+            ExternalTransaction.objects.bulk_update(
+                transactions, ['fingerprint'])
+            total += len(transactions)
+            self.stdout.write(f'Updated {total} transactions.')
+        self.stdout.write(f'Backfilled {total} fingerprints.')
@@ -0,0 +1,112 @@
+"""Command to benchmark the transaction search on a synthetic table."""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from utilities import search
+
+from v1.products import models as prod_models
+from v1.transactions import models as txn_models
+
+WORDS = (
+    'cocoa', 'coffee', 'palm', 'rubber', 'timber', 'soy', 'cattle',
+    'vanilla', 'cashew', 'cotton')
+RARE_WORD = 'kinabalu'
+
+
+class Rollback(Exception):
+    """Raised to discard the synthetic transactions after benchmarking."""
+
+
+class Command(BaseCommand):
+    """
+    Inserts synthetic transactions with search documents made of product
+    and company names, one in every thousand with a rare name, and times
+    the first page and the count of the trigram search of the documents,
+    the same search with the indexes disabled and the icontains search
+    over the number and the joined product names the filters used before.
+    The synthetic transactions have no batches, so the last one only
+    matches numbers. Everything created is rolled back at the end.
+    """
+    help = 'Benchmark the transaction search on a synthetic table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument(
+            '--terms', nargs='+', default=[RARE_WORD, WORDS[0]])
+
+    def make_document(self, index):
+        company = RARE_WORD if index % 1000 == 0 else ''.join(
+            random.choices('abcdefghijklmnopqrstuvwxyz', k=8))
+        return search.make_document(
+            index + 1000, random.choice(WORDS), company)
+
+    def seed(self, product, rows, batch_size):
+        for start in range(0, rows, batch_size):
+            txn_models.Transaction.objects.bulk_create([
+                txn_models.Transaction(
+                    tenant=product.tenant, unit=product.unit,
+                    number=index + 1000,
+                    search_document=self.make_document(index))
+                for index in range(start, min(start + batch_size, rows))])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'ANALYZE {txn_models.Transaction._meta.db_table}')
+
+    def set_index_scans(self, value):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SET LOCAL enable_bitmapscan = {value}')
+            cursor.execute(f'SET LOCAL enable_indexscan = {value}')
+
+    def time_query(self, queryset, runs):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            list(queryset[:50])
+            count = queryset.count()
+            timings.append(time.perf_counter() - start)
+        return count, min(timings), sum(timings) / len(timings)
+
+    def handle(self, *args, **options):
+        product = prod_models.Product.objects.exclude(
+            unit=None).select_related('tenant', 'unit').first()
+        if not product:
+            raise CommandError('A product with a unit is required.')
+        transactions = txn_models.Transaction.objects.all()
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                self.seed(product, options['rows'], options['batch_size'])
+                self.stdout.write(
+                    f'seeded {options["rows"]} rows in '
+                    f'{time.perf_counter() - start:.1f}s')
+                for term in options['terms']:
+                    queries = {
+                        'icontains': transactions.filter(
+                            Q(number__icontains=term) | Q(
+                                source_batches__product__name__icontains=(
+                                    term)) | Q(
+                                result_batches__product__name__icontains=(
+                                    term))).distinct(),
+                        'trigram': search.search(transactions, term),
+                        'trigram_seqscan': search.search(transactions, term),
+                    }
+                    for name, queryset in queries.items():
+                        if name == 'trigram_seqscan':
+                            self.set_index_scans('off')
+                        count, best, avg = self.time_query(
+                            queryset, options['runs'])
+                        self.set_index_scans('on')
+                        self.stdout.write(
+                            f'term={term} {name}: matches={count} '
+                            f'best={best * 1000:.2f}ms '
+                            f'avg={avg * 1000:.2f}ms')
+                raise Rollback
+        except Rollback:
+            pass
@@ -0,0 +1,36 @@
+"""Command to refresh the search documents of the searchable models."""
+
+from django.core.management.base import BaseCommand
+
+from utilities import search
+
+from v1.claims import models as claim_models
+from v1.products import models as prod_models
+from v1.transactions import models as txn_models
+
+
+class Command(BaseCommand):
+    """
+    Recomputes the search documents of the batches, transactions and
+    attached claims, to fill them after the migration adding them or to
+    repair them. Only the objects with an empty document are refreshed
+    unless --all is given.
+    """
+    help = 'Refresh the search documents of batches, transactions and claims.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+            help='Refresh the documents that are already filled too.')
+        parser.add_argument('--batch-size', type=int,
+            default=search.REFRESH_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        models = (
+            prod_models.Batch, txn_models.ExternalTransaction,
+            txn_models.InternalTransaction, claim_models.AttachedClaim)
+        for model in models:
+            queryset = model.objects.all()
+            if not options['all']:
+                queryset = queryset.filter(search_document='')
+            count = search.refresh(queryset, options['batch_size'])
+            self.stdout.write(f'{model.__name__}: refreshed {count}.')
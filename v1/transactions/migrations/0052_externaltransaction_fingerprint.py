@@ -0,0 +1,29 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    The index is built concurrently, so that writes to the transactions
+    are not blocked while it is built on a large table. Fingerprints of
+    the existing transactions are filled by backfill_transaction_fingerprints.
+    """
+    atomic = False
+
+    dependencies = [
+        ('transactions', '0051_alter_deliverynotification_purchase_order_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='externaltransaction',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40, verbose_name='Duplicate Check Fingerprint'),
+        ),
+        AddIndexConcurrently(
+            model_name='externaltransaction',
+            index=models.Index(fields=['fingerprint'], name='ext_transaction_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.0.4 on 2026-10-18 17:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+    """
+    The index is built concurrently, so that writes to the transactions
+    are not blocked while it is built. Documents of the existing
+    transactions are filled by refresh_search_documents.
+    """
+    atomic = False
+
+    dependencies = [
+        ('nodes', '0042_node_name_trgm'),
+        ('transactions', '0052_externaltransaction_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Search Document'),
+        ),
+        AddIndexConcurrently(
+            model_name='transaction',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('search_document'), name='gin_trgm_ops'), name='transaction_search_trgm'),
+        ),
+    ]
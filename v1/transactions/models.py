@@ -1,7 +1,9 @@
 """Models of the app Transactions."""
 
 import json
+import hashlib
 import datetime
+from decimal import Decimal
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
@@ -13,6 +15,7 @@ from base.models import AbstractBaseModel, NumberedModel
 from base import session
 from base import exceptions
 from utilities import functions as util_functions
+from utilities import search
 from common.library import _get_file_path
 
 from v1.transactions import constants as trans_consts
@@ -45,6 +48,8 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
         result_batch(obj)       : The batch that was created after the transaction.
 
         upload_timestamp               : Offline sync id
+        search_document(text)   : Text the transaction is searched on,
+                                  see utilities.search.
 
     Inherited Attribs:
         creator(obj): Creator user of the object.
@@ -115,6 +120,14 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
         max_length=100, default=None, null=True, blank=True, 
         verbose_name=_('Transaction Rejection Reason'), 
         validators=[validate_comma_separated_integer_list])
+    search_document = models.TextField(
+        default='', blank=True, editable=False,
+        verbose_name=_('Search Document'))
+
+    class Meta(AbstractBaseModel.Meta):
+        """Meta setup"""
+        indexes = [search.trigram_index(
+            'search_document', 'transaction_search_trgm')]
 
     def __str__(self):
         """Object name in django admin."""
@@ -123,7 +136,10 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
     def save(self, *args, **kwargs):
         """
         Override to add quantity in kg, set created_on to 
-        corresponding timestamp in upload_timestamp
+        corresponding timestamp in upload_timestamp, to add new
+        transactions to the daily stock flows and the consumer interface
+        cache and to clear the cached dashboard stats. The search document
+        is updated once the number and the batches are added.
         """
         self.tenant = self.tenant or session.get_current_tenant()
         self.source_quantity_kg = float(
@@ -137,7 +153,14 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
                     int(self.upload_timestamp)))
             except Exception as ex:
                 print(ex)
+        created = not self.pk
+        if not created:
+            self.search_document = self.get_search_document()
         super(Transaction, self).save(*args, **kwargs)
+        if created:
+            self.refresh_stock_flows()
+            self.refresh_consumer_interface(invalidate=False)
+        self.invalidate_dashboard_stats()
 
     def related_nodes(self):
         """Return nodes related to this transaction"""
@@ -148,6 +171,19 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
             nodes.append(self.result_batches.first().node)
         return nodes
 
+    def get_search_document(self):
+        """
+        Returns the text the transaction is searched on, its number and the
+        names of its products in every language.
+        """
+        fields = search.localized_fields('name')
+        products = prod_models.Product.objects.filter(
+            models.Q(batches__incoming_transactions=self) | models.Q(
+                batches__outgoing_transactions=self)).order_by(
+            *fields).values_list(*fields).distinct()
+        return search.make_document(
+            self.number, *(name for names in products for name in names))
+
     def result_products(self):
         """
         Returns result batch products of the transaction.
@@ -196,6 +232,9 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
         if note:
             self.note = note
         self.save()
+        self.refresh_stock_flows()
+        self.refresh_consumer_interface()
+        self.sync_stock()
         return True
 
     def reject(self, note=None, rejection_reason=None):
@@ -211,8 +250,38 @@ class Transaction(AbstractBaseModel, NumberedModel, AbstractConsensusMessage):
         if rejection_reason:
             self.rejection_reason = rejection_reason
         self.save()
+        self.refresh_stock_flows()
+        self.refresh_consumer_interface()
+        self.sync_stock()
         return True
 
+    def invalidate_dashboard_stats(self):
+        """Clears cached dashboard stats of the tenant."""
+        from v1.dashboard import caching
+        return caching.invalidate_stats(self.tenant_id)
+
+    def refresh_stock_flows(self):
+        """Schedules refresh of the daily stock flows of the transaction."""
+        from v1.dashboard import stock_flows
+        return stock_flows.schedule_refresh(self)
+
+    def sync_stock(self):
+        """
+        Schedules sync of the result batches with the stock ledger, as
+        they become available or unavailable with the status.
+        """
+        from v1.products import stock
+        return stock.schedule_sync(
+            self.result_batches.values_list('id', flat=True), self)
+
+    def refresh_consumer_interface(self, invalidate=True):
+        """
+        Schedules refresh of the cached consumer interface pages of the
+        result batches.
+        """
+        from v1.consumer_interface import caching as ci_caching
+        return ci_caching.schedule_transaction_refresh(self, invalidate)
+
     @property
     def source_node(self):
         """
@@ -439,6 +508,8 @@ class ExternalTransaction(Transaction):
         price(float)     : Price paid for transaction.
         currency        : Currency of payment.
         type            : Type of transaction incoming/outgoing.
+        fingerprint     : Hash of the fields defining a duplicate
+                          transaction, see make_fingerprint.
 
     Inherited Attribs:
         parents(objs)           : Manytomany fields to map the parent
@@ -480,11 +551,90 @@ class ExternalTransaction(Transaction):
         default=trans_consts.ExternalTransactionType.INCOMING,
         choices=trans_consts.ExternalTransactionType.choices, 
         verbose_name=_('Type Of External Transaction'))
+    fingerprint = models.CharField(
+        max_length=40, default='', blank=True, editable=False,
+        verbose_name=_('Duplicate Check Fingerprint'))
+
+    class Meta:
+        """Meta setup"""
+        indexes = [models.Index(
+            fields=['fingerprint'], name='ext_transaction_fingerprint')]
 
     def __str__(self):
         """Object name in django admin."""
         return f'{self.source} - {self.destination.name} - {self.get_type_display()} | {self.idencode}'
 
+    @staticmethod
+    def make_fingerprint(
+            source_id, destination_id, price, quantity, unit_id, product_id,
+            date):
+        """
+        Returns the hash of the fields defining a duplicate transaction,
+        normalized so that the same values from a request, an excel or
+        the database give the same hash.
+        """
+        date = models.DateField().to_python(date)
+        values = (
+            source_id or '', destination_id or '',
+            '' if price is None else f'{float(price):.6f}',
+            f'{Decimal(str(quantity)):.3f}', unit_id or '', product_id or '',
+            date.isoformat() if date else '')
+        return hashlib.sha1(
+            '|'.join(str(value) for value in values).encode()).hexdigest()
+
+    def get_fingerprint(self):
+        """
+        Returns the fingerprint of the transaction, which is only complete
+        once the result batch is added.
+        """
+        product_id = self.result_batches.order_by('id').values_list(
+            'product_id', flat=True).first()
+        if not product_id:
+            return ''
+        return self.make_fingerprint(
+            self.source_id, self.destination_id, self.price,
+            self.destination_quantity, self.unit_id, product_id, self.date)
+
+    def get_search_document(self):
+        """
+        Returns the text the transaction is searched on, including the
+        names of the source and the destination.
+        """
+        return search.make_document(
+            super(ExternalTransaction, self).get_search_document(),
+            self.source.name if self.source else '',
+            self.destination.name)
+
+    @classmethod
+    def find_duplicates(
+            cls, source_id, destination_id, price, quantity, unit_id,
+            product_id, date):
+        """
+        Returns the transactions that are duplicates of the values, with
+        a single probe of the fingerprint index.
+        """
+        return cls.objects.filter(fingerprint=cls.make_fingerprint(
+            source_id, destination_id, price, quantity, unit_id, product_id,
+            date))
+
+    def save(self, *args, **kwargs):
+        """
+        Override to update the supply chain risk scores depending on the
+        destination, when a new transaction makes the source its supplier,
+        and the connection summaries of the source and destination. The
+        fingerprint is updated once the result batch is added.
+        """
+        from utilities import calculate_risk
+        from v1.supply_chains.models import ConnectionSummary
+        created = not self.pk
+        if not created:
+            self.fingerprint = self.get_fingerprint()
+        super(ExternalTransaction, self).save(*args, **kwargs)
+        if created and self.source_id:
+            calculate_risk.schedule_update(self.destination_id)
+        ConnectionSummary.schedule_refresh(
+            self.source_id, self.destination_id)
+
     @property
     def name(self, is_source=False):
         """
@@ -577,10 +727,7 @@ class ExternalTransaction(Transaction):
         else:
             return False
 
-        for user in target_node.members.all():
-            notification_manager = NotificationManager(
-                user=user, action_object=self, token=None)
-            notification_manager.send_notification()
+        NotificationManager.notify_members(target_node, self)
         return True
 
     def extra_info(self):
@@ -778,10 +925,7 @@ class PurchaseOrder(AbstractBaseModel, NumberedModel):
         else:
             NotificatioManager = notifications.PurchaseOrderCreatedNotificationManager
 
-        for user in self.receiver.members.all():
-            notification_manager = NotificatioManager(
-                user=user, action_object=self, token=None)
-            notification_manager.send_notification()
+        NotificatioManager.notify_members(self.receiver, self)
         return True
 
     def notify_po_approval(self):
@@ -789,10 +933,8 @@ class PurchaseOrder(AbstractBaseModel, NumberedModel):
         node = self.sender
         if self.status == trans_consts.PurchaseOrderStatus.CANCELLED:
             node = self.receiver
-        for user in node.members.all():
-            notification_manager = notifications.PurchaseOrderApprovalNotificationManager(
-                user=user, action_object=self, token=None)
-            notification_manager.send_notification()
+        notifications.PurchaseOrderApprovalNotificationManager.notify_members(
+            node, self)
         return True
 
     def extra_info(self):
@@ -881,16 +1023,15 @@ class TransactionComment(AbstractBaseModel):
         """Notify all the members related to the transaction."""
         source_node = self.transaction.source_node
         destination_node = self.transaction.destination_node
+        NotificationManager = notifications.TransactionCommentNotificationManager
         if source_node:
-            for member in source_node.node_members.exclude(id=self.member.id):
-                notification_manager = notifications.TransactionCommentNotificationManager(
-                    user=member.user, action_object=self, token=None)
-                notification_manager.send_notification()
+            NotificationManager.notify_members(
+                source_node, self,
+                members=source_node.node_members.exclude(id=self.member.id))
         if source_node != destination_node:
-            for member in destination_node.node_members.exclude(id=self.member.id):
-                notification_manager = notifications.TransactionCommentNotificationManager(
-                    user=member.user, action_object=self, token=None)
-                notification_manager.send_notification()
+            NotificationManager.notify_members(
+                destination_node, self,
+                members=destination_node.node_members.exclude(id=self.member.id))
         return True
 
 
@@ -917,8 +1058,6 @@ class DeliveryNotification(AbstractBaseModel):
 
     def notify(self):
         """Notify all the members of batch reciever of the purchase order."""
-        for user in self.purchase_order.sender.members.all():
-            notification_manager = notifications.DeliveryNotificationManager(
-                user=user, action_object=self, token=None)
-            notification_manager.send_notification()
+        notifications.DeliveryNotificationManager.notify_members(
+            self.purchase_order.sender, self)
         return True
@@ -18,6 +18,7 @@ from v1.transactions import constants as transaction_consts
 from v1.transactions.serializers import internal as int_txn_serializers
 
 from v1.products import models as product_models
+from v1.products import stock
 from v1.products.serializers import batch as batch_serializers
 from v1.products.serializers.product import ProductBaseSerializer, UnitSerializer
 
@@ -349,13 +350,13 @@ class ExternalTransactionSerializer(serializers.ModelSerializer):
         force_create = validated_data.pop('force_create', False)
         validated_data['date'] = validated_data.get(
             'date',timezone.datetime.now().date())
-        transactions = transaction_models.ExternalTransaction.objects.filter(
-            source=supplier, destination=buyer, price=validated_data['price'],
-            destination_quantity=validated_data['quantity'], unit=validated_data['unit'],
-            result_batches__product=validated_data['product'],
-            date=validated_data['date'],
+        transactions = transaction_models.ExternalTransaction.find_duplicates(
+            supplier.id if supplier else None, buyer.id,
+            validated_data['price'], validated_data['quantity'],
+            validated_data['unit'].id, validated_data['product'].id,
+            validated_data['date']).filter(
             upload_timestamp=validated_data.get('upload_timestamp'))
-        if transactions.exists() and not force_create:
+        if not force_create and transactions.exists():
             # raise base_exceptions.BadRequest(
             #     _("Transaction already created."))
             return transactions.first()
@@ -369,8 +370,6 @@ class ExternalTransactionSerializer(serializers.ModelSerializer):
         product = validated_data.pop('product')
         if 'batches' in validated_data.keys():
             source_batches = validated_data.pop('batches')
-        batch_data['batch'].current_quantity -= batch_data['quantity']
-        batch_data['batch'].save()
         validated_data['source_quantity'] = quantity
         validated_data['destination_quantity'] = quantity
         if self.current_tenant.transaction_auto_approval or \
@@ -382,6 +381,9 @@ class ExternalTransactionSerializer(serializers.ModelSerializer):
             transaction_models.ExternalTransaction.objects.create(
                 **validated_data)
         batch = batch_data['batch']
+        if not stock.take(batch, batch_data['quantity'], transaction):
+            raise serializers.ValidationError(
+                _("Not enough quantity in Batch"))
         transaction_models.SourceBatch.objects.create(
             transaction=transaction, batch=batch, quantity=quantity,
             creator=current_user, updater=current_user,
@@ -14,6 +14,7 @@ from utilities.translations import internationalize_attribute
 
 from v1.products.serializers import batch as batch_serializers
 from v1.products import models as prod_models
+from v1.products import stock
 from v1.products.serializers import product as prod_serializers
 
 from v1.transactions import models as trans_models
@@ -277,11 +278,9 @@ class InternalTransactionSerializer(serializers.ModelSerializer):
         for batch_data in source_batches:
             batch = batch_data['batch']
             qty = batch_data['quantity']
-            if batch.current_quantity < qty:
+            if not stock.take(batch, qty, transaction):
                 raise serializers.ValidationError(
                     _("Not enough quantity in Batch"))
-            batch.current_quantity -= qty
-            batch.save()
             source_batch = trans_models.SourceBatch.objects.create(
                 transaction=transaction, batch=batch, quantity=qty,
                 unit=batch.unit,
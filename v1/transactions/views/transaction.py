@@ -103,12 +103,10 @@ class ValidateTransaction(APIView):
         if data['type'] == ExternalTransactionType.INCOMING:
             source = node
             destination = current_node
-        transactions = transaction_models.ExternalTransaction.objects.filter(
-            source=source, destination=destination, price=data['price'], 
-            destination_quantity=data['quantity'], unit=unit,
-            result_batches__product__id=decode(data['product']), 
-            date=date
-        )
+        transactions = transaction_models.ExternalTransaction.find_duplicates(
+            source.id if source else None,
+            destination.id if destination else None, data['price'],
+            data['quantity'], unit.id, decode(data['product']), date)
         if transactions.exists():
             data = {
                 "is_exist": True,